@@ -3,8 +3,11 @@ import os
 from flask import Flask, send_from_directory, jsonify
 from flasgger import Swagger
 from .config import Config
-from .extensions import db, api, migrate, cors, jwt,redis_client
+from .extensions import db, api, migrate, cors, jwt
 from .resources import register_resources
+from .services.geometry import geometry_cache
+from .services.tiles import tile_cache
+from .services.token_blocklist import token_blocklist
 from dotenv import load_dotenv
 from flask_jwt_extended import get_jwt
 import traceback
@@ -66,6 +69,10 @@ def create_app():
     logger.info("Flask-RESTful API initialized successfully")
     jwt.init_app(app)
     logger.info("Flask-JWT-Extended initialized successfully")
+    tile_cache.init_app(app)
+    logger.info("Tile cache initialized successfully")
+    geometry_cache.init_app(app)
+    logger.info("Geometry cache initialized successfully")
 
     # 注册资源并手动绑定路由
     with app.app_context():
@@ -122,8 +129,7 @@ def create_app():
 
     @jwt.token_in_blocklist_loader
     def check_if_token_in_blacklist(jwt_header, jwt_payload):
-        jti = jwt_payload['jti']
-        return  redis_client.get(f"blacklist:{jti}") is not None
+        return token_blocklist.is_revoked(jwt_payload)
 
     @jwt.unauthorized_loader
     def unauthorized_callback(error_string):
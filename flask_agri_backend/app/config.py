@@ -14,13 +14,42 @@ class Config:
     JWT_BLACKLIST_TOKEN_CHECKS = ["access", "refresh"]
     REDIS_URL = os.getenv("REDIS_URL", "redis://106.52.168.64:6379/0")
     PORT = 5000
+    # 影像分析
+    ANALYSIS_OUTPUT_DIR = os.getenv('ANALYSIS_OUTPUT_DIR', os.path.join(os.getcwd(), 'data', 'analysis'))  # 分析结果栅格输出目录
+    RASTER_BLOCK_SIZE = int(os.getenv('RASTER_BLOCK_SIZE', 1024))  # 分块读取窗口边长（像素）
+    IMAGERY_OPTIMIZE_ON_INGEST = os.getenv('IMAGERY_OPTIMIZE_ON_INGEST', 'true').lower() == 'true'  # 影像入库后转换为 COG
+    IMAGERY_OPTIMIZED_DIR = os.getenv('IMAGERY_OPTIMIZED_DIR', os.path.join(os.getcwd(), 'data', 'optimized'))  # COG 输出目录
+    IMAGERY_OPTIMIZE_WORKERS = int(os.getenv('IMAGERY_OPTIMIZE_WORKERS', 1))  # 后台转换线程数
+    ZONAL_MASK_DIR = os.getenv('ZONAL_MASK_DIR', os.path.join(os.getcwd(), 'data', 'masks'))  # 地块标签图缓存目录
+    GEOMETRY_CRS = os.getenv('GEOMETRY_CRS', 'EPSG:4326')  # 地块等 geom 字段的坐标系
+    GEOMETRY_CACHE_MAX_BYTES = int(os.getenv('GEOMETRY_CACHE_MAX_BYTES', 64 * 1024 * 1024))  # 几何解析缓存上限（字节）
+    TIMESERIES_WORKERS = int(os.getenv('TIMESERIES_WORKERS', 4))  # 时间序列并发提取线程数
+    PLANNER_WORKERS = int(os.getenv('PLANNER_WORKERS', os.cpu_count() or 2))  # 批量航线规划进程数
+    PLANNER_MAX_PLOTS = int(os.getenv('PLANNER_MAX_PLOTS', 500))  # 单次规划的地块数上限
+    STREAM_CHUNK_SIZE = int(os.getenv('STREAM_CHUNK_SIZE', 500))  # 列表流式输出时每批读取的记录数
+    BULK_MAX_ITEMS = int(os.getenv('BULK_MAX_ITEMS', 1000))  # 批量接口单次请求的最大条数
+    RECORD_CACHE_TTL = int(os.getenv('RECORD_CACHE_TTL', 60))  # 单条记录读取缓存的有效期（秒），0 表示不缓存
+    RBAC_SYNC_INTERVAL = float(os.getenv('RBAC_SYNC_INTERVAL', 1.0))  # 权限位图与 Redis 版本号比对的间隔（秒）
+    BOOTSTRAP_WORKERS = int(os.getenv('BOOTSTRAP_WORKERS', 4))  # 启动数据接口并发查询的线程数
+    # 密码哈希
+    PASSWORD_HASH_METHOD = os.getenv('PASSWORD_HASH_METHOD', 'pbkdf2:sha256:260000')  # 算法与强度，如 scrypt:32768:8:1
+    PASSWORD_HASH_WORKERS = int(os.getenv('PASSWORD_HASH_WORKERS', 2))  # 哈希计算线程数
+    PASSWORD_HASH_QUEUE_LIMIT = int(os.getenv('PASSWORD_HASH_QUEUE_LIMIT', 16))  # 排队上限，超出时返回 503
+    PASSWORD_HASH_TIMEOUT = float(os.getenv('PASSWORD_HASH_TIMEOUT', 10))  # 等待哈希结果的最长时间（秒）
+    # 瓦片缓存
+    TILE_CACHE_DIR = os.getenv('TILE_CACHE_DIR', os.path.join(os.getcwd(), 'data', 'tiles'))  # 磁盘瓦片缓存目录
+    TILE_CACHE_MAX_BYTES = int(os.getenv('TILE_CACHE_MAX_BYTES', 64 * 1024 * 1024))  # 进程内瓦片缓存上限（字节）
 
 # 自定义错误码
 ERROR_CODES = {
     "MISSING_REQUIRED_PARAM": '4001',
     "INVALID_PARAM_FORMAT": '4002',
+    "INVALID_PARAM_KEY": '4003',  # 唯一约束冲突或记录被引用
     "DATABASE_ERROR": '5001',
+    "PERMISSION_DENIED": '4031',  # 已登录但缺少所需权限
     "NOT_FOUND": '4041',
+    "RASTER_ERROR": '5002',  # 栅格读取或计算失败
+    "SERVICE_BUSY": '5031',  # 服务繁忙（如密码哈希队列已满），稍后重试
     "INVALID_CREDENTIALS": '2',  # 新增：无效凭证
     "USER_NOT_ACTIVE": '3'   # 新增：用户未激活
 }
\ No newline at end of file
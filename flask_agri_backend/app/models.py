@@ -1,7 +1,8 @@
 from datetime import datetime
 from sqlalchemy.dialects.mysql import JSON, ENUM
 from .extensions import db
-from werkzeug.security import generate_password_hash, check_password_hash
+from .services.serializer import serializer_for
+from .services.passwords import hash_password, verify_password
 
 def default_datetime():
     return db.func.current_timestamp()
@@ -12,17 +13,9 @@ def iso_format(dt):
 class BaseModel(db.Model):
     __abstract__ = True
 
-    def to_dict(self):
-        result = {}
-        for column in self.__table__.columns:
-            value = getattr(self, column.name)
-            if isinstance(value, datetime):
-                result[column.name] = value.isoformat() if value else None
-            elif column.name in ('metadata', 'tags', 'geojson', 'stats', 'style') and value is not None:
-                result[column.name] = value  # JSON 兼容的字段直接返回
-            else:
-                result[column.name] = value
-        return result
+    def to_dict(self, fields=None):
+        # 序列化函数按模型（及字段子集）生成一次后缓存，日期时间转为 ISO 字符串，JSON 字段原样返回
+        return serializer_for(type(self), fields)(self)
 
 class Imagery(BaseModel):
     __tablename__ = 'imagery'
@@ -38,7 +31,7 @@ class Imagery(BaseModel):
     metadata_info = db.Column(JSON)
     status = db.Column(ENUM('active', 'deleted'))
     capture_time = db.Column(db.DateTime)
-    created_at = db.Column(db.DateTime, server_default=default_datetime())
+    created_at = db.Column(db.DateTime, server_default=default_datetime(), index=True)
     updated_at = db.Column(db.DateTime, server_default=default_datetime(), server_onupdate=default_datetime())
     tags = db.Column(JSON)
 
@@ -54,7 +47,7 @@ class FlightPath(BaseModel):
     speed = db.Column(db.Float)
     task_type = db.Column(db.String(64))
     metadata_info = db.Column(JSON)
-    created_at = db.Column(db.DateTime, server_default=default_datetime())
+    created_at = db.Column(db.DateTime, server_default=default_datetime(), index=True)
     updated_at = db.Column(db.DateTime, server_default=default_datetime(), server_onupdate=default_datetime())
     tags = db.Column(JSON)
 
@@ -71,7 +64,7 @@ class Task(BaseModel):
     volume = db.Column(db.Float)
     schedule_at = db.Column(db.DateTime)
     metadata_info = db.Column(JSON)
-    created_at = db.Column(db.DateTime, server_default=default_datetime())
+    created_at = db.Column(db.DateTime, server_default=default_datetime(), index=True)
     updated_at = db.Column(db.DateTime, server_default=default_datetime(), server_onupdate=default_datetime())
 
 class AnalysisResult(BaseModel):
@@ -87,7 +80,7 @@ class AnalysisResult(BaseModel):
     bbox = db.Column(db.Text, comment='原 GEOMETRY，分析区域范围')
     stats = db.Column(JSON)
     style = db.Column(JSON)
-    created_at = db.Column(db.DateTime, server_default=default_datetime())
+    created_at = db.Column(db.DateTime, server_default=default_datetime(), index=True)
     updated_at = db.Column(db.DateTime, server_default=default_datetime(), server_onupdate=default_datetime())
 
 class MapObject3D(BaseModel):
@@ -100,7 +93,7 @@ class MapObject3D(BaseModel):
     geom = db.Column(db.Text, comment='原 GEOMETRY，空间范围')
     related_id = db.Column(db.BigInteger)
     metadata_info = db.Column(JSON)
-    created_at = db.Column(db.DateTime, server_default=default_datetime())
+    created_at = db.Column(db.DateTime, server_default=default_datetime(), index=True)
     updated_at = db.Column(db.DateTime, server_default=default_datetime(), server_onupdate=default_datetime())
 
 class Plot(BaseModel):
@@ -114,7 +107,7 @@ class Plot(BaseModel):
     soil_type = db.Column(db.String(128))
     crop_type = db.Column(db.String(128))
     metadata_info = db.Column(JSON)
-    created_at = db.Column(db.DateTime, server_default=default_datetime())
+    created_at = db.Column(db.DateTime, server_default=default_datetime(), index=True)
     updated_at = db.Column(db.DateTime, server_default=default_datetime(), server_onupdate=default_datetime())
 
 class SystemMenu(BaseModel):
@@ -126,7 +119,7 @@ class SystemMenu(BaseModel):
     path = db.Column(db.String(255))
     icon = db.Column(db.String(64))
     order_num = db.Column(db.Integer, default=0)
-    created_at = db.Column(db.DateTime, server_default=default_datetime())
+    created_at = db.Column(db.DateTime, server_default=default_datetime(), index=True)
     updated_at = db.Column(db.DateTime, server_default=default_datetime(), server_onupdate=default_datetime())
 
 class SystemRole(BaseModel):
@@ -135,7 +128,7 @@ class SystemRole(BaseModel):
     id = db.Column(db.BigInteger, primary_key=True, autoincrement=True)
     name = db.Column(db.String(255))
     description = db.Column(db.Text)
-    created_at = db.Column(db.DateTime, server_default=default_datetime())
+    created_at = db.Column(db.DateTime, server_default=default_datetime(), index=True)
     updated_at = db.Column(db.DateTime, server_default=default_datetime(), server_onupdate=default_datetime())
 
 class SystemUser(BaseModel):
@@ -146,14 +139,14 @@ class SystemUser(BaseModel):
     email = db.Column(db.String(255), unique=True, nullable=True)
     password_hash = db.Column(db.String(255), nullable=False)
     status = db.Column(ENUM('active', 'disabled'), default='active')
-    created_at = db.Column(db.DateTime, server_default=default_datetime())
+    created_at = db.Column(db.DateTime, server_default=default_datetime(), index=True)
     updated_at = db.Column(db.DateTime, server_default=default_datetime(), server_onupdate=default_datetime())
 
     def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = hash_password(password)
 
     def check_password(self, password):
-        return check_password_hash(self.password_hash, password)
+        return verify_password(self.password_hash, password)
 
 class SystemPermission(BaseModel):
     __tablename__ = 'system_permissions'
@@ -162,7 +155,7 @@ class SystemPermission(BaseModel):
     name = db.Column(db.String(255))
     code = db.Column(db.String(64), unique=True)
     description = db.Column(db.Text)
-    created_at = db.Column(db.DateTime, server_default=default_datetime())
+    created_at = db.Column(db.DateTime, server_default=default_datetime(), index=True)
     updated_at = db.Column(db.DateTime, server_default=default_datetime(), server_onupdate=default_datetime())
 
 class RolePermission(BaseModel):
@@ -171,7 +164,7 @@ class RolePermission(BaseModel):
     id = db.Column(db.BigInteger, primary_key=True, autoincrement=True)
     role_id = db.Column(db.BigInteger)
     permission_id = db.Column(db.BigInteger)
-    created_at = db.Column(db.DateTime, server_default=default_datetime())
+    created_at = db.Column(db.DateTime, server_default=default_datetime(), index=True)
     updated_at = db.Column(db.DateTime, server_default=default_datetime(), server_onupdate=default_datetime())
 
 class UserRole(BaseModel):
@@ -180,5 +173,5 @@ class UserRole(BaseModel):
     id = db.Column(db.BigInteger, primary_key=True, autoincrement=True)
     user_id = db.Column(db.BigInteger)
     role_id = db.Column(db.BigInteger)
-    created_at = db.Column(db.DateTime, server_default=default_datetime())
+    created_at = db.Column(db.DateTime, server_default=default_datetime(), index=True)
     updated_at = db.Column(db.DateTime, server_default=default_datetime(), server_onupdate=default_datetime())
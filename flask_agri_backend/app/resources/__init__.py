@@ -13,7 +13,12 @@ from .analysis_results import (
     AnalysisResultUpdateResource,
     AnalysisResultDeleteResource,
     AnalysisResultListResource,
-    AnalysisResultPageResource
+    AnalysisResultPageResource,
+    AnalysisResultBulkResource,
+    AnalysisResultBatchResource,
+    AnalysisResultNdviResource,
+    AnalysisResultIndexResource,
+    AnalysisResultZonalResource
 )
 from .tasks import (
     TaskResource,
@@ -21,7 +26,9 @@ from .tasks import (
     TaskUpdateResource,
     TaskDeleteResource,
     TaskListResource,
-    TaskPageResource
+    TaskPageResource,
+    TaskBulkResource,
+    TaskBatchResource
 )
 from .plots import (
     PlotResource,
@@ -29,7 +36,10 @@ from .plots import (
     PlotUpdateResource,
     PlotDeleteResource,
     PlotListResource,
-    PlotPageResource
+    PlotPageResource,
+    PlotBulkResource,
+    PlotBatchResource,
+    PlotTimeseriesResource
 )
 from .imagery import (
     ImageryResource,
@@ -37,7 +47,10 @@ from .imagery import (
     ImageryUpdateResource,
     ImageryDeleteResource,
     ImageryListResource,
-    ImageryPageResource
+    ImageryPageResource,
+    ImageryBulkResource,
+    ImageryBatchResource,
+    ImageryZonalResource
 )
 from .flight_paths import (
     FlightPathResource,
@@ -45,7 +58,10 @@ from .flight_paths import (
     FlightPathUpdateResource,
     FlightPathDeleteResource,
     FlightPathListResource,
-    FlightPathPageResource
+    FlightPathPageResource,
+    FlightPathBulkResource,
+    FlightPathBatchResource,
+    FlightPathPlanResource
 )
 from .map_objects_3d import (
     MapObject3DResource,
@@ -53,7 +69,9 @@ from .map_objects_3d import (
     MapObject3DUpdateResource,
     MapObject3DDeleteResource,
     MapObject3DListResource,
-    MapObject3DPageResource
+    MapObject3DPageResource,
+    MapObject3DBulkResource,
+    MapObject3DBatchResource
 )
 from .system_menus import (
     SystemMenuResource,
@@ -61,7 +79,10 @@ from .system_menus import (
     SystemMenuUpdateResource,
     SystemMenuDeleteResource,
     SystemMenuListResource,
-    SystemMenuPageResource
+    SystemMenuPageResource,
+    SystemMenuBulkResource,
+    SystemMenuBatchResource,
+    SystemMenuTreeResource
 )
 from .system_roles import (
     SystemRoleResource,
@@ -69,7 +90,9 @@ from .system_roles import (
     SystemRoleUpdateResource,
     SystemRoleDeleteResource,
     SystemRoleListResource,
-    SystemRolePageResource
+    SystemRolePageResource,
+    SystemRoleBulkResource,
+    SystemRoleBatchResource
 )
 from .system_users import (
     SystemUserResource,
@@ -77,7 +100,9 @@ from .system_users import (
     SystemUserUpdateResource,
     SystemUserDeleteResource,
     SystemUserListResource,
-    SystemUserPageResource
+    SystemUserPageResource,
+    SystemUserBulkResource,
+    SystemUserBatchResource
 
 )
 from .system_permissions import (
@@ -86,7 +111,9 @@ from .system_permissions import (
     SystemPermissionUpdateResource,
     SystemPermissionDeleteResource,
     SystemPermissionListResource,
-    SystemPermissionPageResource
+    SystemPermissionPageResource,
+    SystemPermissionBulkResource,
+    SystemPermissionBatchResource
 )
 from .role_permissions import (
     RolePermissionResource,
@@ -94,7 +121,9 @@ from .role_permissions import (
     RolePermissionUpdateResource,
     RolePermissionDeleteResource,
     RolePermissionListResource,
-    RolePermissionPageResource
+    RolePermissionPageResource,
+    RolePermissionBulkResource,
+    RolePermissionBatchResource
 )
 from .user_roles import (
     UserRoleResource,
@@ -102,8 +131,12 @@ from .user_roles import (
     UserRoleUpdateResource,
     UserRoleDeleteResource,
     UserRoleListResource,
-    UserRolePageResource
+    UserRolePageResource,
+    UserRoleBulkResource,
+    UserRoleBatchResource
 )
+from .tiles import TileResource, VectorTileResource
+from .bootstrap import BootstrapResource
 
 def register_resources(api: Api):
     # Auth 认证
@@ -111,6 +144,7 @@ def register_resources(api: Api):
     api.add_resource(RegisterResource, '/api/auth/register')
     api.add_resource(RefreshResource, '/api/auth/refresh')
     api.add_resource(LogoutResource, '/api/auth/logout')
+    api.add_resource(BootstrapResource, '/api/bootstrap')
 
     # Analysis Results
     api.add_resource(AnalysisResultResource, '/api/analysis_results/<int:result_id>')
@@ -119,6 +153,11 @@ def register_resources(api: Api):
     api.add_resource(AnalysisResultDeleteResource, '/api/analysis_results/delete/<int:result_id>')
     api.add_resource(AnalysisResultListResource, '/api/analysis_results/list')
     api.add_resource(AnalysisResultPageResource, '/api/analysis_results/page')
+    api.add_resource(AnalysisResultBulkResource, '/api/analysis_results/bulk')
+    api.add_resource(AnalysisResultBatchResource, '/api/analysis_results/batch')
+    api.add_resource(AnalysisResultNdviResource, '/api/analysis_results/ndvi/<int:imagery_id>')
+    api.add_resource(AnalysisResultIndexResource, '/api/analysis_results/index/<int:imagery_id>')
+    api.add_resource(AnalysisResultZonalResource, '/api/analysis_results/zonal/<int:result_id>')
 
     # Tasks
     api.add_resource(TaskResource, '/api/tasks/<int:task_id>')
@@ -127,6 +166,8 @@ def register_resources(api: Api):
     api.add_resource(TaskDeleteResource, '/api/tasks/delete/<int:task_id>')
     api.add_resource(TaskListResource, '/api/tasks/list')
     api.add_resource(TaskPageResource, '/api/tasks/page')
+    api.add_resource(TaskBulkResource, '/api/tasks/bulk')
+    api.add_resource(TaskBatchResource, '/api/tasks/batch')
 
     # Plots
     api.add_resource(PlotResource, '/api/plots/<int:plot_id>')
@@ -135,6 +176,9 @@ def register_resources(api: Api):
     api.add_resource(PlotDeleteResource, '/api/plots/delete/<int:plot_id>')
     api.add_resource(PlotListResource, '/api/plots/list')
     api.add_resource(PlotPageResource, '/api/plots/page')
+    api.add_resource(PlotBulkResource, '/api/plots/bulk')
+    api.add_resource(PlotBatchResource, '/api/plots/batch')
+    api.add_resource(PlotTimeseriesResource, '/api/plots/<int:plot_id>/timeseries')
 
     # Imagery
     api.add_resource(ImageryResource, '/api/imagery/<int:imagery_id>')
@@ -143,6 +187,9 @@ def register_resources(api: Api):
     api.add_resource(ImageryDeleteResource, '/api/imagery/delete/<int:imagery_id>')
     api.add_resource(ImageryListResource, '/api/imagery/list')
     api.add_resource(ImageryPageResource, '/api/imagery/page')
+    api.add_resource(ImageryBulkResource, '/api/imagery/bulk')
+    api.add_resource(ImageryBatchResource, '/api/imagery/batch')
+    api.add_resource(ImageryZonalResource, '/api/imagery/zonal/<int:imagery_id>')
 
     # Flight Paths
     api.add_resource(FlightPathResource, '/api/flight_paths/<int:flight_path_id>')
@@ -151,6 +198,9 @@ def register_resources(api: Api):
     api.add_resource(FlightPathDeleteResource, '/api/flight_paths/delete/<int:flight_path_id>')
     api.add_resource(FlightPathListResource, '/api/flight_paths/list')
     api.add_resource(FlightPathPageResource, '/api/flight_paths/page')
+    api.add_resource(FlightPathBulkResource, '/api/flight_paths/bulk')
+    api.add_resource(FlightPathBatchResource, '/api/flight_paths/batch')
+    api.add_resource(FlightPathPlanResource, '/api/flight_paths/plan')
 
     # Map Objects 3D
     api.add_resource(MapObject3DResource, '/api/map_objects_3d/<int:object_id>')
@@ -159,6 +209,8 @@ def register_resources(api: Api):
     api.add_resource(MapObject3DDeleteResource, '/api/map_objects_3d/delete/<int:object_id>')
     api.add_resource(MapObject3DListResource, '/api/map_objects_3d/list')
     api.add_resource(MapObject3DPageResource, '/api/map_objects_3d/page')
+    api.add_resource(MapObject3DBulkResource, '/api/map_objects_3d/bulk')
+    api.add_resource(MapObject3DBatchResource, '/api/map_objects_3d/batch')
 
     # System Menus
     api.add_resource(SystemMenuResource, '/api/system_menus/<int:menu_id>')
@@ -167,6 +219,9 @@ def register_resources(api: Api):
     api.add_resource(SystemMenuDeleteResource, '/api/system_menus/delete/<int:menu_id>')
     api.add_resource(SystemMenuListResource, '/api/system_menus/list')
     api.add_resource(SystemMenuPageResource, '/api/system_menus/page')
+    api.add_resource(SystemMenuBulkResource, '/api/system_menus/bulk')
+    api.add_resource(SystemMenuBatchResource, '/api/system_menus/batch')
+    api.add_resource(SystemMenuTreeResource, '/api/system_menus/tree')
 
     # System Roles
     api.add_resource(SystemRoleResource, '/api/system_roles/<int:role_id>')
@@ -175,6 +230,8 @@ def register_resources(api: Api):
     api.add_resource(SystemRoleDeleteResource, '/api/system_roles/delete/<int:role_id>')
     api.add_resource(SystemRoleListResource, '/api/system_roles/list')
     api.add_resource(SystemRolePageResource, '/api/system_roles/page')
+    api.add_resource(SystemRoleBulkResource, '/api/system_roles/bulk')
+    api.add_resource(SystemRoleBatchResource, '/api/system_roles/batch')
 
     # System Users
     api.add_resource(SystemUserResource, '/api/system_users/<int:user_id>')
@@ -183,6 +240,8 @@ def register_resources(api: Api):
     api.add_resource(SystemUserDeleteResource, '/api/system_users/delete/<int:user_id>')
     api.add_resource(SystemUserListResource, '/api/system_users/list')
     api.add_resource(SystemUserPageResource, '/api/system_users/page')
+    api.add_resource(SystemUserBulkResource, '/api/system_users/bulk')
+    api.add_resource(SystemUserBatchResource, '/api/system_users/batch')
 
     # System Permissions
     api.add_resource(SystemPermissionResource, '/api/system_permissions/<int:permission_id>')
@@ -191,6 +250,8 @@ def register_resources(api: Api):
     api.add_resource(SystemPermissionDeleteResource, '/api/system_permissions/delete/<int:permission_id>')
     api.add_resource(SystemPermissionListResource, '/api/system_permissions/list')
     api.add_resource(SystemPermissionPageResource, '/api/system_permissions/page')
+    api.add_resource(SystemPermissionBulkResource, '/api/system_permissions/bulk')
+    api.add_resource(SystemPermissionBatchResource, '/api/system_permissions/batch')
 
     # Role Permissions
     api.add_resource(RolePermissionResource, '/api/role_permissions/<int:rp_id>')
@@ -199,6 +260,8 @@ def register_resources(api: Api):
     api.add_resource(RolePermissionDeleteResource, '/api/role_permissions/delete/<int:rp_id>')
     api.add_resource(RolePermissionListResource, '/api/role_permissions/list')
     api.add_resource(RolePermissionPageResource, '/api/role_permissions/page')
+    api.add_resource(RolePermissionBulkResource, '/api/role_permissions/bulk')
+    api.add_resource(RolePermissionBatchResource, '/api/role_permissions/batch')
 
     # User Roles
     api.add_resource(UserRoleResource, '/api/user_roles/<int:ur_id>')
@@ -207,6 +270,12 @@ def register_resources(api: Api):
     api.add_resource(UserRoleDeleteResource, '/api/user_roles/delete/<int:ur_id>')
     api.add_resource(UserRoleListResource, '/api/user_roles/list')
     api.add_resource(UserRolePageResource, '/api/user_roles/page')
+    api.add_resource(UserRoleBulkResource, '/api/user_roles/bulk')
+    api.add_resource(UserRoleBatchResource, '/api/user_roles/batch')
+
+    # Tiles
+    api.add_resource(TileResource, '/api/tiles/<string:kind>/<int:record_id>/<int:z>/<int:x>/<int:y>.png')
+    api.add_resource(VectorTileResource, '/api/vt/<string:layer>/<int:z>/<int:x>/<int:y>.mvt')
     # print("Registered resources:", [(res.__name__, urls) for res, urls, _ in api.resources])
 
     return api
\ No newline at end of file
@@ -1,81 +1,70 @@
+from flask import current_app
 from flask_restful import Resource, reqparse
 from flasgger import swag_from
-from ..models import AnalysisResult
+from rasterio.errors import RasterioError
+import rasterio
+from ..models import AnalysisResult, Imagery, Plot
 from ..extensions import db
+from ..services.band_math import PRESETS, compile_indices, run_index_analysis
+from ..services.ndvi import run_ndvi_analysis
+from ..services.zonal import plots_in_extent, zonal_statistics, zone_row
+from .crud import CrudSpec, build_resources, build_bulk_resource, build_batch_resource, handle_request_parse_error
 import json
 from app.config import ERROR_CODES
 from werkzeug.exceptions import BadRequest
 
-def handle_request_parse_error(error):
-    """自定义 reqparse 错误处理，返回标准化的中文错误响应"""
-    message = str(error)
-    if hasattr(error, 'data') and error.data and 'message' in error.data:
-        for param, msg in error.data['message'].items():
-            return {'message': msg, 'error_code': ERROR_CODES['INVALID_PARAM_FORMAT']}, 400
-    param = message.split(':')[-1].strip() if ':' in message else 'unknown'
-    return {'message': f'参数不能为空：{param}', 'error_code': ERROR_CODES['INVALID_PARAM_FORMAT']}, 400
+analysis_result_spec = CrudSpec(
+    AnalysisResult,
+    label='分析结果',
+    id_arg='result_id',
+    docs=('analysis_results', 'result', 'results'),
+    fields=('name', 'description', 'type', 'result_path', 'field_id', 'imagery_id', 'bbox', 'stats', 'style'),
+    required=('name', 'result_path'),
+    embeds={'plot': ('field_id', Plot), 'imagery': ('imagery_id', Imagery)},
+    page_size=200
+)
 
-class AnalysisResultResource(Resource):
-    @swag_from('docs/analysis_results/get_result.yml')
-    def get(self, result_id):
+(AnalysisResultResource, AnalysisResultCreateResource, AnalysisResultUpdateResource, AnalysisResultDeleteResource,
+ AnalysisResultListResource, AnalysisResultPageResource) = build_resources(analysis_result_spec, 'AnalysisResult')
+AnalysisResultBulkResource = build_bulk_resource(analysis_result_spec, 'AnalysisResult')
+AnalysisResultBatchResource = build_batch_resource(analysis_result_spec, 'AnalysisResult')
+
+class AnalysisResultNdviResource(Resource):
+    @swag_from('docs/analysis_results/ndvi_result.yml')
+    def post(self, imagery_id):
         try:
-            result = AnalysisResult.query.get(result_id)
-            if not result:
+            imagery = Imagery.query.get(imagery_id)
+            if not imagery:
                 return {
-                    'message': f'记录不存在：ID={result_id}',
+                    'message': f'记录不存在：ID={imagery_id}',
                     'error_code': ERROR_CODES['NOT_FOUND']
                 }, 404
-            return {
-                'message': '分析结果获取成功',
-                'data': result.to_dict()
-            }, 200
-        except Exception as e:
-            return {
-                'message': f'数据库错误：{str(e)}',
-                'error_code': ERROR_CODES['DATABASE_ERROR']
-            }, 500
-
-class AnalysisResultCreateResource(Resource):
-    parser = reqparse.RequestParser()
-    parser.add_argument('name', type=str, required=True, help='参数不能为空：name', location='form')
-    parser.add_argument('description', type=str, required=False, location='form')
-    parser.add_argument('type', type=str, required=False, location='form')
-    parser.add_argument('result_path', type=str, required=True, help='参数不能为空：result_path', location='form')
-    parser.add_argument('field_id', type=int, required=False, location='form')
-    parser.add_argument('imagery_id', type=int, required=False, location='form')
-    parser.add_argument('bbox', type=str, required=False, location='form')
-    parser.add_argument('stats', type=str, required=False, location='form', help='统计数据需为JSON字符串')
-    parser.add_argument('style', type=str, required=False, location='form', help='样式需为JSON字符串')
-
-    @swag_from('docs/analysis_results/create_result.yml')
-    def post(self):
-        try:
-            args = self.parser.parse_args()
-            stats = json.loads(args['stats']) if args['stats'] else None
-            style = json.loads(args['style']) if args['style'] else None
-
-            result = AnalysisResult(
-                name=args['name'],
-                description=args['description'],
-                type=args['type'],
-                result_path=args['result_path'],
-                field_id=args['field_id'],
-                imagery_id=args['imagery_id'],
-                bbox=args['bbox'],
-                stats=stats,
-                style=style
+            if imagery.red_band_index is None or imagery.nir_band_index is None:
+                return {
+                    'message': '参数错误：影像未配置波段索引：red_band_index / nir_band_index',
+                    'error_code': ERROR_CODES['INVALID_PARAM_FORMAT']
+                }, 400
+            result = run_ndvi_analysis(
+                imagery,
+                current_app.config['ANALYSIS_OUTPUT_DIR'],
+                block_size=current_app.config['RASTER_BLOCK_SIZE']
             )
             db.session.add(result)
             db.session.commit()
-            return {'message': '分析结果创建成功', 'id': result.id}, 201
-        except json.JSONDecodeError as je:
-            db.session.rollback()
             return {
-                'message': f'JSON格式错误：{str(je)}',
+                'message': 'NDVI计算成功',
+                'data': result.to_dict()
+            }, 201
+        except ValueError as ve:
+            return {
+                'message': f'参数错误：{str(ve)}',
                 'error_code': ERROR_CODES['INVALID_PARAM_FORMAT']
             }, 400
-        except BadRequest as e:
-            return handle_request_parse_error(e)
+        except RasterioError as e:
+            return {
+                'message': f'栅格读取失败：{str(e)}',
+                'error_code': ERROR_CODES['RASTER_ERROR']
+            }, 500
         except Exception as e:
             db.session.rollback()
             return {
@@ -83,57 +72,66 @@ class AnalysisResultCreateResource(Resource):
                 'error_code': ERROR_CODES['DATABASE_ERROR']
             }, 500
 
-class AnalysisResultUpdateResource(Resource):
+class AnalysisResultIndexResource(Resource):
     parser = reqparse.RequestParser()
-    parser.add_argument('name', type=str, required=False, location='form')
-    parser.add_argument('description', type=str, required=False, location='form')
-    parser.add_argument('type', type=str, required=False, location='form')
-    parser.add_argument('result_path', type=str, required=False, location='form')
-    parser.add_argument('field_id', type=int, required=False, location='form')
-    parser.add_argument('imagery_id', type=int, required=False, location='form')
-    parser.add_argument('bbox', type=str, required=False, location='form')
-    parser.add_argument('stats', type=str, required=False, location='form', help='统计数据需为JSON字符串')
-    parser.add_argument('style', type=str, required=False, location='form', help='样式需为JSON字符串')
+    parser.add_argument('indices', type=str, required=True, help='参数不能为空：indices', location='form')
+    parser.add_argument('bands', type=str, required=False, help='波段映射需为JSON字符串', location='form')
 
-    @swag_from('docs/analysis_results/update_result.yml')
-    def put(self, result_id):
+    @swag_from('docs/analysis_results/index_result.yml')
+    def post(self, imagery_id):
         try:
             args = self.parser.parse_args()
-            result = AnalysisResult.query.get(result_id)
-            if not result:
+            indices = json.loads(args['indices'])
+            if isinstance(indices, (str, dict)):
+                indices = [indices]
+            if not isinstance(indices, list):
                 return {
-                    'message': f'记录不存在：ID={result_id}',
+                    'message': '参数错误：indices 需为指数名、指数定义对象或其数组',
+                    'error_code': ERROR_CODES['INVALID_PARAM_FORMAT']
+                }, 400
+            bands = json.loads(args['bands']) if args['bands'] else None
+            if bands is not None and not isinstance(bands, dict):
+                return {
+                    'message': '参数错误：波段映射需为JSON对象',
+                    'error_code': ERROR_CODES['INVALID_PARAM_FORMAT']
+                }, 400
+            expressions = compile_indices(indices)
+            imagery = Imagery.query.get(imagery_id)
+            if not imagery:
+                return {
+                    'message': f'记录不存在：ID={imagery_id}',
                     'error_code': ERROR_CODES['NOT_FOUND']
                 }, 404
-            if args['name'] is not None:
-                result.name = args['name']
-            if args['description'] is not None:
-                result.description = args['description']
-            if args['type'] is not None:
-                result.type = args['type']
-            if args['result_path'] is not None:
-                result.result_path = args['result_path']
-            if args['field_id'] is not None:
-                result.field_id = args['field_id']
-            if args['imagery_id'] is not None:
-                result.imagery_id = args['imagery_id']
-            if args['bbox'] is not None:
-                result.bbox = args['bbox']
-            if args['stats'] is not None:
-                result.stats = json.loads(args['stats']) if args['stats'] else None
-            if args['style'] is not None:
-                result.style = json.loads(args['style']) if args['style'] else None
+            results = run_index_analysis(
+                imagery,
+                expressions,
+                current_app.config['ANALYSIS_OUTPUT_DIR'],
+                block_size=current_app.config['RASTER_BLOCK_SIZE'],
+                band_overrides=bands
+            )
+            db.session.add_all(results)
             db.session.commit()
             return {
-                'message': '分析结果更新成功',
-                'id': result_id
-            }, 200
+                'message': '指数计算成功',
+                'data': [result.to_dict() for result in results]
+            }, 201
         except json.JSONDecodeError as je:
-            db.session.rollback()
             return {
                 'message': f'JSON格式错误：{str(je)}',
                 'error_code': ERROR_CODES['INVALID_PARAM_FORMAT']
             }, 400
+        except BadRequest as e:
+            return handle_request_parse_error(e)
+        except ValueError as ve:
+            return {
+                'message': f'参数错误：{str(ve)}',
+                'error_code': ERROR_CODES['INVALID_PARAM_FORMAT']
+            }, 400
+        except RasterioError as e:
+            return {
+                'message': f'栅格读取失败：{str(e)}',
+                'error_code': ERROR_CODES['RASTER_ERROR']
+            }, 500
         except Exception as e:
             db.session.rollback()
             return {
@@ -141,67 +139,60 @@ class AnalysisResultUpdateResource(Resource):
                 'error_code': ERROR_CODES['DATABASE_ERROR']
             }, 500
 
-class AnalysisResultDeleteResource(Resource):
-    @swag_from('docs/analysis_results/delete_result.yml')
-    def delete(self, result_id):
+class AnalysisResultZonalResource(Resource):
+    @swag_from('docs/analysis_results/zonal_result.yml')
+    def get(self, result_id):
         try:
+            parser = reqparse.RequestParser()
+            parser.add_argument('bins', type=int, default=20, location='args', help='直方图分组数必须为正整数')
+            args = parser.parse_args()
+            if args['bins'] < 1 or args['bins'] > 200:
+                return {
+                    'message': '直方图分组数必须在 1~200 之间',
+                    'error_code': ERROR_CODES['INVALID_PARAM_FORMAT']
+                }, 400
             result = AnalysisResult.query.get(result_id)
-            if not result:
+            if not result or not result.result_path:
                 return {
                     'message': f'记录不存在：ID={result_id}',
                     'error_code': ERROR_CODES['NOT_FOUND']
                 }, 404
-            db.session.delete(result)
-            db.session.commit()
+            stats = result.stats if isinstance(result.stats, dict) else {}
+            if result.type in PRESETS:
+                value_range = PRESETS[result.type][1]
+            elif stats.get('min') is not None and stats.get('max') is not None and stats['max'] > stats['min']:
+                value_range = (stats['min'], stats['max'])
+            else:
+                value_range = (-1.0, 1.0)
+            with rasterio.open(result.result_path) as src:
+                zones = zonal_statistics(
+                    src,
+                    lambda window: src.read(1, window=window, masked=True).astype('float32').filled(float('nan')),
+                    plots_in_extent(src, current_app.config['GEOMETRY_CRS']),
+                    value_range=value_range,
+                    bins=args['bins'],
+                    geometry_crs=current_app.config['GEOMETRY_CRS'],
+                    mask_dir=current_app.config['ZONAL_MASK_DIR'],
+                    block_size=current_app.config['RASTER_BLOCK_SIZE']
+                )
             return {
-                'message': '分析结果删除成功',
-                'id': result_id
+                'message': '地块统计获取成功',
+                'data': [zone_row(zone) for zone in zones]
             }, 200
-        except Exception as e:
-            db.session.rollback()
-            return {
-                'message': f'数据库错误：{str(e)}',
-                'error_code': ERROR_CODES['DATABASE_ERROR']
-            }, 500
-
-class AnalysisResultListResource(Resource):
-    @swag_from('docs/analysis_results/list_results.yml')
-    def get(self):
-        try:
-            results = AnalysisResult.query.all()
+        except BadRequest as e:
+            return handle_request_parse_error(e)
+        except ValueError as ve:
             return {
-                'message': '分析结果列表获取成功',
-                'data': [result.to_dict() for result in results]
-            }, 200
-        except Exception as e:
+                'message': f'参数错误：{str(ve)}',
+                'error_code': ERROR_CODES['INVALID_PARAM_FORMAT']
+            }, 400
+        except RasterioError as e:
             return {
-                'message': f'数据库错误：{str(e)}',
-                'error_code': ERROR_CODES['DATABASE_ERROR']
+                'message': f'栅格读取失败：{str(e)}',
+                'error_code': ERROR_CODES['RASTER_ERROR']
             }, 500
-
-class AnalysisResultPageResource(Resource):
-    @swag_from('docs/analysis_results/page_results.yml')
-    def get(self):
-        try:
-            parser = reqparse.RequestParser()
-            parser.add_argument('page', type=int, default=1, location='args', help='页码必须为正整数')
-            parser.add_argument('page_size', type=int, default=200, location='args', help='页面大小必须为正整数')
-            args = parser.parse_args()
-            if args['page'] < 1 or args['page_size'] < 1:
-                return {
-                    'message': '页码和页面大小必须为正整数',
-                    'error_code': ERROR_CODES['INVALID_PARAM_FORMAT']
-                }, 400
-            pagination = AnalysisResult.query.paginate(page=args['page'], per_page=args['page_size'], error_out=False)
-            return {
-                'message': '分页分析结果获取成功',
-                'data': [item.to_dict() for item in pagination.items],
-                'total': pagination.total,
-                'page': args['page'],
-                'page_size': args['page_size']
-            }, 200
         except Exception as e:
             return {
                 'message': f'数据库错误：{str(e)}',
                 'error_code': ERROR_CODES['DATABASE_ERROR']
-            }, 500
\ No newline at end of file
+            }, 500
@@ -3,12 +3,13 @@ from flask_restful import Resource, reqparse
 from flask_jwt_extended import create_access_token, create_refresh_token, jwt_required, get_jwt_identity,get_jwt
 from werkzeug.exceptions import BadRequest
 from sqlalchemy.exc import IntegrityError
-from werkzeug.security import generate_password_hash, check_password_hash
+from ..services import record_cache
+from ..services.passwords import PasswordHasherBusy, hash_password, needs_rehash, verify_password
 from ..models import SystemUser
 from app.config import ERROR_CODES
 import re
-from ..extensions import db,redis_client
-from datetime import timedelta
+from ..extensions import db
+from ..services.token_blocklist import token_blocklist
 import logging
 
 logger = logging.getLogger(__name__)
@@ -24,6 +25,13 @@ def handle_request_parse_error(error):
         'error_code': ERROR_CODES['INVALID_PARAM_FORMAT']
     }, 400
 
+def busy_response():
+    """密码哈希队列已满时的响应，提示客户端稍后重试"""
+    return {
+        'message': '服务繁忙，请稍后重试',
+        'error_code': ERROR_CODES['SERVICE_BUSY']
+    }, 503, {'Retry-After': '1'}
+
 def parse_email(value):
     """验证邮箱格式"""
     if value and not re.match(r'^[\w\.-]+@[\w\.-]+\.\w+$', value):
@@ -39,8 +47,13 @@ class LoginResource(Resource):
     def post(self):
         args = self.parser.parse_args()
         user = SystemUser.query.filter_by(username=args['username']).first()
-        if not user or not user.check_password(args['password']):
-            return {"message": "用户名或密码错误"}, 401
+        try:
+            if not user or not verify_password(user.password_hash, args['password']):
+                return {"message": "用户名或密码错误"}, 401
+        except PasswordHasherBusy:
+            return busy_response()
+        if needs_rehash(user.password_hash):
+            rehash_password(user, args['password'])
         access_token = create_access_token(identity=user.id)
         refresh_token = create_refresh_token(identity=user.id)
         return {
@@ -53,6 +66,18 @@ class LoginResource(Resource):
             
         }, 200
 
+def rehash_password(user, password):
+    """登录成功后按当前配置重新计算密码哈希；失败不影响登录"""
+    try:
+        user.password_hash = hash_password(password)
+        db.session.commit()
+        record_cache.invalidate(SystemUser, [user.id])
+    except PasswordHasherBusy:
+        logger.info(f"密码哈希繁忙，跳过重新哈希：id={user.id}")
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"密码重新哈希失败：id={user.id}，错误：{str(e)}")
+
 class RegisterResource(Resource):
     parser = reqparse.RequestParser()
     parser.add_argument('username', type=str, required=True, help='用户名不能为空', location='form')
@@ -72,7 +97,7 @@ class RegisterResource(Resource):
             user = SystemUser(
                 username=username,
                 email=args['email'],
-                password_hash=generate_password_hash(args['password']),
+                password_hash=hash_password(args['password']),
                 status='active'
             )
             db.session.add(user)
@@ -89,6 +114,8 @@ class RegisterResource(Resource):
         except BadRequest as e:
             logger.error(f"用户注册失败：参数解析错误：{str(e)}")
             return handle_request_parse_error(e)
+        except PasswordHasherBusy:
+            return busy_response()
         except Exception as e:
             db.session.rollback()
             logger.error(f"用户注册失败：username={username}, 错误：{str(e)}")
@@ -102,9 +129,8 @@ class RefreshResource(Resource):
     @swag_from('docs/auth/refresh.yml')
     def post(self):
         current_user = get_jwt_identity()
-        jti = get_jwt()['jti']
-        # 将 refresh_token 的 jti 加入黑名单，设置过期时间
-        redis_client.setex(f"blacklist:{jti}", timedelta(days=30), "revoked")
+        # 将 refresh_token 的 jti 加入黑名单，有效期为令牌剩余寿命
+        token_blocklist.revoke(get_jwt())
         new_access_token = create_access_token(identity=current_user)
         return {'code': 200, "message":"令牌刷新成功","data":{ "access_token": new_access_token }}, 200
 
@@ -112,7 +138,6 @@ class LogoutResource(Resource):
     @jwt_required()
     @swag_from('docs/auth/logout.yml')
     def post(self):
-        jti = get_jwt()['jti']
-        # 将 access_token 的 jti 加入黑名单，设置过期时间
-        redis_client.setex(f"blacklist:{jti}", timedelta(minutes=15), "revoked")
+        # 将 access_token 的 jti 加入黑名单，有效期为令牌剩余寿命
+        token_blocklist.revoke(get_jwt())
         return {'code': 200, "message": "注销成功"}, 200
\ No newline at end of file
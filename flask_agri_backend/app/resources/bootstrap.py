@@ -0,0 +1,48 @@
+import hashlib
+from flask import Response, current_app, request
+from flask_restful import Resource
+from flasgger import swag_from
+from flask_jwt_extended import get_jwt_identity, jwt_required
+from ..models import SystemRole
+from ..services.bootstrap import plot_summary, submit_all, task_summary
+from ..services.menu_tree import menu_tree
+from ..services.permissions import permission_engine
+from ..services.reference_cache import reference_snapshot
+from ..services.serializer import dumps
+from .crud import handle_errors
+from .system_users import system_user_spec
+
+
+class BootstrapResource(Resource):
+    prefix = dumps({'message': '启动数据获取成功'})[:-1] + b',"data":'
+
+    @jwt_required()
+    @swag_from('docs/bootstrap/bootstrap.yml')
+    @handle_errors
+    def get(self):
+        user_id = get_jwt_identity()
+        user = system_user_spec.load_cached(int(user_id))
+        # 概况查询在线程池中并发执行，同时在本线程从缓存组装用户、角色、权限与菜单
+        summaries = submit_all(
+            current_app._get_current_object(),
+            current_app.config['BOOTSTRAP_WORKERS'],
+            tasks=task_summary,
+            plots=plot_summary
+        )
+        roles = reference_snapshot(SystemRole)
+        role_rows = [role for role in map(roles.get, permission_engine.role_ids(user_id)) if role]
+        permissions = permission_engine.codes(user_id)
+        menus = menu_tree.encoded(user_id)
+        body = (
+            self.prefix + b'{"user":' + user
+            + b',"roles":' + dumps(role_rows)
+            + b',"permissions":' + dumps(permissions)
+            + b',"menus":' + menus
+            + b',"tasks":' + dumps(summaries['tasks'].result())
+            + b',"plots":' + dumps(summaries['plots'].result())
+            + b'}}'
+        )
+        response = Response(body, mimetype='application/json')
+        response.set_etag(hashlib.blake2b(body, digest_size=16).hexdigest())
+        response.headers['Cache-Control'] = 'private, no-cache'
+        return response.make_conditional(request)
@@ -0,0 +1,841 @@
+"""通用 CRUD 接口：按声明生成 获取 / 创建 / 更新 / 删除 / 列表 / 分页 六个资源类
+
+资源模块只声明可写字段、必填项、唯一约束与提示文案；字段类型与枚举取值从模型列推断，
+校验函数在声明时生成一次。参数错误、记录不存在、唯一约束冲突与数据库错误统一由 handle_errors 转换为响应。
+读取（load）、查询（query）、序列化（serialize）与写入后钩子（invalidate / reindex / after_commit / after_delete）集中在 CrudSpec 上，
+缓存、投影、批量操作、分页等逻辑在此实现一次即对所有资源生效。
+"""
+import json
+import logging
+from datetime import datetime
+from functools import wraps
+from flask import Response, current_app, request
+from flask_restful import Resource, inputs, reqparse
+from flasgger import swag_from
+from flask_jwt_extended import jwt_required
+from sqlalchemy import JSON, DateTime, Enum, Float, Integer, text, tuple_
+from sqlalchemy.exc import IntegrityError
+from werkzeug.exceptions import BadRequest
+from ..extensions import db
+from ..services import record_cache
+from ..services.permissions import require_permission
+from ..services.reference_cache import reference_snapshot
+from ..services.spatial_index import spatial_index, bbox_filter
+from ..services.pagination import paginate, add_pagination_arguments
+from ..services.streaming import stream_query, add_stream_argument
+from ..services.serializer import model_fields, serializer_for, serialize_records, dumps, json_response, add_fields_argument, parse_fields, project
+from app.config import ERROR_CODES
+
+logger = logging.getLogger(__name__)
+
+INSERT_CHUNK_SIZE = 500  # 多行 INSERT 每条语句的行数
+
+
+def handle_request_parse_error(error):
+    """处理 reqparse 验证错误"""
+    message = str(error)
+    if hasattr(error, 'data') and error.data and 'message' in error.data:
+        for param, msg in error.data['message'].items():
+            return {'message': msg, 'error_code': ERROR_CODES['INVALID_PARAM_FORMAT']}, 400
+    param = message.split(':')[-1].strip() if ':' in message else 'unknown'
+    return {
+        'message': f'参数错误：{param}' if ':' in message else message,
+        'error_code': ERROR_CODES['INVALID_PARAM_FORMAT']
+    }, 400
+
+
+class ApiError(Exception):
+    """接口错误，由 handle_errors 转换为 {'message', 'error_code'} 响应"""
+
+    def __init__(self, message, error_code='INVALID_PARAM_FORMAT', status=400):
+        super().__init__(message)
+        self.message = message
+        self.error_code = error_code
+        self.status = status
+
+    def response(self):
+        return {'message': self.message, 'error_code': ERROR_CODES[self.error_code]}, self.status
+
+
+def handle_errors(fn):
+    """统一的错误出口：参数错误返回 400，ApiError 按其状态码返回，其余错误回滚事务后返回 500"""
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        try:
+            return fn(*args, **kwargs)
+        except ApiError as e:
+            db.session.rollback()
+            return e.response()
+        except BadRequest as e:
+            return handle_request_parse_error(e)
+        except ValueError as ve:
+            db.session.rollback()
+            return {
+                'message': f'参数错误：{str(ve)}',
+                'error_code': ERROR_CODES['INVALID_PARAM_FORMAT']
+            }, 400
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"{fn.__qualname__} 失败：{str(e)}")
+            return {
+                'message': f'数据库错误：{str(e)}',
+                'error_code': ERROR_CODES['DATABASE_ERROR']
+            }, 500
+    return wrapper
+
+
+class Field:
+    """可写字段：name 为模型列名，arg 为表单参数名（默认与 name 相同），parse 为自定义转换函数"""
+
+    def __init__(self, name, arg=None, parse=None, help=None):
+        self.name = name
+        self.arg = arg or name
+        self.parse = parse
+        self.help = help
+
+
+def _compile_converter(column, field):
+    """按列类型生成转换函数：表单字符串与 JSON 原生值均可接受，失败时抛出 ApiError"""
+    arg = field.arg
+    column_type = column.type
+    if field.parse is not None:
+        parse = field.parse
+
+        def convert(value):
+            try:
+                return parse(value)
+            except (TypeError, ValueError) as e:
+                raise ApiError(field.help or str(e) or f'参数错误：{arg}')
+    elif isinstance(column_type, Enum):
+        choices = frozenset(column_type.enums)
+        message = field.help or f'无效的{arg}：可选 {", ".join(column_type.enums)}'
+
+        def convert(value):
+            if value not in choices:
+                raise ApiError(message)
+            return value
+    elif isinstance(column_type, JSON):
+        def convert(value):
+            if not isinstance(value, str):
+                return value
+            if not value:
+                return None
+            try:
+                return json.loads(value)
+            except json.JSONDecodeError as je:
+                raise ApiError(field.help or f'JSON格式错误：{arg}，{str(je)}')
+    elif isinstance(column_type, DateTime):
+        def convert(value):
+            if isinstance(value, datetime):
+                return value
+            if not value:
+                return None
+            try:
+                return datetime.fromisoformat(value.replace('Z', '+00:00'))
+            except (AttributeError, ValueError):
+                raise ApiError(field.help or f'无效的时间格式：{arg}，应为ISO格式')
+    elif isinstance(column_type, (Integer, Float)):
+        number = int if isinstance(column_type, Integer) else float
+        message = field.help or f'参数错误：{arg}必须为{"整数" if number is int else "数字"}'
+
+        def convert(value):
+            if value == '':
+                return None
+            if isinstance(value, bool):
+                raise ApiError(message)
+            try:
+                return number(value)
+            except (TypeError, ValueError):
+                raise ApiError(message)
+    else:
+        message = field.help or f'参数错误：{arg}必须为字符串'
+
+        def convert(value):
+            if not isinstance(value, str):
+                raise ApiError(message)
+            return value
+    return convert
+
+
+class CrudSpec:
+    """单个模型的 CRUD 声明
+
+    fields 为可写字段（列名或 Field），required 为创建时必填的列名，
+    unique 为 ((列名, ...), 提示模板) 列表，提示模板可引用这些列的值；
+    hidden 中的列不会被查询或返回；spatial=True 时维护 geom 的空间索引并支持 bbox 过滤；
+    protected 中的操作（get/create/update/delete/list/page）需要登录，批量读取（batch）随 get；
+    embeds 为 {名称: (外键列名, 目标模型)}，查询接口可通过 embed 参数内联引用的记录，每个关联只查询一次；
+    permissions 为 {操作: 权限编码}，对应操作需登录且拥有该权限（批量接口按 create/update/delete/get 对应）；
+    reference=True 表示小型参照表，获取、列表与批量读取由进程内快照提供（见 services.reference_cache）。
+    """
+
+    def __init__(self, model, label, id_arg, docs, fields, required=(), unique=(), hidden=(),
+                 defaults=None, spatial=False, protected=(), permissions=None, embeds=None, reference=False, page_size=10,
+                 conflict_message=None, delete_conflict_message=None):
+        self.model = model
+        self.label = label
+        self.id_arg = id_arg
+        self.doc_dir, self.doc_one, self.doc_many = docs
+        self.fields = [field if isinstance(field, Field) else Field(field) for field in fields]
+        columns = model.__table__.columns
+        self.writers = [(field.arg, field.name, _compile_converter(columns[field.name], field)) for field in self.fields]
+        self.required = frozenset(required)
+        self.unique = tuple(unique)
+        self.readable = [name for name in model_fields(model) if name not in hidden] if hidden else None
+        self.defaults = defaults or {}
+        self.spatial = spatial
+        self.protected = frozenset(protected)
+        self.permissions = permissions or {}
+        self.embeds = embeds or {}
+        self.reference = reference
+        self.page_size = page_size
+        self.conflict_message = conflict_message or f'记录已存在：{label}数据重复'
+        self.delete_conflict_message = delete_conflict_message or f'无法删除：{label}被其他记录引用'
+        self.messages = {
+            'get': f'{label}获取成功',
+            'create': f'{label}创建成功',
+            'update': f'{label}更新成功',
+            'delete': f'{label}删除成功',
+            'list': f'{label}列表获取成功',
+            'page': f'分页{label}获取成功',
+            'batch': f'批量获取{label}成功',
+        }
+
+    def doc(self, action):
+        name = self.doc_many if action in ('list', 'page', 'batch') or action.startswith('bulk_') else self.doc_one
+        return f'docs/{self.doc_dir}/{action}_{name}.yml'
+
+    # 读取
+
+    def add_query_arguments(self, parser):
+        """列表与分页接口的过滤参数"""
+        if self.spatial:
+            parser.add_argument('bbox', type=str, required=False, location='args', help='bbox 格式应为 minx,miny,maxx,maxy')
+        return parser
+
+    def query(self, args):
+        """列表与分页的基础查询"""
+        query = self.model.query
+        if self.spatial:
+            query = bbox_filter(query, self.model, args['bbox'])
+        return query
+
+    def parse_fields(self, value):
+        """解析 fields 参数，未指定时返回可见字段（无隐藏字段时为 None，表示全部）"""
+        return parse_fields(self.model, value, self.readable) or self.readable
+
+    def add_embed_argument(self, parser):
+        if self.embeds:
+            parser.add_argument('embed', type=str, required=False, location='args',
+                                help=f'embed 格式应为逗号分隔的关联名，可选：{", ".join(self.embeds)}')
+        return parser
+
+    def parse_embed(self, args):
+        """解析 embed 参数为关联名列表（去重并保持顺序）"""
+        value = args.get('embed')
+        if not value:
+            return []
+        names = list(dict.fromkeys(part.strip() for part in value.split(',') if part.strip()))
+        unknown = [name for name in names if name not in self.embeds]
+        if unknown:
+            raise ApiError(f'参数错误：未知的关联：{", ".join(unknown)}，可选：{", ".join(self.embeds)}')
+        return names
+
+    def load_fields(self, fields, embed):
+        """查询需要加载的列：输出字段加上内联关联所需的外键列"""
+        if not fields or not embed:
+            return fields
+        return list(dict.fromkeys([*fields, *(self.embeds[name][0] for name in embed)]))
+
+    def embed(self, records, rows, names, connection=None):
+        """为 rows（与 records 一一对应）内联关联记录：每个关联一次 IN 查询，引用不存在时为 null
+
+        connection 为执行查询的连接，默认使用当前会话；流式输出时会话连接正被服务端游标占用，需另取连接。
+        """
+        execute = connection.execute if connection is not None else db.session.execute
+        for name in names:
+            column, model = self.embeds[name]
+            ids = {getattr(record, column) for record in records} - {None}
+            table = model.__table__
+            targets = execute(table.select().where(table.c.id.in_(ids))).all() if ids else []
+            serialize = serializer_for(model, native_datetime=True)
+            embedded = {target.id: serialize(target) for target in targets}
+            for record, row in zip(records, rows):
+                row[name] = embedded.get(getattr(record, column))
+        return rows
+
+    def load(self, record_id, fields=None):
+        """按主键读取记录，不存在时抛出 404"""
+        record = project(self.model.query, self.model, fields).get(record_id)
+        if record is None:
+            raise ApiError(f'记录不存在：ID={record_id}', 'NOT_FOUND', 404)
+        return record
+
+    def load_many(self, ids, fields=None):
+        """按主键列表一次 IN 查询读取记录，返回 {id: 记录}，不存在的 id 不在结果中"""
+        if not ids:
+            return {}
+        query = project(self.model.query, self.model, fields).filter(self.model.id.in_(ids))
+        return {record.id: record for record in query}
+
+    def load_cached(self, record_id):
+        """读取记录的可见字段并序列化为 JSON 字节串，经 Redis 读穿缓存（参照表读取快照）；不存在时抛出 404"""
+        def load():
+            if self.reference:
+                row = reference_snapshot(self.model).get(record_id)
+                return dumps(row) if row is not None else None
+            record = project(self.model.query, self.model, self.readable).get(record_id)
+            if record is None:
+                return None
+            return dumps(serializer_for(self.model, self.readable, native_datetime=True)(record))
+
+        body = load() if self.reference else record_cache.read_through(self.model, record_id, load)
+        if body is None:
+            raise ApiError(f'记录不存在：ID={record_id}', 'NOT_FOUND', 404)
+        return body
+
+    def serialize(self, records, fields=None):
+        return serialize_records(records, fields)
+
+    def snapshot_rows(self, fields=None, ids=None):
+        """参照表快照中的记录（字段子集），ids 为 None 时返回全部，否则返回 {id: 记录}"""
+        snapshot = reference_snapshot(self.model)
+        pick = (lambda row: row) if fields is None else (lambda row: {name: row[name] for name in fields})
+        if ids is None:
+            return [pick(row) for row in snapshot.rows()]
+        found = ((record_id, snapshot.get(record_id)) for record_id in ids)
+        return {record_id: pick(row) for record_id, row in found if row is not None}
+
+    # 写入
+
+    def validate(self, data, creating):
+        """将表单（或 JSON 对象）转换为模型属性值；创建时检查必填项，更新时只保留传入的字段"""
+        values = {}
+        for arg, name, convert in self.writers:
+            value = data.get(arg)
+            if value is None:
+                if creating and name in self.required:
+                    raise ApiError(f'参数不能为空：{arg}', 'MISSING_REQUIRED_PARAM')
+                continue
+            values[name] = convert(value)
+        if creating:
+            for name, value in self.defaults.items():
+                if values.get(name) is None:
+                    values[name] = value
+        return values
+
+    def unique_conflicts(self, rows, records=None):
+        """唯一约束检查：rows 为待写入的值，records 为对应的已有记录（创建时为 None）
+
+        每个唯一约束只查询一次，同一批次内的重复值同样视为冲突，返回 {序号: 提示}。
+        """
+        conflicts = {}
+        for columns, message in self.unique:
+            keys = {}
+            seen = set()
+            for i, values in enumerate(rows):
+                record = records[i] if records else None
+                if record is not None and not any(column in values for column in columns):
+                    continue
+                key = tuple(values[column] if column in values else getattr(record, column, None) for column in columns)
+                if key in seen:
+                    conflicts.setdefault(i, message.format(**dict(zip(columns, key))))
+                else:
+                    seen.add(key)
+                    keys[i] = key
+            if not keys:
+                continue
+            attributes = [getattr(self.model, column) for column in columns]
+            target = tuple_(*attributes) if len(attributes) > 1 else attributes[0]
+            candidates = list(seen) if len(attributes) > 1 else [key[0] for key in seen]
+            owners = {}
+            for row in db.session.query(self.model.id, *attributes).filter(target.in_(candidates)):
+                owners.setdefault(tuple(row[1:]), set()).add(row[0])
+            for i, key in keys.items():
+                taken = owners.get(key, set()) - ({records[i].id} if records else set())
+                if taken:
+                    conflicts.setdefault(i, message.format(**dict(zip(columns, key))))
+        return conflicts
+
+    def check_unique(self, values, record=None):
+        conflicts = self.unique_conflicts([values], [record] if record is not None else None)
+        if conflicts:
+            raise ApiError(conflicts[0], 'INVALID_PARAM_KEY')
+
+    def commit(self, conflict_message):
+        try:
+            db.session.commit()
+        except IntegrityError:
+            db.session.rollback()
+            raise ApiError(conflict_message, 'INVALID_PARAM_KEY')
+
+    def create(self, data):
+        values = self.validate(data, creating=True)
+        self.check_unique(values)
+        record = self.model(**values)
+        db.session.add(record)
+        self.commit(self.conflict_message)
+        self.invalidate([record.id])
+        self.reindex(_geometries({record.id: values}))
+        self.after_commit(record, values, creating=True)
+        return record
+
+    def update(self, record, data):
+        values = self.validate(data, creating=False)
+        self.check_unique(values, record)
+        changes = {name: value for name, value in values.items() if getattr(record, name) != value}
+        for name, value in changes.items():
+            setattr(record, name, value)
+        self.commit(self.conflict_message)
+        if changes:
+            self.invalidate([record.id])
+            self.reindex(_geometries({record.id: changes}))
+        self.after_commit(record, changes, creating=False)
+        return record
+
+    def delete(self, record):
+        record_id = record.id
+        db.session.delete(record)
+        self.commit(self.delete_conflict_message)
+        self.invalidate([record_id])
+        self.reindex(removed=[record_id])
+        self.after_delete(record_id)
+
+    # 批量写入：单个事务，逐项返回结果；atomic=True 时任一项无效则不写入
+
+    def _validate_items(self, items, creating, records=None):
+        """逐项校验，返回 (结果列表, {序号: 值})，无效项的结果中带有错误信息"""
+        results = [None] * len(items)
+        valid = {}
+        for i, item in enumerate(items):
+            try:
+                if not isinstance(item, dict):
+                    raise ApiError('每一项必须为 JSON 对象')
+                if records is not None and records[i] is None:
+                    raise ApiError(f'记录不存在：ID={item.get("id")}', 'NOT_FOUND', 404)
+                valid[i] = self.validate(item, creating)
+            except ApiError as e:
+                results[i] = _item_error(i, e)
+        indexes = list(valid)
+        conflicts = self.unique_conflicts([valid[i] for i in indexes],
+                                          [records[i] for i in indexes] if records is not None else None)
+        for position, message in conflicts.items():
+            i = indexes[position]
+            results[i] = _item_error(i, ApiError(message, 'INVALID_PARAM_KEY'))
+            del valid[i]
+        return results, valid
+
+    def _insert_rows(self, rows):
+        """插入多行并返回新记录 id：按列集合分组执行多行 INSERT，自增 id 由 lastrowid 推算
+
+        不能推算时（MySQL innodb_autoinc_lock_mode=2）按各行都有值的唯一键回查 id，没有这样的唯一键时逐行插入。
+        """
+        mode = _insert_id_mode()
+        key = self._recovery_key(rows) if mode is None else None
+        if mode is None and key is None:
+            logger.warning(f"无法推算 {self.model.__tablename__} 多行 INSERT 的自增 id 且没有可回查的唯一键，逐行插入 {len(rows)} 行")
+            records = [self.model(**values) for values in rows]
+            db.session.add_all(records)
+            db.session.flush()
+            return [record.id for record in records]
+        table = self.model.__table__
+        rows = _with_defaults(table, rows)
+        ids = [None] * len(rows)
+        groups = {}
+        for i, values in enumerate(rows):
+            groups.setdefault(tuple(sorted(values)), []).append(i)
+        for indexes in groups.values():
+            for start in range(0, len(indexes), INSERT_CHUNK_SIZE):
+                chunk = indexes[start:start + INSERT_CHUNK_SIZE]
+                result = db.session.execute(table.insert().values([rows[i] for i in chunk]))
+                if mode is None:
+                    for i, record_id in zip(chunk, self._ids_by_key(key, [rows[i] for i in chunk])):
+                        ids[i] = record_id
+                    continue
+                first = result.lastrowid if mode == 'first' else result.lastrowid - len(chunk) + 1
+                for offset, i in enumerate(chunk):
+                    ids[i] = first + offset
+        return ids
+
+    def _recovery_key(self, rows):
+        """所有行都有非空值的第一个唯一键（列名元组），没有时返回 None"""
+        for columns, _ in self.unique:
+            if all(values.get(column) is not None for values in rows for column in columns):
+                return columns
+        return None
+
+    def _ids_by_key(self, columns, rows):
+        """按唯一键回查刚插入的行的 id，与 rows 顺序一致；同一键有多条时取最新的"""
+        attributes = [getattr(self.model, column) for column in columns]
+        target = tuple_(*attributes) if len(attributes) > 1 else attributes[0]
+        keys = [tuple(values[column] for column in columns) for values in rows]
+        candidates = keys if len(attributes) > 1 else [key[0] for key in keys]
+        found = {}
+        for row in db.session.query(self.model.id, *attributes).filter(target.in_(candidates)).order_by(self.model.id):
+            found[tuple(row[1:])] = row[0]
+        return [found[key] for key in keys]
+
+    def bulk_create(self, items, atomic=False):
+        results, valid = self._validate_items(items, creating=True)
+        if atomic and len(valid) < len(items):
+            return _skip_pending(results)
+        if valid:
+            indexes = list(valid)
+            ids = self._insert_rows([valid[i] for i in indexes])
+            self.commit(self.conflict_message)
+            self.invalidate(ids)
+            self.reindex(_geometries({record_id: valid[i] for i, record_id in zip(indexes, ids)}))
+            records = {record.id: record for record in self.model.query.filter(self.model.id.in_(ids))}
+            for i, record_id in zip(indexes, ids):
+                results[i] = {'index': i, 'id': record_id, 'status': 'created'}
+                if record_id in records:
+                    self.after_commit(records[record_id], valid[i], creating=True)
+        return results
+
+    def bulk_update(self, items, atomic=False):
+        ids = [_as_id(item.get('id')) if isinstance(item, dict) else None for item in items]
+        wanted = {record_id for record_id in ids if record_id is not None}
+        found = {record.id: record for record in self.model.query.filter(self.model.id.in_(wanted))} if wanted else {}
+        records = [found.get(record_id) for record_id in ids]
+        results, valid = self._validate_items(items, creating=False, records=records)
+        if atomic and len(valid) < len(items):
+            return _skip_pending(results)
+        changed = {}
+        for i, values in valid.items():
+            record = records[i]
+            changed[i] = {name: value for name, value in values.items() if getattr(record, name) != value}
+            for name, value in changed[i].items():
+                setattr(record, name, value)
+        # ORM 按变更的列集合分组，以 executemany 发出 UPDATE
+        self.commit(self.conflict_message)
+        updated = [i for i, changes in changed.items() if changes]
+        if updated:
+            self.invalidate({ids[i] for i in updated})
+            self.reindex(_geometries({ids[i]: changed[i] for i in updated}))
+            # 提交后记录已过期，一次查询刷新，避免钩子逐条加载
+            self.model.query.filter(self.model.id.in_({ids[i] for i in updated})).all()
+        for i, changes in changed.items():
+            results[i] = {'index': i, 'id': ids[i], 'status': 'updated' if changes else 'unchanged'}
+            if changes:
+                self.after_commit(records[i], changes, creating=False)
+        return results
+
+    def bulk_delete(self, ids, atomic=False):
+        record_ids = [_as_id(value) for value in ids]
+        wanted = {record_id for record_id in record_ids if record_id is not None}
+        existing = {row[0] for row in db.session.query(self.model.id).filter(self.model.id.in_(wanted))} if wanted else set()
+        results = []
+        for i, (value, record_id) in enumerate(zip(ids, record_ids)):
+            if record_id is None:
+                results.append(_item_error(i, ApiError(f'参数错误：无效的 ID：{json.dumps(value, ensure_ascii=False)}')))
+            elif record_id in existing:
+                results.append({'index': i, 'id': record_id, 'status': 'deleted'})
+            else:
+                results.append(_item_error(i, ApiError(f'记录不存在：ID={record_id}', 'NOT_FOUND', 404)))
+        if atomic and any('error' in result for result in results):
+            for result in results:
+                if result.get('status') == 'deleted':
+                    result['status'] = 'skipped'
+            return results
+        if existing:
+            table = self.model.__table__
+            db.session.execute(table.delete().where(table.c.id.in_(existing)))
+            self.commit(self.delete_conflict_message)
+            self.invalidate(existing)
+            self.reindex(removed=existing)
+            for record_id in existing:
+                self.after_delete(record_id)
+        return results
+
+    # 钩子
+
+    def invalidate(self, record_ids):
+        """写入提交后调用一次：参照表递增快照版本，其他表删除记录缓存"""
+        if self.reference:
+            reference_snapshot(self.model).bump()
+        else:
+            record_cache.invalidate(self.model, record_ids)
+
+    def reindex(self, geometries=None, removed=()):
+        """写入提交后调用一次：空间表按 {id: geom} 更新、按 id 移除本进程的空间索引，批量写入只递增一次版本号"""
+        if not self.spatial:
+            return
+        if geometries:
+            spatial_index(self.model).upsert_many(geometries)
+        if removed:
+            spatial_index(self.model).remove_many(removed)
+
+    def after_commit(self, record, changes, creating):
+        """逐条记录在写入提交后调用，changes 为实际变更的列"""
+
+    def after_delete(self, record_id):
+        """逐条记录在删除提交后调用"""
+
+
+def _as_id(value):
+    """批量接口中的记录 id：整数或数字字符串，其余返回 None"""
+    if isinstance(value, int) and not isinstance(value, bool):
+        return value
+    if isinstance(value, str) and value.isdigit():
+        return int(value)
+    return None
+
+
+def _with_defaults(table, rows):
+    """补齐列的 Python 端默认值，多行 INSERT 写入的记录与逐条 ORM 创建的一致，并使各行列集合相同"""
+    defaults = [column for column in table.columns if not column.primary_key and column.default is not None
+                and (column.default.is_scalar or column.default.is_callable)]
+    if not defaults:
+        return rows
+    filled = []
+    for values in rows:
+        row = dict(values)
+        for column in defaults:
+            if column.key not in row:
+                row[column.key] = column.default.arg(None) if column.default.is_callable else column.default.arg
+        filled.append(row)
+    return filled
+
+
+def _geometries(values_by_id):
+    """{id: 写入的值} 中写入了 geom 的记录，返回 {id: geom}"""
+    return {record_id: values['geom'] for record_id, values in values_by_id.items() if 'geom' in values}
+
+
+def _item_error(index, error):
+    return {'index': index, 'error': error.message, 'error_code': ERROR_CODES[error.error_code]}
+
+
+def _skip_pending(results):
+    """atomic 模式下未写入的有效项标记为 skipped"""
+    return [result or {'index': i, 'status': 'skipped'} for i, result in enumerate(results)]
+
+
+_id_mode = {}
+
+
+def _insert_id_mode():
+    """多行 INSERT 的自增 id 推算方式：'first'（lastrowid 为首行 id）、'last'（为末行 id），None 表示不能推算
+
+    MySQL 仅在 innodb_autoinc_lock_mode 为 0 / 1 时保证同一语句分配的 id 连续。
+    """
+    engine = db.engine
+    if engine.url not in _id_mode:
+        mode = None
+        if engine.dialect.name == 'sqlite':
+            mode = 'last'
+        elif engine.dialect.name == 'mysql':
+            lock_mode = db.session.execute(text('SELECT @@innodb_autoinc_lock_mode')).scalar()
+            mode = 'first' if lock_mode is not None and int(lock_mode) in (0, 1) else None
+        _id_mode[engine.url] = mode
+    return _id_mode[engine.url]
+
+
+def parse_ids(value):
+    """解析逗号分隔的 id 列表（去重并保持顺序），数量受 BULK_MAX_ITEMS 限制"""
+    parts = [part.strip() for part in (value or '').split(',') if part.strip()]
+    if not parts:
+        raise ApiError('参数不能为空：ids', 'MISSING_REQUIRED_PARAM')
+    invalid = [part for part in parts if _as_id(part) is None]
+    if invalid:
+        raise ApiError(f'参数错误：ids 必须为逗号分隔的整数，无效值：{", ".join(invalid)}')
+    ids = list(dict.fromkeys(int(part) for part in parts))
+    limit = current_app.config['BULK_MAX_ITEMS']
+    if len(ids) > limit:
+        raise ApiError(f'参数错误：单次最多 {limit} 项')
+    return ids
+
+
+def bulk_payload(name):
+    """批量接口的数组参数：JSON 请求体 {name: [...]}（或直接为数组），或表单中的 JSON 字符串"""
+    if request.is_json:
+        body = request.get_json(silent=True)
+        value = body.get(name) if isinstance(body, dict) else body
+    else:
+        raw = request.form.get(name)
+        if not raw:
+            raise ApiError(f'参数不能为空：{name}', 'MISSING_REQUIRED_PARAM')
+        try:
+            value = json.loads(raw)
+        except json.JSONDecodeError as je:
+            raise ApiError(f'JSON格式错误：{name}，{str(je)}')
+    if not isinstance(value, list):
+        raise ApiError(f'参数错误：{name}必须为数组')
+    limit = current_app.config['BULK_MAX_ITEMS']
+    if len(value) > limit:
+        raise ApiError(f'参数错误：单次最多 {limit} 项')
+    return value
+
+
+def _guard(spec, action, fn):
+    """按 spec 的 permissions / protected 为接口加上权限或登录检查"""
+    code = spec.permissions.get(action)
+    if code:
+        return require_permission(code)(fn)
+    if action in spec.protected:
+        return jwt_required()(fn)
+    return fn
+
+
+def build_resources(spec, prefix):
+    """按 spec 生成资源类，类名为 {prefix}Resource、{prefix}CreateResource 等
+
+    返回 (获取, 创建, 更新, 删除, 列表, 分页) 六个类。
+    """
+    get_parser = spec.add_embed_argument(add_fields_argument(reqparse.RequestParser()))
+    list_parser = spec.add_embed_argument(
+        add_fields_argument(add_stream_argument(spec.add_query_arguments(reqparse.RequestParser()))))
+    page_parser = reqparse.RequestParser()
+    page_parser.add_argument('page', type=int, default=1, location='args', help='页码必须为正整数')
+    page_parser.add_argument('page_size', type=int, default=spec.page_size, location='args', help='页面大小必须为正整数')
+    spec.add_embed_argument(add_fields_argument(add_pagination_arguments(spec.add_query_arguments(page_parser))))
+
+    get_prefix = dumps({'message': spec.messages['get']})[:-1] + b',"data":'
+
+    def endpoint(action, fn):
+        return _guard(spec, action, swag_from(spec.doc(action))(handle_errors(fn)))
+
+    def get(self, **view_args):
+        args = get_parser.parse_args()
+        fields = spec.parse_fields(args['fields'])
+        embed = spec.parse_embed(args)
+        record_id = view_args[spec.id_arg]
+        if embed:
+            record = spec.load(record_id, spec.load_fields(fields, embed))
+            return json_response({
+                'message': spec.messages['get'],
+                'data': spec.embed([record], spec.serialize([record], fields), embed)[0]
+            })
+        body = spec.load_cached(record_id)
+        if fields is None or fields == spec.readable:
+            return Response(get_prefix + body + b'}', mimetype='application/json')
+        row = json.loads(body)
+        return json_response({'message': spec.messages['get'], 'data': {name: row[name] for name in fields}})
+
+    def post(self):
+        record = spec.create(request.form)
+        return {'message': spec.messages['create'], 'id': record.id}, 201
+
+    def put(self, **view_args):
+        record_id = view_args[spec.id_arg]
+        spec.update(spec.load(record_id), request.form)
+        return {'message': spec.messages['update'], 'id': record_id}, 200
+
+    def delete(self, **view_args):
+        record_id = view_args[spec.id_arg]
+        spec.delete(spec.load(record_id))
+        return {'message': spec.messages['delete'], 'id': record_id}, 200
+
+    def get_list(self):
+        args = list_parser.parse_args()
+        fields = spec.parse_fields(args['fields'])
+        embed = spec.parse_embed(args)
+        if spec.reference and not args['stream']:
+            return json_response({'message': spec.messages['list'], 'data': spec.snapshot_rows(fields)})
+        query = project(spec.query(args), spec.model, spec.load_fields(fields, embed))
+        if args['stream']:
+            def decorate(records, rows):
+                with db.engine.connect() as connection:
+                    return spec.embed(records, rows, embed, connection)
+            return stream_query(query.order_by(spec.model.id), spec.messages['list'], args['stream'], fields,
+                                decorate=decorate if embed else None)
+        records = query.all()
+        return json_response({
+            'message': spec.messages['list'],
+            'data': spec.embed(records, spec.serialize(records, fields), embed)
+        })
+
+    def get_page(self):
+        args = page_parser.parse_args()
+        fields = spec.parse_fields(args['fields'])
+        embed = spec.parse_embed(args)
+        if args['page'] < 1 or args['page_size'] < 1:
+            raise ApiError('页码和页面大小必须为正整数')
+        items, meta = paginate(project(spec.query(args), spec.model, spec.load_fields(fields, embed)), spec.model, args)
+        return json_response({
+            'message': spec.messages['page'],
+            'data': spec.embed(items, spec.serialize(items, fields), embed),
+            **meta
+        })
+
+    methods = (
+        ('', 'get', 'get', get),
+        ('Create', 'create', 'post', post),
+        ('Update', 'update', 'put', put),
+        ('Delete', 'delete', 'delete', delete),
+        ('List', 'list', 'get', get_list),
+        ('Page', 'page', 'get', get_page),
+    )
+    return tuple(
+        type(f'{prefix}{suffix}Resource', (Resource,), {
+            verb: endpoint(action, fn),
+        })
+        for suffix, action, verb, fn in methods
+    )
+
+
+def build_bulk_resource(spec, prefix):
+    """按 spec 生成批量接口类 {prefix}BulkResource：POST 批量创建、PUT 批量更新、DELETE 批量删除"""
+    parser = reqparse.RequestParser()
+    parser.add_argument('atomic', type=inputs.boolean, default=False, location='args', help='atomic 必须为布尔值')
+
+    def respond(action, results):
+        failed = sum(1 for result in results if 'error' in result)
+        return json_response({
+            'message': f'批量{action}完成：成功 {len(results) - failed} 项，失败 {failed} 项',
+            'data': results,
+            'succeeded': len(results) - failed,
+            'failed': failed
+        })
+
+    def post(self):
+        atomic = parser.parse_args()['atomic']
+        return respond('创建', spec.bulk_create(bulk_payload('items'), atomic))
+
+    def put(self):
+        atomic = parser.parse_args()['atomic']
+        return respond('更新', spec.bulk_update(bulk_payload('items'), atomic))
+
+    def delete(self):
+        atomic = parser.parse_args()['atomic']
+        return respond('删除', spec.bulk_delete(bulk_payload('ids'), atomic))
+
+    def endpoint(action, fn):
+        return _guard(spec, action, swag_from(spec.doc(f'bulk_{action}'))(handle_errors(fn)))
+
+    return type(f'{prefix}BulkResource', (Resource,), {
+        'post': endpoint('create', post),
+        'put': endpoint('update', put),
+        'delete': endpoint('delete', delete),
+    })
+
+
+def build_batch_resource(spec, prefix):
+    """按 spec 生成批量读取接口类 {prefix}BatchResource：GET ?ids=1,2,3 以一次 IN 查询返回按 id 索引的记录"""
+    parser = spec.add_embed_argument(add_fields_argument(reqparse.RequestParser()))
+    parser.add_argument('ids', type=str, required=False, location='args', help='ids 必须为字符串')
+
+    def get(self):
+        args = parser.parse_args()
+        fields = spec.parse_fields(args['fields'])
+        embed = spec.parse_embed(args)
+        ids = parse_ids(args['ids'])
+        if spec.reference:
+            rows = spec.snapshot_rows(fields, ids)
+            return json_response({
+                'message': spec.messages['batch'],
+                'data': rows,
+                'missing': [record_id for record_id in ids if record_id not in rows]
+            })
+        records = spec.load_many(ids, spec.load_fields(fields, embed))
+        found = [records[record_id] for record_id in ids if record_id in records]
+        rows = spec.embed(found, spec.serialize(found, fields), embed)
+        return json_response({
+            'message': spec.messages['batch'],
+            'data': {record.id: row for record, row in zip(found, rows)},
+            'missing': [record_id for record_id in ids if record_id not in records]
+        })
+
+    return type(f'{prefix}BatchResource', (Resource,), {
+        'get': _guard(spec, 'get', swag_from(spec.doc('batch'))(handle_errors(get))),
+    })
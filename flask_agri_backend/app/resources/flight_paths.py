@@ -1,147 +1,158 @@
+from flask import current_app
 from flask_restful import Resource, reqparse
 from flasgger import swag_from
-from ..models import FlightPath
+from ..models import FlightPath, Plot
 from ..extensions import db
+from ..services.coverage import swath_spacing, plan_batch, route_bbox
+from ..services.geometry import cached_geometry, parse_geometry
+from .crud import CrudSpec, Field, build_resources, build_bulk_resource, build_batch_resource, handle_request_parse_error
 import json
 from app.config import ERROR_CODES
 from werkzeug.exceptions import BadRequest
 
-def handle_request_parse_error(error):
-    """自定义 reqparse 错误处理，返回标准化的中文错误响应"""
-    # 提取错误信息
-    message = str(error)
-    # 默认消息为 help 参数的内容
-    if hasattr(error, 'data') and error.data and 'message' in error.data:
-        for param, msg in error.data['message'].items():
-            return {
-                'message': msg,
-                'error_code': ERROR_CODES['INVALID_PARAM_FORMAT']
-            }, 400
-    # 回退到通用消息
-    param = message.split(':')[-1].strip() if ':' in message else 'unknown'
-    return {
-        'message': f'参数不能为空：{param}',
-        'error_code': ERROR_CODES['INVALID_PARAM_FORMAT']
-    }, 400
+flight_path_spec = CrudSpec(
+    FlightPath,
+    label='飞行路径',
+    id_arg='flight_path_id',
+    docs=('flight_paths', 'path', 'paths'),
+    fields=('name', 'description', 'geojson', 'bbox', 'altitude', 'speed', 'task_type',
+            Field('metadata_info', arg='metadata'), 'tags'),
+    required=('name',)
+)
 
-class FlightPathResource(Resource):
-    @swag_from('docs/flight_paths/get_path.yml')
-    def get(self, flight_path_id):
-        try:
-            flight_path = FlightPath.query.get(flight_path_id)
-            if not flight_path:
-                return {
-                    'message': f'记录不存在：ID={flight_path_id}',
-                    'error_code': ERROR_CODES['NOT_FOUND']
-                }, 404
-            return {
-                'message': '飞行路径获取成功',
-                'data': flight_path.to_dict()
-            }, 200
-        except Exception as e:
-            return {
-                'message': f'数据库错误：{str(e)}',
-                'error_code': ERROR_CODES['DATABASE_ERROR']
-            }, 500
+(FlightPathResource, FlightPathCreateResource, FlightPathUpdateResource, FlightPathDeleteResource,
+ FlightPathListResource, FlightPathPageResource) = build_resources(flight_path_spec, 'FlightPath')
+FlightPathBulkResource = build_bulk_resource(flight_path_spec, 'FlightPath')
+FlightPathBatchResource = build_batch_resource(flight_path_spec, 'FlightPath')
 
-class FlightPathCreateResource(Resource):
+class FlightPathPlanResource(Resource):
     parser = reqparse.RequestParser()
-    parser.add_argument('name', type=str, required=True, help='参数不能为空：name', location='form')
-    parser.add_argument('description', type=str, required=False, location='form')
-    parser.add_argument('geojson', type=str, required=False, location='form', help='GeoJSON必须为有效的JSON字符串')
-    parser.add_argument('bbox', type=str, required=False, location='form')
-    parser.add_argument('altitude', type=float, required=False, location='form')
-    parser.add_argument('speed', type=float, required=False, location='form')
-    parser.add_argument('task_type', type=str, required=False, location='form')
-    parser.add_argument('metadata', type=str, required=False, location='form', help='元数据必须为有效的JSON字符串')
-    parser.add_argument('tags', type=str, required=False, location='form', help='标签必须为有效的JSON字符串')
+    parser.add_argument('plot_ids', type=str, required=True, help='参数不能为空：plot_ids', location='form')
+    parser.add_argument('altitude', type=float, required=True, help='参数不能为空：altitude', location='form')
+    parser.add_argument('speed', type=float, required=True, help='参数不能为空：speed', location='form')
+    parser.add_argument('swath_width', type=float, required=False, location='form', help='喷幅必须为数字')
+    parser.add_argument('footprint_width', type=float, required=False, location='form', help='相机地面覆盖宽度必须为数字')
+    parser.add_argument('camera_fov', type=float, required=False, location='form', help='相机视场角必须为数字')
+    parser.add_argument('side_overlap', type=float, default=0.0, location='form', help='旁向重叠率必须为数字')
+    parser.add_argument('angle', type=float, required=False, location='form', help='作业方向必须为数字')
+    parser.add_argument('margin', type=float, default=0.0, location='form', help='边距必须为数字')
+    parser.add_argument('obstacles', type=str, required=False, location='form', help='障碍物必须为有效的JSON字符串')
+    parser.add_argument('obstacle_buffer', type=float, default=0.0, location='form', help='障碍物缓冲距离必须为数字')
+    parser.add_argument('task_type', type=str, default='coverage', location='form')
+    parser.add_argument('name', type=str, required=False, location='form')
 
-    @swag_from('docs/flight_paths/create_path.yml')
+    @swag_from('docs/flight_paths/plan_path.yml')
     def post(self):
         try:
             args = self.parser.parse_args()
-            geojson = json.loads(args['geojson']) if args['geojson'] else None
-            metadata = json.loads(args['metadata']) if args['metadata'] else None
-            tags = json.loads(args['tags']) if args['tags'] else None
+            plot_ids = json.loads(args['plot_ids'])
+            if not isinstance(plot_ids, list) or not plot_ids or \
+                    not all(isinstance(i, int) and not isinstance(i, bool) for i in plot_ids):
+                raise ValueError('plot_ids 必须为非空的整数数组')
+            plot_ids = list(dict.fromkeys(plot_ids))
+            max_plots = current_app.config['PLANNER_MAX_PLOTS']
+            if len(plot_ids) > max_plots:
+                raise ValueError(f'单次最多规划 {max_plots} 个地块')
+            if args['altitude'] <= 0 or args['speed'] <= 0:
+                raise ValueError('航高和速度必须大于 0')
+            spacing = swath_spacing(args['altitude'], args['swath_width'], args['footprint_width'],
+                                    args['camera_fov'], args['side_overlap'])
+            obstacles = []
+            items = json.loads(args['obstacles']) if args['obstacles'] else []
+            if not isinstance(items, list):
+                raise ValueError('obstacles 必须为几何数组（WKT 字符串或 GeoJSON 对象）')
+            for item in items:
+                if not isinstance(item, (str, dict)):
+                    raise ValueError(f'无效的障碍物几何：{item}（需为 WKT 字符串或 GeoJSON 对象）')
+                geometry = parse_geometry(item)
+                if geometry is None or geometry.is_empty:
+                    raise ValueError(f'无效的障碍物几何：{item}')
+                obstacles.append(geometry)
+
+            plots = {plot.id: plot for plot in Plot.query.filter(Plot.id.in_(plot_ids)).all()}
+            missing = [i for i in plot_ids if i not in plots]
+            if missing:
+                return {
+                    'message': f'记录不存在：ID={",".join(map(str, missing))}',
+                    'error_code': ERROR_CODES['NOT_FOUND']
+                }, 404
 
-            flight_path = FlightPath(
-                name=args['name'],
-                description=args['description'],
-                geojson=geojson,
-                bbox=args['bbox'],
-                altitude=args['altitude'],
-                speed=args['speed'],
-                task_type=args['task_type'],
-                metadata=metadata,
-                tags=tags
-            )
-            db.session.add(flight_path)
+            geometry_crs = current_app.config['GEOMETRY_CRS']
+            jobs, obstacle_counts = [], {}
+            for plot_id in plot_ids:
+                geometry = cached_geometry(plots[plot_id])
+                # 无缓冲时只传递与地块相交的障碍物，减少进程间序列化开销
+                nearby = obstacles if args['obstacle_buffer'] > 0 or geometry is None else \
+                    [o for o in obstacles if o.intersects(geometry)]
+                obstacle_counts[plot_id] = len(nearby)
+                jobs.append((plot_id, {
+                    'geometry': geometry,
+                    'geometry_crs': geometry_crs,
+                    'spacing': spacing,
+                    'angle': args['angle'],
+                    'margin': args['margin'],
+                    'obstacles': nearby,
+                    'obstacle_buffer': args['obstacle_buffer'],
+                }))
+            results = plan_batch(jobs, current_app.config['PLANNER_WORKERS'])
+
+            created, errors = [], []
+            for plot_id, plan, error in results:
+                if error:
+                    errors.append({'plot_id': plot_id, 'message': error})
+                    continue
+                plot = plots[plot_id]
+                stats = {key: value for key, value in plan.items() if key not in ('coordinates', 'bounds')}
+                flight_path = FlightPath(
+                    name=f'{args["name"] or plot.name or f"地块{plot_id}"} 覆盖航线',
+                    geojson={
+                        'type': 'Feature',
+                        'geometry': {'type': 'LineString', 'coordinates': plan['coordinates']},
+                        'properties': {'plot_id': plot_id, **stats}
+                    },
+                    bbox=route_bbox(plan['bounds']),
+                    altitude=args['altitude'],
+                    speed=args['speed'],
+                    task_type=args['task_type'],
+                    metadata_info={
+                        'plot_id': plot_id,
+                        'planner': {
+                            **stats,
+                            'side_overlap': args['side_overlap'],
+                            'margin': args['margin'],
+                            'obstacle_count': obstacle_counts[plot_id],
+                            'estimated_duration_s': round(plan['length_m'] / args['speed'], 1)
+                        }
+                    }
+                )
+                db.session.add(flight_path)
+                created.append((flight_path, plan))
             db.session.commit()
-            return {'message': '飞行路径创建成功', 'id': flight_path.id}, 201
+            data = [{
+                'id': flight_path.id,
+                'plot_id': flight_path.metadata_info['plot_id'],
+                'length_m': plan['length_m'],
+                'lanes': plan['lanes'],
+                'cells': plan['cells'],
+                'estimated_duration_s': flight_path.metadata_info['planner']['estimated_duration_s']
+            } for flight_path, plan in created]
+            if not created:
+                return {
+                    'message': '航线规划失败',
+                    'error_code': ERROR_CODES['INVALID_PARAM_FORMAT'],
+                    'errors': errors
+                }, 400
+            return {'message': '航线规划成功', 'data': data, 'errors': errors}, 201
         except json.JSONDecodeError as je:
-            db.session.rollback()
             return {
                 'message': f'JSON格式错误：{str(je)}',
                 'error_code': ERROR_CODES['INVALID_PARAM_FORMAT']
             }, 400
         except BadRequest as e:
             return handle_request_parse_error(e)
-        except Exception as e:
-            db.session.rollback()
-            return {
-                'message': f'数据库错误：{str(e)}',
-                'error_code': ERROR_CODES['DATABASE_ERROR']
-            }, 500
-
-class FlightPathUpdateResource(Resource):
-    parser = reqparse.RequestParser()
-    parser.add_argument('name', type=str, required=False, location='form')
-    parser.add_argument('description', type=str, required=False, location='form')
-    parser.add_argument('geojson', type=str, required=False, location='form', help='GeoJSON必须为有效的JSON字符串')
-    parser.add_argument('bbox', type=str, required=False, location='form')
-    parser.add_argument('altitude', type=float, required=False, location='form')
-    parser.add_argument('speed', type=float, required=False, location='form')
-    parser.add_argument('task_type', type=str, required=False, location='form')
-    parser.add_argument('metadata', type=str, required=False, location='form', help='元数据必须为有效的JSON字符串')
-    parser.add_argument('tags', type=str, required=False, location='form', help='标签必须为有效的JSON字符串')
-
-    @swag_from('docs/flight_paths/update_path.yml')
-    def put(self, flight_path_id):
-        try:
-            args = self.parser.parse_args()
-            flight_path = FlightPath.query.get(flight_path_id)
-            if not flight_path:
-                return {
-                    'message': f'记录不存在：ID={flight_path_id}',
-                    'error_code': ERROR_CODES['NOT_FOUND']
-                }, 404
-            if args['name'] is not None:
-                flight_path.name = args['name']
-            if args['description'] is not None:
-                flight_path.description = args['description']
-            if args['geojson'] is not None:
-                flight_path.geojson = json.loads(args['geojson']) if args['geojson'] else None
-            if args['bbox'] is not None:
-                flight_path.bbox = args['bbox']
-            if args['altitude'] is not None:
-                flight_path.altitude = args['altitude']
-            if args['speed'] is not None:
-                flight_path.speed = args['speed']
-            if args['task_type'] is not None:
-                flight_path.task_type = args['task_type']
-            if args['metadata'] is not None:
-                flight_path.metadata = json.loads(args['metadata']) if args['metadata'] else None
-            if args['tags'] is not None:
-                flight_path.tags = json.loads(args['tags']) if args['tags'] else None
-            db.session.commit()
-            return {
-                'message': '飞行路径更新成功',
-                'id': flight_path_id
-            }, 200
-        except json.JSONDecodeError as je:
-            db.session.rollback()
+        except ValueError as ve:
             return {
-                'message': f'JSON格式错误：{str(je)}',
+                'message': f'参数错误：{str(ve)}',
                 'error_code': ERROR_CODES['INVALID_PARAM_FORMAT']
             }, 400
         except Exception as e:
@@ -150,68 +161,3 @@ class FlightPathUpdateResource(Resource):
                 'message': f'数据库错误：{str(e)}',
                 'error_code': ERROR_CODES['DATABASE_ERROR']
             }, 500
-
-class FlightPathDeleteResource(Resource):
-    @swag_from('docs/flight_paths/delete_path.yml')
-    def delete(self, flight_path_id):
-        try:
-            flight_path = FlightPath.query.get(flight_path_id)
-            if not flight_path:
-                return {
-                    'message': f'记录不存在：ID={flight_path_id}',
-                    'error_code': ERROR_CODES['NOT_FOUND']
-                }, 404
-            db.session.delete(flight_path)
-            db.session.commit()
-            return {
-                'message': '飞行路径删除成功',
-                'id': flight_path_id
-            }, 200
-        except Exception as e:
-            db.session.rollback()
-            return {
-                'message': f'数据库错误：{str(e)}',
-                'error_code': ERROR_CODES['DATABASE_ERROR']
-            }, 500
-
-class FlightPathListResource(Resource):
-    @swag_from('docs/flight_paths/list_paths.yml')
-    def get(self):
-        try:
-            flight_paths = FlightPath.query.all()
-            return {
-                'message': '飞行路径列表获取成功',
-                'data': [flight_path.to_dict() for flight_path in flight_paths]
-            }, 200
-        except Exception as e:
-            return {
-                'message': f'数据库错误：{str(e)}',
-                'error_code': ERROR_CODES['DATABASE_ERROR']
-            }, 500
-
-class FlightPathPageResource(Resource):
-    @swag_from('docs/flight_paths/page_paths.yml')
-    def get(self):
-        try:
-            parser = reqparse.RequestParser()
-            parser.add_argument('page', type=int, default=1, location='args', help='页码必须为正整数')
-            parser.add_argument('page_size', type=int, default=10, location='args', help='页面大小必须为正整数')
-            args = parser.parse_args()
-            if args['page'] < 1 or args['page_size'] < 1:
-                return {
-                    'message': '页码和页面大小必须为正整数',
-                    'error_code': ERROR_CODES['INVALID_PARAM_FORMAT']
-                }, 400
-            pagination = FlightPath.query.paginate(page=args['page'], per_page=args['page_size'], error_out=False)
-            return {
-                'message': '分页飞行路径获取成功',
-                'data': [item.to_dict() for item in pagination.items],
-                'total': pagination.total,
-                'page': args['page'],
-                'page_size': args['page_size']
-            }, 200
-        except Exception as e:
-            return {
-                'message': f'数据库错误：{str(e)}',
-                'error_code': ERROR_CODES['DATABASE_ERROR']
-            }, 500
\ No newline at end of file
@@ -0,0 +1,96 @@
+import hashlib
+from flask import request, make_response, current_app
+from flask_restful import Resource
+from flasgger import swag_from
+from rasterio.errors import RasterioError
+from ..models import Imagery, AnalysisResult
+from ..services.tiles import get_tile, valid_tile
+from ..services.vector_tiles import LAYERS, render_vector_tile
+from app.config import ERROR_CODES
+
+TILE_SOURCES = {
+    'imagery': (Imagery, 'file_path'),
+    'analysis': (AnalysisResult, 'result_path'),
+}
+
+class TileResource(Resource):
+    @swag_from('docs/tiles/get_tile.yml')
+    def get(self, kind, record_id, z, x, y):
+        try:
+            if kind not in TILE_SOURCES:
+                return {
+                    'message': f'无效的瓦片类型：{kind}，可选：{", ".join(TILE_SOURCES)}',
+                    'error_code': ERROR_CODES['INVALID_PARAM_FORMAT']
+                }, 400
+            if not valid_tile(z, x, y):
+                return {
+                    'message': f'无效的瓦片坐标：{z}/{x}/{y}',
+                    'error_code': ERROR_CODES['INVALID_PARAM_FORMAT']
+                }, 400
+            model, path_column = TILE_SOURCES[kind]
+            record = model.query.get(record_id)
+            if not record or not getattr(record, path_column):
+                return {
+                    'message': f'记录不存在：ID={record_id}',
+                    'error_code': ERROR_CODES['NOT_FOUND']
+                }, 404
+            data, etag = get_tile(kind, record, z, x, y, current_app.config['GEOMETRY_CRS'])
+            if request.if_none_match.contains(etag):
+                response = make_response('', 304)
+            else:
+                response = make_response(data)
+                response.headers['Content-Type'] = 'image/png'
+            response.set_etag(etag)
+            response.headers['Cache-Control'] = 'no-cache'
+            return response
+        except ValueError as ve:
+            return {
+                'message': f'参数错误：{str(ve)}',
+                'error_code': ERROR_CODES['INVALID_PARAM_FORMAT']
+            }, 400
+        except RasterioError as e:
+            return {
+                'message': f'栅格读取失败：{str(e)}',
+                'error_code': ERROR_CODES['RASTER_ERROR']
+            }, 500
+        except Exception as e:
+            return {
+                'message': f'数据库错误：{str(e)}',
+                'error_code': ERROR_CODES['DATABASE_ERROR']
+            }, 500
+
+
+class VectorTileResource(Resource):
+    @swag_from('docs/tiles/get_vector_tile.yml')
+    def get(self, layer, z, x, y):
+        try:
+            if layer not in LAYERS:
+                return {
+                    'message': f'无效的图层：{layer}，可选：{", ".join(LAYERS)}',
+                    'error_code': ERROR_CODES['INVALID_PARAM_FORMAT']
+                }, 400
+            if not valid_tile(z, x, y):
+                return {
+                    'message': f'无效的瓦片坐标：{z}/{x}/{y}',
+                    'error_code': ERROR_CODES['INVALID_PARAM_FORMAT']
+                }, 400
+            data = render_vector_tile(layer, z, x, y, current_app.config['GEOMETRY_CRS'])
+            etag = hashlib.sha1(data).hexdigest()
+            if request.if_none_match.contains(etag):
+                response = make_response('', 304)
+            else:
+                response = make_response(data)
+                response.headers['Content-Type'] = 'application/vnd.mapbox-vector-tile'
+            response.set_etag(etag)
+            response.headers['Cache-Control'] = 'no-cache'
+            return response
+        except ValueError as ve:
+            return {
+                'message': f'参数错误：{str(ve)}',
+                'error_code': ERROR_CODES['INVALID_PARAM_FORMAT']
+            }, 400
+        except Exception as e:
+            return {
+                'message': f'数据库错误：{str(e)}',
+                'error_code': ERROR_CODES['DATABASE_ERROR']
+            }, 500
@@ -0,0 +1,281 @@
+"""多光谱指数波段运算引擎
+
+表达式（如 "(nir - red) / (nir + red)"）只编译一次，生成基于寄存器的 ufunc 指令序列；
+逐窗口求值时每条指令都写入预分配的缓冲区（out=），不产生逐运算的临时数组。
+多个表达式共享一次窗口读取，一遍扫描像元即可得到全部指数。
+"""
+import ast
+import math
+import os
+import re
+from datetime import datetime
+import numpy as np
+import rasterio
+from ..models import AnalysisResult
+from .raster import iter_windows, bounds_to_wkt, float_profile, StatsAccumulator
+
+# 内置指数：表达式与统计直方图的取值范围
+PRESETS = {
+    'ndvi': ('(nir - red) / (nir + red)', (-1.0, 1.0)),
+    'ndre': ('(nir - red_edge) / (nir + red_edge)', (-1.0, 1.0)),
+    'gndvi': ('(nir - green) / (nir + green)', (-1.0, 1.0)),
+    'savi': ('1.5 * (nir - red) / (nir + red + 0.5)', (-1.5, 1.5)),
+    'evi': ('2.5 * (nir - red) / (nir + 6 * red - 7.5 * blue + 1)', (-1.0, 1.0)),
+}
+
+_BINARY_OPS = {
+    ast.Add: np.add,
+    ast.Sub: np.subtract,
+    ast.Mult: np.multiply,
+    ast.Div: np.true_divide,
+    ast.Pow: np.power,
+}
+_UNARY_OPS = {
+    ast.USub: np.negative,
+}
+_FUNCTIONS = {
+    'sqrt': np.sqrt,
+    'abs': np.abs,
+    'log': np.log,
+    'exp': np.exp,
+    'min': np.minimum,
+    'max': np.maximum,
+}
+
+_BAND, _CONST, _REG = 'band', 'const', 'reg'
+_NAME_PATTERN = re.compile(r'^[A-Za-z][A-Za-z0-9_]{0,31}$')
+
+
+class CompiledExpression:
+    """编译后的波段表达式"""
+
+    def __init__(self, source, value_range=(-1.0, 1.0)):
+        self.source = source
+        self.value_range = tuple(value_range)
+        try:
+            tree = ast.parse(source, mode='eval')
+        except SyntaxError as e:
+            raise ValueError(f'表达式语法错误：{source}（{e.msg}）')
+        self.bands = set()
+        self.program = []
+        self._free = []
+        self.registers = 0
+        self.result = self._compile(tree.body)
+
+    def _alloc(self):
+        if self._free:
+            return self._free.pop()
+        self.registers += 1
+        return self.registers - 1
+
+    def _release(self, operand):
+        if operand[0] == _REG:
+            self._free.append(operand[1])
+
+    def _target(self, *operands):
+        """复用第一个寄存器操作数作为输出，其余寄存器归还"""
+        regs = [op for op in operands if op[0] == _REG]
+        if not regs:
+            return self._alloc()
+        for op in regs[1:]:
+            self._release(op)
+        return regs[0][1]
+
+    def _compile(self, node):
+        if isinstance(node, ast.Constant) and isinstance(node.value, (int, float)) \
+                and not isinstance(node.value, bool):
+            return (_CONST, np.float32(node.value))
+        if isinstance(node, ast.Name):
+            self.bands.add(node.id)
+            return (_BAND, node.id)
+        if isinstance(node, ast.BinOp) and type(node.op) in _BINARY_OPS:
+            left = self._compile(node.left)
+            right = self._compile(node.right)
+            out = self._target(left, right)
+            self.program.append((_BINARY_OPS[type(node.op)], out, (left, right)))
+            return (_REG, out)
+        if isinstance(node, ast.UnaryOp) and type(node.op) in _UNARY_OPS:
+            operand = self._compile(node.operand)
+            out = self._target(operand)
+            self.program.append((_UNARY_OPS[type(node.op)], out, (operand,)))
+            return (_REG, out)
+        if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.UAdd):
+            return self._compile(node.operand)
+        if isinstance(node, ast.Call) and isinstance(node.func, ast.Name) \
+                and node.func.id in _FUNCTIONS and not node.keywords:
+            func = _FUNCTIONS[node.func.id]
+            if len(node.args) != func.nin:
+                raise ValueError(f'函数参数个数错误：{node.func.id} 需要 {func.nin} 个参数')
+            args = [self._compile(arg) for arg in node.args]
+            out = self._target(*args)
+            self.program.append((func, out, tuple(args)))
+            return (_REG, out)
+        raise ValueError(f'表达式包含不支持的语法：{ast.dump(node)[:60]}')
+
+    def evaluate(self, bands, buffers, out):
+        """在窗口数据上求值，结果写入 out；buffers 为至少 self.registers 个同形数组"""
+        def resolve(operand):
+            kind, value = operand
+            if kind == _BAND:
+                return bands[value]
+            if kind == _CONST:
+                return value
+            return buffers[value]
+
+        for func, target, operands in self.program:
+            func(*[resolve(op) for op in operands], out=buffers[target])
+        np.copyto(out, resolve(self.result))
+        out[~np.isfinite(out)] = np.nan
+        return out
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool) and math.isfinite(value)
+
+
+def compile_indices(specs):
+    """解析指数定义列表，返回 {名称: CompiledExpression}
+
+    每项可为内置指数名（如 'ndre'），或 {'name', 'expression', 'range'} 自定义公式。
+    """
+    if not specs:
+        raise ValueError('参数不能为空：indices')
+    compiled = {}
+    for spec in specs:
+        if isinstance(spec, str):
+            key = spec.lower()
+            if key not in PRESETS:
+                raise ValueError(f'未知的指数：{spec}，可选：{", ".join(PRESETS)}')
+            expression, value_range = PRESETS[key]
+            compiled[key] = CompiledExpression(expression, value_range)
+        elif isinstance(spec, dict) and spec.get('name') and spec.get('expression'):
+            if not isinstance(spec['name'], str) or not _NAME_PATTERN.match(spec['name']):
+                raise ValueError(f'无效的指数名称：{spec["name"]}（仅限字母、数字和下划线）')
+            if spec['name'].lower() in PRESETS:
+                raise ValueError(f'指数名称与内置指数重复：{spec["name"]}，自定义公式请使用其他名称')
+            if spec['name'] in compiled:
+                raise ValueError(f'指数名称重复：{spec["name"]}')
+            if not isinstance(spec['expression'], str):
+                raise ValueError(f'无效的表达式：{spec["expression"]}（需为字符串）')
+            value_range = spec.get('range') or (-1.0, 1.0)
+            if not isinstance(value_range, (list, tuple)) or len(value_range) != 2 \
+                    or not all(_is_number(value) for value in value_range) \
+                    or float(value_range[0]) >= float(value_range[1]):
+                raise ValueError(f'无效的取值范围：{value_range}')
+            compiled[spec['name']] = CompiledExpression(
+                spec['expression'], (float(value_range[0]), float(value_range[1])))
+        else:
+            raise ValueError(f'无效的指数定义：{spec}')
+    for name, expr in compiled.items():
+        if not expr.bands:
+            raise ValueError(f'表达式未引用任何波段：{name}')
+    return compiled
+
+
+def resolve_band_map(imagery, overrides=None):
+    """汇总影像的波段名到波段序号（1 起始）的映射
+
+    优先级：请求参数 > metadata_info['bands'] > red_band_index / nir_band_index。
+    """
+    band_map = {}
+    if imagery.red_band_index is not None:
+        band_map['red'] = imagery.red_band_index
+    if imagery.nir_band_index is not None:
+        band_map['nir'] = imagery.nir_band_index
+    metadata = imagery.metadata_info if isinstance(imagery.metadata_info, dict) else {}
+    band_map.update(metadata.get('bands') or {})
+    band_map.update(overrides or {})
+    return {name: int(index) for name, index in band_map.items()}
+
+
+def _band_indexes(src, names, band_map):
+    """将波段名解析为源栅格中的波段序号并校验"""
+    missing = [name for name in names if name not in band_map]
+    if missing:
+        raise ValueError(f'影像未配置波段：{", ".join(missing)}')
+    indexes = [band_map[name] for name in names]
+    for index in indexes:
+        if index < 1 or index > src.count:
+            raise ValueError(f'波段序号超出范围：{index}（共 {src.count} 个波段）')
+    return indexes
+
+
+def index_window_reader(src, expr, band_map):
+    """返回按窗口读取所需波段并计算指数的函数，结果为 float32，无效像元为 NaN"""
+    names = sorted(expr.bands)
+    indexes = _band_indexes(src, names, band_map)
+
+    def read(window):
+        data = src.read(indexes, window=window, masked=True)
+        shape = data.shape[1:]
+        buffers = [np.empty(shape, dtype=np.float32) for _ in range(expr.registers)]
+        out = np.empty(shape, dtype=np.float32)
+        with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+            expr.evaluate(dict(zip(names, data.data.astype(np.float32, copy=False))), buffers, out)
+        out[np.ma.getmaskarray(data).any(axis=0)] = np.nan
+        return out
+    return read
+
+
+def evaluate_indices(src_path, expressions, band_map, dst_paths, block_size=1024):
+    """单遍扫描影像，逐窗口计算全部表达式并分别写出，返回 ({名称: 统计}, 范围 WKT)"""
+    needed = sorted(set().union(*(expr.bands for expr in expressions.values())))
+    registers = max(expr.registers for expr in expressions.values())
+    accumulators = {name: StatsAccumulator(expr.value_range) for name, expr in expressions.items()}
+
+    with rasterio.open(src_path) as src:
+        indexes = _band_indexes(src, needed, band_map)
+        profile = float_profile(src)
+        outputs = {}
+        try:
+            for name, path in dst_paths.items():
+                os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+                outputs[name] = rasterio.open(path, 'w', **profile)
+            shape, buffers, result = None, None, None
+            with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+                for window in iter_windows(src.width, src.height, block_size):
+                    data = src.read(indexes, window=window, masked=True)
+                    masks = dict(zip(needed, np.ma.getmaskarray(data)))
+                    if data.shape[1:] != shape:
+                        # 仅在窗口尺寸变化（右/下边缘）时重新分配缓冲区
+                        shape = data.shape[1:]
+                        buffers = [np.empty(shape, dtype=np.float32) for _ in range(registers)]
+                        result = np.empty(shape, dtype=np.float32)
+                    values = data.data.astype(np.float32, copy=False)
+                    bands = dict(zip(needed, values))
+                    for name, expr in expressions.items():
+                        expr.evaluate(bands, buffers, result)
+                        for band in expr.bands:
+                            result[masks[band]] = np.nan
+                        accumulators[name].update(result[~np.isnan(result)])
+                        outputs[name].write(result, 1, window=window)
+        finally:
+            for dst in outputs.values():
+                dst.close()
+        extent = bounds_to_wkt(src.bounds)
+    return {name: acc.result() for name, acc in accumulators.items()}, extent
+
+
+def run_index_analysis(imagery, expressions, output_dir, block_size=1024, band_overrides=None):
+    """对影像记录计算一组指数，返回未提交的 AnalysisResult 列表（与 expressions 顺序一致）"""
+    if not imagery.file_path:
+        raise ValueError('影像未配置文件路径：file_path')
+    band_map = resolve_band_map(imagery, band_overrides)
+    stamp = datetime.now().strftime('%Y%m%d%H%M%S')
+    dst_paths = {
+        name: os.path.join(output_dir, f'{name}_imagery{imagery.id}_{stamp}.tif')
+        for name in expressions
+    }
+    stats, extent = evaluate_indices(imagery.file_path, expressions, band_map, dst_paths, block_size)
+    return [
+        AnalysisResult(
+            name=f'{imagery.name or imagery.id} {name.upper()}',
+            description=expr.source,
+            type=name,
+            result_path=dst_paths[name],
+            imagery_id=imagery.id,
+            bbox=extent,
+            stats=stats[name]
+        )
+        for name, expr in expressions.items()
+    ]
@@ -0,0 +1,61 @@
+"""前端启动数据：任务与地块概况查询，并发执行
+
+每个查询在线程池中以独立的应用上下文与数据库会话执行，完成后释放会话。
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from sqlalchemy import func
+from ..extensions import db
+from ..models import Plot, Task
+from .serializer import serializer_for
+
+ACTIVE_TASK_STATUSES = ('pending', 'running')
+ACTIVE_TASK_LIMIT = 20
+ACTIVE_TASK_FIELDS = ('id', 'name', 'type', 'status', 'field_id', 'path_id', 'schedule_at')
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def task_summary():
+    """任务总数、各状态数量及最近的待执行 / 执行中任务"""
+    by_status = {status: count for status, count in db.session.query(Task.status, func.count(Task.id)).group_by(Task.status)}
+    active = (Task.query.filter(Task.status.in_(ACTIVE_TASK_STATUSES))
+              .with_entities(*[getattr(Task, name) for name in ACTIVE_TASK_FIELDS])
+              .order_by(Task.schedule_at.is_(None), Task.schedule_at, Task.id)
+              .limit(ACTIVE_TASK_LIMIT))
+    serialize = serializer_for(Task, ACTIVE_TASK_FIELDS, native_datetime=True)
+    return {
+        'total': sum(by_status.values()),
+        'by_status': {status or 'unknown': count for status, count in by_status.items()},
+        'active': [serialize(row) for row in active]
+    }
+
+
+def plot_summary():
+    """地块总数、总面积及各作物类型的数量"""
+    total, area = db.session.query(func.count(Plot.id), func.sum(Plot.area)).one()
+    by_crop = db.session.query(Plot.crop_type, func.count(Plot.id)).group_by(Plot.crop_type)
+    return {
+        'total': total,
+        'total_area': float(area) if area is not None else None,
+        'by_crop': {crop or 'unknown': count for crop, count in by_crop}
+    }
+
+
+def _run(app, fn):
+    with app.app_context():
+        try:
+            return fn()
+        finally:
+            db.session.remove()
+
+
+def submit_all(app, workers, **queries):
+    """在线程池中提交 {名称: 无参函数}，返回 {名称: Future}，调用方可在等待期间处理其他工作"""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='bootstrap')
+    return {name: _executor.submit(_run, app, fn) for name, fn in queries.items()}
@@ -0,0 +1,296 @@
+"""全覆盖（牛耕式 / boustrophedon）航线规划
+
+地块投影到 UTM 米制坐标后旋转到作业方向，按作业幅宽生成平行航带；相邻航带之间连通关系发生变化处
+（凹多边形、障碍物造成的分叉与合并）切分为若干单元，每个单元内往返作业，单元之间按最近入口贪心串联，
+转场航线不能直飞时沿地块外边界绕行。
+
+本模块只依赖几何库，不访问数据库，以便批量规划时在进程池中执行。
+"""
+import logging
+import math
+import multiprocessing
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import numpy as np
+import shapely
+from rasterio.crs import CRS
+from rasterio.warp import transform_geom
+from shapely import affinity
+from shapely.geometry import LineString, Point, box, mapping, shape
+from shapely.ops import substring, unary_union
+
+logger = logging.getLogger(__name__)
+
+def swath_spacing(altitude, swath_width=None, footprint_width=None, camera_fov=None, side_overlap=0.0):
+    """航带间距（米）：直接给定喷幅，或由相机地面覆盖宽度（或视场角与航高）及旁向重叠率计算"""
+    if not 0 <= side_overlap < 1:
+        raise ValueError('旁向重叠率应在 [0, 1) 之间')
+    if swath_width:
+        spacing = swath_width
+    elif footprint_width:
+        spacing = footprint_width * (1 - side_overlap)
+    elif camera_fov:
+        if not 0 < camera_fov < 180:
+            raise ValueError('相机视场角应在 (0, 180) 度之间')
+        spacing = 2 * altitude * math.tan(math.radians(camera_fov) / 2) * (1 - side_overlap)
+    else:
+        raise ValueError('需提供 swath_width、footprint_width 或 camera_fov 之一')
+    if spacing <= 0:
+        raise ValueError('航带间距必须大于 0')
+    return float(spacing)
+
+
+def metric_crs(geometry, geometry_crs):
+    """返回用于规划的米制坐标系：地理坐标系取几何中心所在 UTM 带，投影坐标系原样使用"""
+    crs = CRS.from_user_input(geometry_crs)
+    if not crs.is_geographic:
+        return crs
+    center = geometry.centroid
+    zone = min(int((center.x + 180) // 6) + 1, 60)
+    return CRS.from_epsg((32600 if center.y >= 0 else 32700) + zone)
+
+
+def _reproject(geometry, src_crs, dst_crs):
+    if src_crs == dst_crs:
+        return geometry
+    return shape(transform_geom(src_crs, dst_crs, mapping(geometry)))
+
+
+def sweep_angle(region):
+    """默认作业方向：最小外接矩形的长边方向（度），使航带最长、转弯最少"""
+    rect = region.minimum_rotated_rectangle
+    if rect.geom_type != 'Polygon':
+        return 0.0
+    coords = list(rect.exterior.coords)
+    edges = [(coords[i + 1][0] - coords[i][0], coords[i + 1][1] - coords[i][1]) for i in range(2)]
+    dx, dy = max(edges, key=lambda e: math.hypot(*e))
+    return math.degrees(math.atan2(dy, dx))
+
+
+def _line_parts(geometry):
+    if geometry.is_empty:
+        return []
+    if geometry.geom_type == 'LineString':
+        return [geometry]
+    if hasattr(geometry, 'geoms'):
+        return [part for g in geometry.geoms for part in _line_parts(g)]
+    return []
+
+
+def sweep_lanes(region, spacing):
+    """在已旋转到水平作业方向的区域内生成航带，返回 [(y, [(x0, x1), ...])]，同一航带内的线段按 x 升序"""
+    minx, miny, maxx, maxy = region.bounds
+    count = max(1, int(math.ceil((maxy - miny) / spacing)))
+    # 航带整体居中，首末航带距边界不超过半个幅宽
+    offset = (maxy - miny - (count - 1) * spacing) / 2
+    ys = miny + offset + np.arange(count) * spacing
+    lines = shapely.linestrings(
+        np.stack([np.column_stack([np.full(count, minx - 1.0), ys]),
+                  np.column_stack([np.full(count, maxx + 1.0), ys])], axis=1)
+    )
+    shapely.prepare(region)
+    cuts = shapely.intersection(region, lines)
+    lanes = []
+    for y, cut in zip(ys.tolist(), cuts):
+        segments = sorted((part.bounds[0], part.bounds[2]) for part in _line_parts(cut) if part.length > 0)
+        lanes.append((y, segments))
+    return lanes
+
+
+def decompose(lanes):
+    """牛耕式单元分解：相邻航带线段一一相连时属于同一单元，出现分叉或合并时开启新单元
+
+    返回单元列表，每个单元为按 y 升序的 [(y, x0, x1)]。
+    """
+    cells = []
+    previous = []
+    for y, segments in lanes:
+        overlaps = [[i for i, (seg, _) in enumerate(previous) if seg[0] < x1 and x0 < seg[1]]
+                    for x0, x1 in segments]
+        fan_out = Counter(i for links in overlaps for i in links)
+        current = []
+        for (x0, x1), links in zip(segments, overlaps):
+            if len(links) == 1 and fan_out[links[0]] == 1:
+                cell = previous[links[0]][1]
+            else:
+                cell = len(cells)
+                cells.append([])
+            cells[cell].append((y, x0, x1))
+            current.append(((x0, x1), cell))
+        previous = current
+    return cells
+
+
+def _cell_route(cell, reverse, start_right):
+    """单元内往返作业的航点序列"""
+    lanes = cell[::-1] if reverse else cell
+    points = []
+    right = start_right
+    for y, x0, x1 in lanes:
+        points.extend([(x1, y), (x0, y)] if right else [(x0, y), (x1, y)])
+        right = not right
+    return points
+
+
+def _transit(region, a, b, tolerance):
+    """单元之间的转场航点（不含起止点）：直线越出区域时沿所在多边形外边界取较短一侧绕行"""
+    line = LineString([a, b])
+    if region.buffer(tolerance).covers(line):
+        return []
+    polygons = list(region.geoms) if hasattr(region, 'geoms') else [region]
+    pa, pb = Point(a), Point(b)
+    polygon = min(polygons, key=lambda p: p.distance(pa))
+    if polygon.distance(pb) > tolerance:
+        # 起止点位于不相连的地块部分，只能直飞
+        return []
+    ring = polygon.exterior
+    da, db = ring.project(pa), ring.project(pb)
+    lo, hi = sorted((da, db))
+    inner = substring(ring, lo, hi)
+    if inner.length <= ring.length / 2:
+        coords = list(inner.coords)
+    else:
+        coords = list(substring(ring, hi, ring.length).coords) + list(substring(ring, 0, lo).coords)[1:]
+        coords = coords[::-1]
+    if da > db:
+        coords = coords[::-1]
+    return coords
+
+
+def _order_cells(cells, region, tolerance):
+    """贪心串联各单元：每次选取与当前位置最近的单元入口（4 种进入方式之一）"""
+    if not cells:
+        return []
+    remaining = set(range(len(cells)))
+    options = [(False, False), (False, True), (True, False), (True, True)]
+    routes = {i: {opt: _cell_route(cells[i], *opt) for opt in options} for i in remaining}
+    first = routes[0][(False, False)]
+    route = list(first)
+    remaining.discard(0)
+    while remaining:
+        x, y = route[-1]
+        index, option = min(
+            ((i, opt) for i in remaining for opt in options),
+            key=lambda item: math.hypot(routes[item[0]][item[1]][0][0] - x, routes[item[0]][item[1]][0][1] - y)
+        )
+        segment = routes[index][option]
+        route.extend(_transit(region, route[-1], segment[0], tolerance))
+        route.extend(segment)
+        remaining.discard(index)
+    return route
+
+
+def _polygonal(geometry):
+    """修复自相交等无效几何（如蝴蝶结形障碍物），只保留面状部分，避免合并与求差时抛出 GEOS 异常"""
+    if geometry.is_valid:
+        return geometry
+    repaired = shapely.make_valid(geometry)
+    if repaired.geom_type == 'GeometryCollection':
+        repaired = unary_union([part for part in repaired.geoms if shapely.get_dimensions(part) == 2])
+    return repaired.buffer(0)
+
+
+def plan_coverage(geometry, geometry_crs, spacing, angle=None, margin=0.0, obstacles=(), obstacle_buffer=0.0):
+    """规划覆盖航线
+
+    geometry 与 obstacles 为 geometry_crs 下的 shapely 几何，距离参数单位为米。
+    返回 dict：coordinates（geometry_crs 下的航点）、bounds 以及航线统计。
+    """
+    if geometry is None or geometry.is_empty or shapely.get_dimensions(geometry) != 2:
+        raise ValueError('地块几何必须为非空多边形')
+    crs = metric_crs(geometry, geometry_crs)
+    region = _reproject(geometry, geometry_crs, crs)
+    if not region.is_valid:
+        region = region.buffer(0)
+    if obstacles:
+        blocked = unary_union([_polygonal(_reproject(o, geometry_crs, crs)) for o in obstacles])
+        if obstacle_buffer > 0:
+            blocked = blocked.buffer(obstacle_buffer)
+        region = region.difference(blocked)
+    if margin > 0:
+        region = region.buffer(-margin, join_style=2)
+    # 顶点化简到幅宽的 5%，降低复杂边界的分解开销，对覆盖结果影响可忽略
+    region = region.simplify(spacing * 0.05, preserve_topology=True)
+    if region.is_empty or region.area <= 0:
+        raise ValueError('扣除边距与障碍物后地块没有可作业区域')
+
+    if angle is None:
+        angle = sweep_angle(region)
+    origin = region.centroid
+    rotated = affinity.rotate(region, -angle, origin=origin)
+    lanes = sweep_lanes(rotated, spacing)
+    cells = decompose(lanes)
+    route = _order_cells(cells, rotated, spacing * 0.01)
+    if len(route) < 2:
+        raise ValueError('地块过小，无法生成航线')
+
+    path = affinity.rotate(LineString(route), angle, origin=origin)
+    length = path.length
+    path = _reproject(path, crs, geometry_crs)
+    precision = 8 if CRS.from_user_input(geometry_crs).is_geographic else 3
+    coordinates = [[round(x, precision), round(y, precision)] for x, y in path.coords]
+    return {
+        'coordinates': coordinates,
+        'bounds': list(path.bounds),
+        'length_m': round(length, 2),
+        'area_m2': round(region.area, 2),
+        'spacing_m': round(spacing, 3),
+        'angle': round(angle % 180, 3),
+        'lanes': sum(len(cell) for cell in cells),
+        'cells': len(cells),
+        'crs': crs.to_string(),
+    }
+
+
+def plan_job(job):
+    """进程池任务入口：job 为 (key, kwargs)，返回 (key, 结果, 错误信息)
+
+    单个任务的任何异常（几何库、坐标系错误等）都转换为错误信息，不影响同批其他任务。
+    """
+    key, kwargs = job
+    try:
+        return key, plan_coverage(**kwargs), None
+    except ValueError as e:
+        return key, None, str(e)
+    except Exception as e:
+        return key, None, f'航线规划失败：{str(e)}'
+
+
+_executor = None
+_executor_workers = None
+
+
+def plan_batch(jobs, workers=4):
+    """批量规划：任务数不少于 2 且 workers > 1 时使用进程池，结果顺序与 jobs 一致
+
+    进程池以 spawn 方式启动，不继承 Web 进程的线程与连接；工作进程异常退出（内存不足、几何库崩溃）
+    导致进程池损坏时丢弃进程池，本批在当前进程内执行，下一批重新创建进程池。
+    """
+    global _executor, _executor_workers
+    if len(jobs) < 2 or workers <= 1:
+        return [plan_job(job) for job in jobs]
+    if _executor is None or _executor_workers != workers:
+        _shutdown()
+        _executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+        _executor_workers = workers
+    chunksize = max(1, len(jobs) // (workers * 4))
+    try:
+        return list(_executor.map(plan_job, jobs, chunksize=chunksize))
+    except BrokenProcessPool as e:
+        logger.warning(f"航线规划进程池已损坏，重建后本批改为进程内执行：{str(e)}")
+        _shutdown()
+        return [plan_job(job) for job in jobs]
+
+
+def _shutdown():
+    global _executor, _executor_workers
+    if _executor is not None:
+        _executor.shutdown(wait=False)
+    _executor = None
+    _executor_workers = None
+
+
+def route_bbox(bounds):
+    """航线外包范围 WKT，写入 FlightPath.bbox"""
+    return box(*bounds).wkt
@@ -0,0 +1,110 @@
+"""几何文本解析与缓存：geom / bbox 列以 WKT、EWKT 或 GeoJSON 文本存储"""
+import json
+import threading
+from collections import OrderedDict
+import shapely
+from rasterio.warp import transform_geom
+from shapely import wkt
+from shapely.geometry import shape, mapping
+
+
+def parse_geometry(text):
+    """将 WKT / EWKT / GeoJSON（Geometry 或 Feature）文本解析为 shapely 几何，空值或无法解析时返回 None"""
+    if text is None:
+        return None
+    if isinstance(text, dict):
+        data = text
+    else:
+        text = text.strip()
+        if not text:
+            return None
+        if text.startswith('{'):
+            try:
+                data = json.loads(text)
+            except ValueError:
+                return None
+        else:
+            if text.upper().startswith('SRID='):
+                text = text.split(';', 1)[-1]
+            try:
+                return wkt.loads(text)
+            except Exception:
+                return None
+    if data.get('type') == 'Feature':
+        data = data.get('geometry')
+    elif data.get('type') == 'FeatureCollection':
+        return None
+    try:
+        return shape(data) if data else None
+    except Exception:
+        return None
+
+
+def project_geometry(geometry, src_crs, geometry_crs):
+    """将 shapely 几何投影到栅格坐标系，返回 GeoJSON 字典"""
+    if src_crs and src_crs != geometry_crs:
+        return transform_geom(geometry_crs, src_crs, mapping(geometry))
+    return mapping(geometry)
+
+
+class GeometryCache:
+    """解析后几何的进程内 LRU 缓存，按坐标数估算内存并限额
+
+    以 (表名, ID, 列名) 为键，命中时校验 updated_at 与原文哈希，记录更新后旧条目被直接替换。
+    """
+
+    # 每个坐标两个 float64，另计几何对象的固定开销
+    COORD_BYTES = 16
+    OVERHEAD_BYTES = 200
+
+    def __init__(self, app=None):
+        self.max_bytes = 64 * 1024 * 1024
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.max_bytes = app.config['GEOMETRY_CACHE_MAX_BYTES']
+
+    def get(self, table, record_id, column, updated_at, text):
+        key = (table, record_id, column)
+        text_hash = hash(text) if isinstance(text, str) else hash(json.dumps(text, sort_keys=True))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == updated_at and entry[1] == text_hash:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[2]
+        geometry = parse_geometry(text)
+        size = self.OVERHEAD_BYTES
+        if geometry is not None:
+            size += self.COORD_BYTES * int(shapely.get_num_coordinates(geometry))
+        with self._lock:
+            self.misses += 1
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= previous[3]
+            if size <= self.max_bytes:
+                self._entries[key] = (updated_at, text_hash, geometry, size)
+                self._size += size
+            while self._size > self.max_bytes and self._entries:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= evicted[3]
+        return geometry
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+
+geometry_cache = GeometryCache()
+
+
+def cached_geometry(record, column='geom'):
+    """返回记录某个几何列的解析结果，经由共享缓存"""
+    return geometry_cache.get(record.__tablename__, record.id, column, record.updated_at, getattr(record, column))
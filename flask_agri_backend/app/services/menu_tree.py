@@ -0,0 +1,75 @@
+"""菜单树：由 system_menus 快照一次组装为按 order_num、id 排序的树，按调用者的权限裁剪后缓存编码结果
+
+菜单与权限的关联按约定：存在编码为 menu:{path} 的权限时，只有拥有该权限的用户可见该菜单及其子菜单；
+没有对应权限的菜单对所有登录用户可见。
+菜单快照或权限版本变化时整树重建；同一版本下裁剪结果按用户的权限位图缓存，权限相同的用户共用同一份。
+"""
+import threading
+from ..models import SystemMenu
+from .permissions import permission_engine
+from .reference_cache import reference_snapshot
+from .serializer import dumps
+
+MENU_PERMISSION_PREFIX = 'menu:'
+MAX_VARIANTS = 1024  # 每个版本缓存的不同权限组合数上限
+
+
+def build_tree(rows):
+    """将扁平的菜单行组装为树：父节点不存在的视为根节点，成环的节点不可达因而被忽略"""
+    ordered = sorted(rows, key=lambda row: (row['order_num'] or 0, row['id']))
+    nodes = {row['id']: {**row, 'children': []} for row in ordered}
+    roots = []
+    for row in ordered:
+        parent = nodes.get(row['parent_id'])
+        (parent['children'] if parent is not None and row['parent_id'] != row['id'] else roots).append(nodes[row['id']])
+    return roots
+
+
+class MenuTree:
+    def __init__(self):
+        self._lock = threading.Lock()
+        # (版本, 根节点, 菜单 id -> 所需权限位号, 权限位图 -> 编码后的树)，整体替换，
+        # 读取方持有同一版本的树与裁剪缓存，重建期间不会把旧树写入新版本的缓存
+        self._state = (None, [], {}, {})
+
+    def _sync(self):
+        version = (reference_snapshot(SystemMenu).version, permission_engine.version)
+        state = self._state
+        if version == state[0]:
+            return state
+        with self._lock:
+            if version == self._state[0]:
+                return self._state
+            rows = reference_snapshot(SystemMenu).rows()
+            required = {}
+            for row in rows:
+                bit = permission_engine.bit(f'{MENU_PERMISSION_PREFIX}{row["path"]}') if row['path'] else None
+                if bit is not None:
+                    required[row['id']] = bit
+            self._state = (version, build_tree(rows), required, {})
+            return self._state
+
+    def _prune(self, nodes, required, bits):
+        visible = []
+        for node in nodes:
+            bit = required.get(node['id'])
+            if bit is not None and not bits >> bit & 1:
+                continue
+            visible.append({**node, 'children': self._prune(node['children'], required, bits)})
+        return visible
+
+    def encoded(self, user_id):
+        """用户可见的菜单树（JSON 字节串）"""
+        _, roots, required, variants = self._sync()
+        bits = permission_engine.user_bits(user_id)
+        body = variants.get(bits)
+        if body is None:
+            body = dumps(self._prune(roots, required, bits))
+            with self._lock:
+                if len(variants) >= MAX_VARIANTS:
+                    variants.clear()
+                variants[bits] = body
+        return body
+
+
+menu_tree = MenuTree()
@@ -0,0 +1,10 @@
+"""NDVI 分块计算：指数引擎（band_math）中 NDVI 预设的专用入口"""
+from .band_math import compile_indices, run_index_analysis
+
+
+def run_ndvi_analysis(imagery, output_dir, block_size=1024):
+    """对影像记录执行 NDVI 计算，返回未提交的 AnalysisResult"""
+    if imagery.red_band_index is None or imagery.nir_band_index is None:
+        raise ValueError('影像未配置波段索引：red_band_index / nir_band_index')
+    result, = run_index_analysis(imagery, compile_indices(['ndvi']), output_dir, block_size=block_size)
+    return result
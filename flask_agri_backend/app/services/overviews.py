@@ -0,0 +1,113 @@
+"""影像入库后的后台优化：转换为分块压缩、内置概视图的 COG（Cloud Optimized GeoTIFF）"""
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+import rasterio
+from rasterio.shutil import copy as raster_copy
+from ..extensions import db
+from ..models import Imagery
+from . import record_cache
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+
+BLOCK_SIZE = 512
+
+
+def optimized_path(imagery):
+    """返回已完成优化的栅格路径，未完成或文件缺失时返回原始 file_path"""
+    metadata = imagery.metadata_info if isinstance(imagery.metadata_info, dict) else {}
+    optimized = metadata.get('optimized') or {}
+    if optimized.get('status') == 'done' and optimized.get('path') and os.path.exists(optimized['path']):
+        return optimized['path']
+    return imagery.file_path
+
+
+def build_cog(src_path, dst_path):
+    """将源栅格转换为 COG，返回概视图级别信息
+
+    由 GDAL COG 驱动按块流式转换，内存占用与影像大小无关；概视图自动生成到边长不足一个块为止。
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(dst_path)), exist_ok=True)
+    tmp_path = f'{dst_path}.tmp'
+    try:
+        raster_copy(
+            src_path, tmp_path,
+            driver='COG',
+            COMPRESS='DEFLATE',
+            PREDICTOR='YES',
+            BLOCKSIZE=BLOCK_SIZE,
+            OVERVIEWS='AUTO',
+            OVERVIEW_RESAMPLING='AVERAGE',
+            BIGTIFF='IF_SAFER',
+            NUM_THREADS='ALL_CPUS'
+        )
+        os.replace(tmp_path, dst_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    with rasterio.open(dst_path) as dst:
+        factors = dst.overviews(1)
+        return {
+            'path': dst_path,
+            'width': dst.width,
+            'height': dst.height,
+            'block_size': BLOCK_SIZE,
+            'compress': 'deflate',
+            'overview_levels': factors,
+            'overview_sizes': [[-(-dst.width // f), -(-dst.height // f)] for f in factors],
+        }
+
+
+def _update_optimized(imagery, info):
+    metadata = dict(imagery.metadata_info) if isinstance(imagery.metadata_info, dict) else {}
+    metadata['optimized'] = info
+    imagery.metadata_info = metadata
+
+
+def _optimize_job(app, imagery_id, source_path):
+    with app.app_context():
+        imagery = Imagery.query.get(imagery_id)
+        if not imagery or imagery.file_path != source_path:
+            # 记录已删除或文件已被替换，由新的任务处理
+            return
+        # 结束读取事务：转换耗时较长，不持有快照；之后的读取也不会拿到会话中缓存的旧对象
+        db.session.rollback()
+        dst_path = os.path.join(app.config['IMAGERY_OPTIMIZED_DIR'], f'imagery{imagery_id}_cog.tif')
+        try:
+            info = build_cog(source_path, dst_path)
+            info['status'] = 'done'
+            info['source'] = source_path
+            logger.info(f"影像优化完成：id={imagery_id}, 概视图={info['overview_levels']}")
+        except Exception as e:
+            logger.error(f"影像优化失败：id={imagery_id}, 错误：{str(e)}")
+            info = {'status': 'failed', 'source': source_path, 'error': str(e)}
+        try:
+            # 行锁下重新读取最新的 file_path 与 metadata_info，只改写 optimized，其余键保留其他请求的修改
+            imagery = (Imagery.query.filter_by(id=imagery_id)
+                       .populate_existing().with_for_update().one_or_none())
+            if imagery and imagery.file_path == source_path:
+                _update_optimized(imagery, info)
+                db.session.commit()
+                record_cache.invalidate(Imagery, [imagery_id])
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"影像优化结果保存失败：id={imagery_id}, 错误：{str(e)}")
+        finally:
+            db.session.remove()
+
+
+def schedule_optimize(app, imagery):
+    """将已入库的影像标记为待优化并提交后台转换任务"""
+    global _executor
+    if not app.config['IMAGERY_OPTIMIZE_ON_INGEST'] or not imagery.file_path:
+        return None
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=app.config['IMAGERY_OPTIMIZE_WORKERS'],
+                                       thread_name_prefix='imagery-optimize')
+    # 先提交 pending 状态再派发任务，避免覆盖任务写回的结果
+    _update_optimized(imagery, {'status': 'pending', 'source': imagery.file_path})
+    db.session.commit()
+    record_cache.invalidate(Imagery, [imagery.id])
+    return _executor.submit(_optimize_job, app, imagery.id, imagery.file_path)
@@ -0,0 +1,109 @@
+"""分页：兼容原有的页码（OFFSET）分页，并支持按 (id) 或 (created_at, id) 的游标（keyset）分页
+
+传入 cursor 参数即切换为游标分页（首页传空字符串），按上一页最后一条记录的排序键继续读取，
+任何深度的翻页都只扫描一页数据。总数可选精确 COUNT、基于表统计 / 执行计划的估算值或不返回。
+"""
+import base64
+import json
+from datetime import datetime
+from sqlalchemy import text, tuple_
+from sqlalchemy.orm import undefer
+from ..extensions import db
+
+ORDERS = ('id', '-id', 'created_at', '-created_at')
+TOTAL_MODES = ('exact', 'estimate', 'none')
+
+
+def add_pagination_arguments(parser):
+    """为分页接口的 parser 增加游标分页参数（page / page_size 由各接口自行定义）"""
+    parser.add_argument('cursor', type=str, required=False, location='args', help='游标必须为字符串')
+    parser.add_argument('order', type=str, default='id', choices=ORDERS, location='args',
+                        help=f'排序方式可选：{", ".join(ORDERS)}')
+    parser.add_argument('total', type=str, required=False, choices=TOTAL_MODES, location='args',
+                        help=f'总数模式可选：{", ".join(TOTAL_MODES)}')
+    return parser
+
+
+def _order_columns(model, order):
+    name = order.lstrip('-')
+    return [model.id] if name == 'id' else [getattr(model, name), model.id]
+
+
+def encode_cursor(order, record, columns):
+    values = []
+    for column in columns:
+        value = getattr(record, column.key)
+        values.append(value.isoformat() if isinstance(value, datetime) else value)
+    payload = json.dumps({'o': order, 'k': values}, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip('=')
+
+
+def decode_cursor(cursor, order, columns):
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+        values = payload['k']
+        if payload['o'] != order or len(values) != len(columns):
+            raise ValueError
+        return [
+            datetime.fromisoformat(value) if column.key != 'id' else int(value)
+            for column, value in zip(columns, values)
+        ]
+    except (ValueError, TypeError, KeyError):
+        raise ValueError(f'无效的游标：{cursor}（游标需与 order 参数一致）')
+
+
+def estimate_count(query, model):
+    """估算总数：MySQL 下无过滤条件时读取表统计信息，有过滤条件时取执行计划的预估行数；其他数据库退化为精确计数"""
+    dialect = db.engine.dialect
+    if dialect.name != 'mysql':
+        return query.order_by(None).count()
+    if query.whereclause is None:
+        row = db.session.execute(
+            text('SELECT TABLE_ROWS FROM information_schema.TABLES '
+                 'WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :name'),
+            {'name': model.__tablename__}
+        ).first()
+        return int(row[0] or 0) if row else 0
+    statement = query.order_by(None).statement.compile(dialect=dialect, compile_kwargs={'literal_binds': True})
+    plan = db.session.execute(text(f'EXPLAIN {statement}')).mappings().first()
+    return int(plan['rows'] or 0) if plan else 0
+
+
+def paginate(query, model, args):
+    """执行分页查询，返回 (记录列表, 分页信息)
+
+    分页信息包含 page_size、next_cursor（没有下一页时为 null），页码模式下另含 page，
+    以及按 total 参数给出的 total（估算值同时返回 total_estimated=true）。
+    页码模式默认精确计数以保持兼容，游标模式默认不计数。
+    """
+    page_size = args['page_size']
+    order = args.get('order') or 'id'
+    columns = _order_columns(model, order)
+    descending = order.startswith('-')
+    ordered = query.order_by(*[column.desc() if descending else column.asc() for column in columns])
+    if len(columns) > 1:
+        # 使用 fields 投影时排序列可能未被选取，生成游标需要它
+        ordered = ordered.options(undefer(columns[0]))
+    meta = {'page_size': page_size}
+    if args.get('cursor') is not None:
+        if args['cursor']:
+            values = decode_cursor(args['cursor'], order, columns)
+            key = tuple_(*columns) if len(columns) > 1 else columns[0]
+            bound = tuple_(*values) if len(values) > 1 else values[0]
+            ordered = ordered.filter(key < bound if descending else key > bound)
+        total_mode = args.get('total') or 'none'
+    else:
+        ordered = ordered.offset((args['page'] - 1) * page_size)
+        meta['page'] = args['page']
+        total_mode = args.get('total') or 'exact'
+
+    # 多取一条判断是否还有下一页
+    rows = ordered.limit(page_size + 1).all()
+    items = rows[:page_size]
+    meta['next_cursor'] = encode_cursor(order, items[-1], columns) if len(rows) > page_size else None
+    if total_mode == 'exact':
+        meta['total'] = query.order_by(None).count()
+    elif total_mode == 'estimate':
+        meta['total'] = estimate_count(query, model)
+        meta['total_estimated'] = True
+    return items, meta
@@ -0,0 +1,98 @@
+"""密码哈希：在有界线程池中计算，避免登录高峰时占满请求线程
+
+算法与强度由 PASSWORD_HASH_METHOD 配置，格式与 werkzeug 一致：pbkdf2:sha256:迭代次数 或 scrypt:n:r:p。
+进行中（含排队）的哈希数超过 线程数 + PASSWORD_HASH_QUEUE_LIMIT 时立即抛出 PasswordHasherBusy，
+由接口返回 503，而不是让请求排队占用 worker。
+存储的哈希参数与当前配置不一致时，needs_rehash 返回 True，登录成功后按新参数重新计算。
+"""
+import hashlib
+import hmac
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from flask import current_app
+from werkzeug.security import DEFAULT_PBKDF2_ITERATIONS, check_password_hash, gen_salt, generate_password_hash
+
+SALT_LENGTH = 16
+SCRYPT_DEFAULTS = (32768, 8, 1)  # 与 werkzeug 2.3+ 的 scrypt 默认参数及格式一致，便于日后升级
+
+_executor = None
+_slots = None
+_lock = threading.Lock()
+
+
+class PasswordHasherBusy(Exception):
+    """哈希线程池已满或等待超时"""
+
+
+def normalize_method(method):
+    """补全默认参数，便于与存储的哈希前缀比较"""
+    name, *params = method.split(':')
+    if name == 'pbkdf2':
+        digest = params[0] if params else 'sha256'
+        iterations = params[1] if len(params) > 1 else DEFAULT_PBKDF2_ITERATIONS
+        return f'pbkdf2:{digest}:{iterations}'
+    if name == 'scrypt':
+        n, r, p = (params + [str(value) for value in SCRYPT_DEFAULTS][len(params):])[:3]
+        return f'scrypt:{n}:{r}:{p}'
+    return method
+
+
+def _scrypt(password, salt, method):
+    n, r, p = (int(value) for value in method.split(':')[1:4])
+    return hashlib.scrypt(password.encode(), salt=salt.encode(), n=n, r=r, p=p, maxmem=132 * n * r * p, dklen=64).hex()
+
+
+def _hash(password, method):
+    if method.startswith('scrypt:'):
+        salt = gen_salt(SALT_LENGTH)
+        return f'{method}${salt}${_scrypt(password, salt, method)}'
+    return generate_password_hash(password, method=method, salt_length=SALT_LENGTH)
+
+
+def _verify(stored, password):
+    if stored.startswith('scrypt:'):
+        try:
+            method, salt, expected = stored.split('$', 2)
+            return hmac.compare_digest(_scrypt(password, salt, method), expected)
+        except ValueError:
+            return False
+    return check_password_hash(stored, password)
+
+
+def _submit(fn, *args):
+    global _executor, _slots
+    config = current_app.config
+    if _executor is None:
+        with _lock:
+            if _executor is None:
+                workers = config['PASSWORD_HASH_WORKERS']
+                _slots = threading.BoundedSemaphore(workers + config['PASSWORD_HASH_QUEUE_LIMIT'])
+                _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='password-hash')
+    if not _slots.acquire(blocking=False):
+        raise PasswordHasherBusy('密码哈希队列已满')
+    try:
+        future = _executor.submit(fn, *args)
+    except Exception:
+        _slots.release()
+        raise
+    future.add_done_callback(lambda _: _slots.release())
+    try:
+        return future.result(timeout=config['PASSWORD_HASH_TIMEOUT'])
+    except FutureTimeoutError:
+        raise PasswordHasherBusy('密码哈希等待超时')
+
+
+def hash_password(password):
+    """按当前配置计算密码哈希"""
+    return _submit(_hash, password, normalize_method(current_app.config['PASSWORD_HASH_METHOD']))
+
+
+def verify_password(stored, password):
+    if not stored:
+        return False
+    return _submit(_verify, stored, password)
+
+
+def needs_rehash(stored):
+    """存储的哈希算法或强度与当前配置不一致"""
+    return stored.split('$', 1)[0] != normalize_method(current_app.config['PASSWORD_HASH_METHOD'])
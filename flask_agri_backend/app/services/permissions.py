@@ -0,0 +1,126 @@
+"""权限解析：将 用户 → 角色 → 权限 的关联编译为每个用户一个整数位图
+
+权限编码按 system_permissions 的 id 顺序分配位号，角色位图为其权限位之和，用户位图为其角色位图的按位或。
+编译所需的数据取自参照表快照（见 reference_cache），不访问数据库；
+快照版本号每隔 RBAC_SYNC_INTERVAL 秒与 Redis 比对一次，本进程内的写入立即生效，
+因此一次权限检查只是字典查找与位运算。
+"""
+import logging
+import threading
+import time
+from functools import wraps
+from flask import current_app
+from flask_jwt_extended import get_jwt_identity, jwt_required
+from ..extensions import redis_client
+from ..models import RolePermission, SystemPermission, UserRole
+from .reference_cache import local_generation, reference_snapshot
+from app.config import ERROR_CODES
+
+logger = logging.getLogger(__name__)
+
+SOURCES = (SystemPermission, RolePermission, UserRole)
+
+
+class PermissionEngine:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._bits = {}  # 权限编码 -> 位号
+        self._codes = []  # 位号 -> 权限编码
+        self._user_bits = {}
+        self._user_roles = {}
+        self._versions = None
+        self._generation = None
+        self._checked_at = 0.0
+
+    def _remote_versions(self):
+        try:
+            values = redis_client.mget([reference_snapshot(model).version_key for model in SOURCES])
+            return tuple(int(value or 0) for value in values)
+        except Exception as e:
+            logger.warning(f"权限版本读取失败：{str(e)}")
+            return self._versions
+
+    def _compile(self):
+        snapshots = [reference_snapshot(model) for model in SOURCES]
+        permissions, role_permissions, user_roles = (snapshot.rows() for snapshot in snapshots)
+        codes = [row['code'] for row in permissions if row['code']]
+        bits = {code: bit for bit, code in enumerate(codes)}
+        bit_of_permission = {row['id']: bits[row['code']] for row in permissions if row['code']}
+        role_bits = {}
+        for row in role_permissions:
+            bit = bit_of_permission.get(row['permission_id'])
+            if bit is not None:
+                role_bits[row['role_id']] = role_bits.get(row['role_id'], 0) | (1 << bit)
+        user_bits = {}
+        roles_of_user = {}
+        for row in user_roles:
+            user_bits[row['user_id']] = user_bits.get(row['user_id'], 0) | role_bits.get(row['role_id'], 0)
+            roles_of_user.setdefault(row['user_id'], []).append(row['role_id'])
+        self._bits, self._codes, self._user_bits, self._user_roles = bits, codes, user_bits, roles_of_user
+        self._versions = tuple(snapshot.version for snapshot in snapshots)
+
+    def _sync(self):
+        now = time.monotonic()
+        generation = local_generation()
+        if (self._versions is not None and generation == self._generation
+                and now - self._checked_at < current_app.config['RBAC_SYNC_INTERVAL']):
+            return
+        with self._lock:
+            generation = local_generation()
+            if self._versions is None or generation != self._generation or self._remote_versions() != self._versions:
+                self._compile()
+            self._generation = generation
+            self._checked_at = now
+
+    @property
+    def version(self):
+        """编译所用的快照版本号，可用于派生缓存（如菜单树）的失效判断"""
+        self._sync()
+        return self._versions
+
+    def user_bits(self, user_id):
+        self._sync()
+        return self._user_bits.get(_user_id(user_id), 0)
+
+    def bit(self, code):
+        """权限编码对应的位号，不存在时返回 None"""
+        self._sync()
+        return self._bits.get(code)
+
+    def has(self, user_id, code):
+        self._sync()
+        bit = self._bits.get(code)
+        return bit is not None and bool(self._user_bits.get(_user_id(user_id), 0) >> bit & 1)
+
+    def role_ids(self, user_id):
+        """用户的角色 id 列表"""
+        self._sync()
+        return self._user_roles.get(_user_id(user_id), [])
+
+    def codes(self, user_id):
+        """用户拥有的权限编码列表（按位号顺序）"""
+        self._sync()
+        bits = self._user_bits.get(_user_id(user_id), 0)
+        return [code for bit, code in enumerate(self._codes) if bits >> bit & 1]
+
+
+def _user_id(value):
+    return int(value) if isinstance(value, str) and value.isdigit() else value
+
+
+permission_engine = PermissionEngine()
+
+
+def require_permission(code):
+    """要求登录且拥有权限 code，否则返回 401 / 403"""
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not permission_engine.has(get_jwt_identity(), code):
+                return {
+                    'message': f'无权访问：缺少权限 {code}',
+                    'error_code': ERROR_CODES['PERMISSION_DENIED']
+                }, 403
+            return fn(*args, **kwargs)
+        return jwt_required()(wrapper)
+    return decorator
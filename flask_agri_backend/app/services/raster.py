@@ -0,0 +1,97 @@
+"""栅格分块读写与流式统计工具"""
+import numpy as np
+from rasterio.windows import Window
+
+# 结果统计输出的百分位
+PERCENTILES = (2, 5, 25, 50, 75, 95, 98)
+
+
+def iter_windows(width, height, block_size):
+    """按 block_size 切分栅格，逐块产出读取窗口"""
+    for row in range(0, height, block_size):
+        win_height = min(block_size, height - row)
+        for col in range(0, width, block_size):
+            win_width = min(block_size, width - col)
+            yield Window(col, row, win_width, win_height)
+
+
+def bounds_to_wkt(bounds):
+    """将 (left, bottom, right, top) 范围转为 WKT 多边形"""
+    left, bottom, right, top = bounds
+    return (f'POLYGON(({left} {bottom}, {right} {bottom}, {right} {top}, '
+            f'{left} {top}, {left} {bottom}))')
+
+
+def float_profile(src, count=1):
+    """基于源栅格生成分块压缩的 float32 输出配置"""
+    profile = src.profile.copy()
+    profile.update(
+        driver='GTiff',
+        dtype='float32',
+        count=count,
+        nodata=np.nan,
+        tiled=True,
+        blockxsize=256,
+        blockysize=256,
+        compress='deflate',
+        predictor=3,
+        BIGTIFF='IF_SAFER'
+    )
+    profile.pop('photometric', None)
+    return profile
+
+
+class StatsAccumulator:
+    """流式统计：逐块累加，内存占用与栅格大小无关
+
+    最值、均值、标准差为精确值；百分位基于固定区间直方图估算，
+    超出 value_range 的像元计入两端的桶。
+    """
+
+    def __init__(self, value_range=(-1.0, 1.0), bins=2000):
+        self.lo, self.hi = value_range
+        self.bins = bins
+        self.hist = np.zeros(bins, dtype=np.int64)
+        self.count = 0
+        self.total = 0.0
+        self.total_sq = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+
+    def update(self, values):
+        """累加一块有效像元（一维、已剔除无效值）"""
+        if values.size == 0:
+            return
+        values = values.astype(np.float64, copy=False)
+        self.count += values.size
+        self.total += float(values.sum())
+        self.total_sq += float(np.dot(values, values))
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+        idx = ((values - self.lo) * (self.bins / (self.hi - self.lo))).astype(np.int64)
+        np.clip(idx, 0, self.bins - 1, out=idx)
+        self.hist += np.bincount(idx, minlength=self.bins)
+
+    def percentile(self, q):
+        if not self.count:
+            return None
+        rank = q / 100.0 * (self.count - 1)
+        cumulative = np.cumsum(self.hist)
+        idx = int(np.searchsorted(cumulative, rank, side='right'))
+        width = (self.hi - self.lo) / self.bins
+        value = self.lo + (idx + 0.5) * width
+        return float(min(max(value, self.min), self.max))
+
+    def result(self):
+        if not self.count:
+            return {'count': 0, 'min': None, 'max': None, 'mean': None, 'std': None, 'percentiles': {}}
+        mean = self.total / self.count
+        variance = max(self.total_sq / self.count - mean * mean, 0.0)
+        return {
+            'count': self.count,
+            'min': self.min,
+            'max': self.max,
+            'mean': mean,
+            'std': variance ** 0.5,
+            'percentiles': {f'p{q}': self.percentile(q) for q in PERCENTILES}
+        }
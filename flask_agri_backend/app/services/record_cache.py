@@ -0,0 +1,118 @@
+"""单条记录读穿缓存：序列化后的记录（JSON 字节串）按 record:{表名}:{id} 存入 Redis，带过期时间
+
+未命中时只有取得加载锁的请求查询数据库并回填，其余请求短暂等待回填结果，避免热点记录过期瞬间的并发击穿；
+等待超时或 Redis 不可用时直接查询数据库。写操作提交后删除缓存与加载锁，
+回填时校验锁仍属于自己（Lua 原子比较），提交前读到旧数据的加载者不会把旧值写回缓存。
+redis_client 会将响应解码为 str，命中的结果统一转换为 bytes 返回。
+"""
+import logging
+import random
+import time
+import uuid
+from flask import current_app
+from ..extensions import redis_client
+
+logger = logging.getLogger(__name__)
+
+LOCK_TTL_MS = 5000  # 加载锁有效期，加载超时后其他请求可重新加载
+WAIT_TIMEOUT = 1.0  # 未取得加载锁时等待回填的最长时间（秒）
+WAIT_INTERVAL = 0.02
+TTL_JITTER = 0.1  # 过期时间随机增加至多 10%，避免同批写入的记录同时过期
+
+# 锁仍为本次加载持有时写入缓存并释放锁
+_FILL_SCRIPT = """
+if redis.call('GET', KEYS[2]) == ARGV[1] then
+    redis.call('SET', KEYS[1], ARGV[2], 'PX', ARGV[3])
+    redis.call('DEL', KEYS[2])
+    return 1
+end
+return 0
+"""
+
+_RELEASE_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+def cache_key(model, record_id):
+    return f'record:{model.__tablename__}:{record_id}'
+
+
+def _ttl_ms():
+    ttl = current_app.config['RECORD_CACHE_TTL']
+    return int(ttl * 1000 * (1 + random.random() * TTL_JITTER))
+
+
+def read_through(model, record_id, load):
+    """返回记录的 JSON 字节串，load() 从数据库读取并序列化（记录不存在时返回 None，不缓存）"""
+    if current_app.config['RECORD_CACHE_TTL'] <= 0:
+        return load()
+    key = cache_key(model, record_id)
+    lock = f'{key}:lock'
+    token = uuid.uuid4().hex
+    try:
+        cached = redis_client.get(key)
+        if cached is not None:
+            return _as_bytes(cached)
+        acquired = redis_client.set(lock, token, nx=True, px=LOCK_TTL_MS)
+    except Exception as e:
+        logger.warning(f"记录缓存读取失败：{key}，错误：{str(e)}")
+        return load()
+
+    if not acquired:
+        deadline = time.monotonic() + WAIT_TIMEOUT
+        try:
+            while time.monotonic() < deadline:
+                time.sleep(WAIT_INTERVAL)
+                cached = redis_client.get(key)
+                if cached is not None:
+                    return _as_bytes(cached)
+                if not redis_client.exists(lock):
+                    break
+        except Exception as e:
+            logger.warning(f"记录缓存读取失败：{key}，错误：{str(e)}")
+        # 加载者失败、记录不存在或等待超时：直接查询，不回填
+        return load()
+
+    try:
+        value = load()
+    except Exception:
+        _release(lock, token)
+        raise
+    try:
+        if value is None:
+            redis_client.eval(_RELEASE_SCRIPT, 1, lock, token)
+        else:
+            redis_client.eval(_FILL_SCRIPT, 2, key, lock, token, value, _ttl_ms())
+    except Exception as e:
+        logger.warning(f"记录缓存写入失败：{key}，错误：{str(e)}")
+    return value
+
+
+def _as_bytes(value):
+    # redis_client 以 decode_responses=True 创建，命中时返回 str，调用方需要 JSON 字节串
+    return value.encode('utf-8') if isinstance(value, str) else value
+
+
+def _release(lock, token):
+    try:
+        redis_client.eval(_RELEASE_SCRIPT, 1, lock, token)
+    except Exception as e:
+        logger.warning(f"记录缓存加载锁释放失败：{lock}，错误：{str(e)}")
+
+
+def invalidate(model, record_ids):
+    """删除记录缓存及其加载锁，在写入提交后调用"""
+    keys = []
+    for record_id in record_ids:
+        key = cache_key(model, record_id)
+        keys += [key, f'{key}:lock']
+    if not keys:
+        return
+    try:
+        redis_client.delete(*keys)
+    except Exception as e:
+        logger.warning(f"记录缓存失效失败：{model.__tablename__}，错误：{str(e)}")
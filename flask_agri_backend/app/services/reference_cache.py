@@ -0,0 +1,89 @@
+"""小型参照表（菜单、角色、权限及其关联）的进程内快照
+
+每个进程按表缓存全部记录（序列化后的字典），Redis 中的版本号标记数据变化：
+写操作提交后递增版本号，各进程读取时比较版本号，变化后才重新加载整表，版本不变时读取不访问数据库。
+"""
+import logging
+import threading
+from ..extensions import redis_client
+from .serializer import serializer_for
+
+logger = logging.getLogger(__name__)
+
+_generation = 0  # 本进程内参照表写入次数，派生缓存据此立即感知本进程的写入
+
+
+class ReferenceSnapshot:
+    """单张表的全量快照，rows / get 返回的字典为共享对象，调用方不得修改"""
+
+    def __init__(self, model):
+        self.model = model
+        self._rows = []
+        self._by_id = {}
+        self._version = None
+        self._lock = threading.Lock()
+
+    @property
+    def version_key(self):
+        return f'reference_version:{self.model.__tablename__}'
+
+    def _remote_version(self):
+        try:
+            return int(redis_client.get(self.version_key) or 0)
+        except Exception as e:
+            logger.warning(f"参照表版本读取失败：{str(e)}")
+            return self._version
+
+    def _sync(self):
+        # 先读版本号再加载：加载期间发生的写入会使下一次读取看到新版本并再次加载
+        remote = self._remote_version()
+        if self._version is not None and remote == self._version:
+            return
+        with self._lock:
+            if self._version is not None and remote == self._version:
+                return
+            serialize = serializer_for(self.model, native_datetime=True)
+            rows = [serialize(record) for record in self.model.query.order_by(self.model.id)]
+            self._rows = rows
+            self._by_id = {row['id']: row for row in rows}
+            self._version = remote if remote is not None else 0
+
+    @property
+    def version(self):
+        """当前快照的版本号（读取时同步），可用于派生缓存的失效判断"""
+        self._sync()
+        return self._version
+
+    def rows(self):
+        """全部记录，按 id 升序"""
+        self._sync()
+        return self._rows
+
+    def get(self, record_id):
+        self._sync()
+        return self._by_id.get(record_id)
+
+    def bump(self):
+        """写入提交后调用：递增版本号，本进程在下次读取时重新加载"""
+        global _generation
+        try:
+            redis_client.incr(self.version_key)
+        except Exception as e:
+            logger.warning(f"参照表版本更新失败：{str(e)}")
+        self._version = None
+        _generation += 1
+
+
+_snapshots = {}
+
+
+def reference_snapshot(model):
+    """返回模型对应的快照（按表名单例）"""
+    snapshot = _snapshots.get(model.__tablename__)
+    if snapshot is None:
+        snapshot = _snapshots.setdefault(model.__tablename__, ReferenceSnapshot(model))
+    return snapshot
+
+
+def local_generation():
+    return _generation
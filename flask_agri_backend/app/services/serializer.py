@@ -0,0 +1,120 @@
+"""模型序列化：为每个模型（及字段子集）生成一次专用的序列化函数，并以 orjson 直接输出字节串
+
+生成的函数按列逐个取值构造字典，日期时间列在生成时即确定转换方式，不再逐格判断类型。
+安装了 orjson 时日期时间保留为 datetime 对象，由 orjson 在编码时输出与 isoformat() 相同的文本。
+"""
+import json
+import threading
+from datetime import date, datetime
+from flask import Response
+from sqlalchemy import Date, DateTime
+from sqlalchemy.orm import load_only
+
+try:
+    import orjson
+except ImportError:  # 未安装时退化为标准库 json
+    orjson = None
+
+_compiled = {}
+_lock = threading.Lock()
+
+
+def model_fields(model):
+    """模型可输出的字段名（按表列顺序）"""
+    return [column.name for column in model.__table__.columns]
+
+
+def add_fields_argument(parser):
+    """为查询接口的 parser 增加 fields 参数"""
+    parser.add_argument('fields', type=str, required=False, location='args',
+                        help='fields 格式应为逗号分隔的字段名，例如 id,name,status')
+    return parser
+
+
+def parse_fields(model, value, available=None):
+    """解析 fields 参数为字段名列表（去重并保持顺序），为空时返回 None 表示全部字段
+
+    available 为允许选择的字段，默认为模型的全部列。
+    """
+    if not value:
+        return None
+    names = list(dict.fromkeys(part.strip() for part in value.split(',') if part.strip()))
+    if not names:
+        return None
+    available = available or model_fields(model)
+    unknown = [name for name in names if name not in available]
+    if unknown:
+        raise ValueError(f'未知字段：{", ".join(unknown)}，可选：{", ".join(available)}')
+    return names
+
+
+def project(query, model, fields):
+    """将查询的 SELECT 限制为 fields 对应的列（主键始终加载），fields 为 None 时原样返回"""
+    if not fields:
+        return query
+    return query.options(load_only(*[getattr(model, name) for name in fields]))
+
+
+def _compile(model, fields, native_datetime):
+    columns = {column.name: column for column in model.__table__.columns}
+    names = list(columns) if fields is None else list(fields)
+    unknown = [name for name in names if name not in columns]
+    if unknown:
+        raise ValueError(f'未知字段：{", ".join(unknown)}，可选：{", ".join(columns)}')
+    lines = ['def serialize(record):']
+    items = []
+    for i, name in enumerate(names):
+        lines.append(f'    v{i} = record.{name}' if name.isidentifier() else f'    v{i} = getattr(record, {name!r})')
+        if not native_datetime and isinstance(columns[name].type, (DateTime, Date)):
+            items.append(f'{name!r}: v{i}.isoformat() if v{i} is not None else None')
+        else:
+            items.append(f'{name!r}: v{i}')
+    lines.append('    return {' + ', '.join(items) + '}')
+    namespace = {}
+    exec(compile('\n'.join(lines), f'<serializer {model.__name__}>', 'exec'), namespace)
+    return namespace['serialize']
+
+
+def serializer_for(model, fields=None, native_datetime=False):
+    """返回 model 的序列化函数；fields 为字段子集（保持给定顺序），None 表示全部列
+
+    native_datetime=True 时日期时间保留为对象，仅用于随后交给 dumps 编码的场景。
+    """
+    key = (model, tuple(fields) if fields is not None else None, native_datetime and orjson is not None)
+    serialize = _compiled.get(key)
+    if serialize is None:
+        with _lock:
+            serialize = _compiled.get(key)
+            if serialize is None:
+                serialize = _compiled[key] = _compile(model, key[1], key[2])
+    return serialize
+
+
+def serialize_records(records, fields=None):
+    """批量序列化同一模型的记录，结果用于 dumps / json_response"""
+    if not records:
+        return []
+    serialize = serializer_for(type(records[0]), fields, native_datetime=True)
+    return [serialize(record) for record in records]
+
+
+def _default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return str(value)
+
+
+def dumps(payload):
+    """编码为 UTF-8 JSON 字节串"""
+    if orjson is not None:
+        try:
+            return orjson.dumps(payload, default=_default, option=orjson.OPT_NON_STR_KEYS)
+        except TypeError:
+            # 超出 64 位的整数等 orjson 不支持的值，交给标准库处理
+            pass
+    return json.dumps(payload, ensure_ascii=False, default=_default).encode('utf-8')
+
+
+def json_response(payload, status=200):
+    """直接以字节串构造 JSON 响应，绕过 Flask-RESTful 的 json.dumps"""
+    return Response(dumps(payload), status=status, mimetype='application/json')
@@ -0,0 +1,132 @@
+"""进程内空间索引：基于 shapely STRtree 按视口范围（bbox）查询地块、影像和 3D 对象
+
+每个进程维护自己的索引，写操作在本进程内增量更新并递增 Redis 中的版本号；
+其他进程查询时发现版本变化即整表重载，保证多 worker 之间最终一致。
+"""
+import logging
+import threading
+import numpy as np
+from shapely import STRtree
+from shapely.geometry import box
+from ..extensions import db, redis_client
+from .geometry import parse_geometry, geometry_cache
+
+logger = logging.getLogger(__name__)
+
+
+def parse_bbox(value):
+    """解析 'minx,miny,maxx,maxy' 查询参数"""
+    try:
+        minx, miny, maxx, maxy = (float(part) for part in value.split(','))
+    except ValueError:
+        raise ValueError(f'无效的 bbox：{value}，格式应为 minx,miny,maxx,maxy')
+    if minx > maxx or miny > maxy:
+        raise ValueError(f'无效的 bbox：{value}，最小值不能大于最大值')
+    return minx, miny, maxx, maxy
+
+
+class SpatialIndex:
+    """单张表 geom 列的 STRtree 索引，树在数据变化后的首次查询时惰性重建"""
+
+    def __init__(self, model, column='geom'):
+        self.model = model
+        self.column = column
+        self._geometries = {}
+        self._tree = None
+        self._tree_ids = None
+        self._version = None
+        self._lock = threading.RLock()
+
+    @property
+    def version_key(self):
+        return f'spatial_version:{self.model.__tablename__}'
+
+    def _remote_version(self):
+        try:
+            return int(redis_client.get(self.version_key) or 0)
+        except Exception as e:
+            logger.warning(f"空间索引版本读取失败：{str(e)}")
+            return self._version
+
+    def _reload(self):
+        table = self.model.__tablename__
+        rows = db.session.query(self.model.id, getattr(self.model, self.column), self.model.updated_at).all()
+        geometries = {}
+        for record_id, text, updated_at in rows:
+            geometry = geometry_cache.get(table, record_id, self.column, updated_at, text)
+            if geometry is not None and not geometry.is_empty:
+                geometries[record_id] = geometry
+        self._geometries = geometries
+        self._tree = None
+
+    def _sync(self):
+        remote = self._remote_version()
+        if self._version is None or remote != self._version:
+            self._reload()
+            self._version = remote if remote is not None else 0
+        if self._tree is None:
+            self._tree_ids = np.fromiter(self._geometries.keys(), dtype=np.int64, count=len(self._geometries))
+            self._tree = STRtree(list(self._geometries.values()))
+
+    def query(self, bbox):
+        """返回几何与 bbox 相交的记录 ID 列表（升序）"""
+        with self._lock:
+            self._sync()
+            if not len(self._tree_ids):
+                return []
+            hits = self._tree.query(box(*bbox), predicate='intersects')
+            return sorted(self._tree_ids[hits].tolist())
+
+    def _bump(self):
+        try:
+            version = redis_client.incr(self.version_key)
+        except Exception as e:
+            logger.warning(f"空间索引版本更新失败：{str(e)}")
+            return
+        # 期间没有其他进程写入时，本地增量更新后的索引即为最新版本，无需重载
+        if self._version is not None and version == self._version + 1:
+            self._version = version
+
+    def upsert(self, record_id, text):
+        self.upsert_many({record_id: text})
+
+    def upsert_many(self, geometries):
+        """按 {id: WKT/GeoJSON} 更新，无论记录数量只递增一次版本号"""
+        with self._lock:
+            for record_id, text in geometries.items():
+                geometry = parse_geometry(text)
+                if geometry is not None and not geometry.is_empty:
+                    self._geometries[record_id] = geometry
+                else:
+                    self._geometries.pop(record_id, None)
+            self._tree = None
+            self._bump()
+
+    def remove(self, record_id):
+        self.remove_many([record_id])
+
+    def remove_many(self, record_ids):
+        with self._lock:
+            for record_id in record_ids:
+                self._geometries.pop(record_id, None)
+            self._tree = None
+            self._bump()
+
+
+_indexes = {}
+
+
+def spatial_index(model):
+    """返回模型对应的空间索引（按表名单例）"""
+    index = _indexes.get(model.__tablename__)
+    if index is None:
+        index = _indexes.setdefault(model.__tablename__, SpatialIndex(model))
+    return index
+
+
+def bbox_filter(query, model, bbox_arg):
+    """为查询附加 bbox 空间过滤；bbox_arg 为空时原样返回"""
+    if not bbox_arg:
+        return query
+    ids = spatial_index(model).query(parse_bbox(bbox_arg))
+    return query.filter(model.id.in_(ids)) if ids else query.filter(db.false())
@@ -0,0 +1,74 @@
+"""列表接口的流式输出：服务端游标分批读取记录，边序列化边写出，内存占用与表大小无关
+
+json 格式与普通列表响应结构相同（{"message": ..., "data": [...]}），只是分块传输；
+ndjson 格式每行一条记录。
+"""
+import logging
+from flask import Response, current_app, stream_with_context
+from app.config import ERROR_CODES
+from .serializer import serializer_for, dumps
+
+logger = logging.getLogger(__name__)
+
+STREAM_FORMATS = ('ndjson', 'json')
+
+
+def add_stream_argument(parser):
+    """为列表接口的 parser 增加 stream 参数"""
+    parser.add_argument('stream', type=str, required=False, choices=STREAM_FORMATS, location='args',
+                        help=f'stream 可选：{", ".join(STREAM_FORMATS)}')
+    return parser
+
+
+def _rows(query, chunk_size, fields, decorate=None):
+    """按块产出序列化后的记录（JSON 字节串列表），decorate(记录列表, 字典列表) 可按块补充内容"""
+    serialize = serializer_for(query.column_descriptions[0]['entity'], fields, native_datetime=True)
+
+    def encode(records):
+        rows = [serialize(record) for record in records]
+        if decorate is not None:
+            rows = decorate(records, rows)
+        return [dumps(row) for row in rows]
+
+    records = []
+    for record in query.execution_options(stream_results=True).yield_per(chunk_size):
+        records.append(record)
+        if len(records) >= chunk_size:
+            yield encode(records)
+            records = []
+    if records:
+        yield encode(records)
+
+
+def stream_query(query, message, fmt, fields=None, chunk_size=None, decorate=None):
+    """以流式响应返回查询结果，fmt 为 ndjson 或 json，fields 为输出字段子集，decorate 见 _rows"""
+    chunk_size = chunk_size or current_app.config['STREAM_CHUNK_SIZE']
+
+    def generate_ndjson():
+        try:
+            for chunk in _rows(query, chunk_size, fields, decorate):
+                yield b'\n'.join(chunk) + b'\n'
+        except Exception as e:
+            # 响应头已发出，无法再改状态码；以错误行结束输出，便于客户端识别截断
+            logger.error(f"流式输出失败：{message}，错误：{str(e)}")
+            yield dumps({
+                'message': f'数据库错误：{str(e)}',
+                'error_code': ERROR_CODES['DATABASE_ERROR']
+            }) + b'\n'
+
+    def generate_json():
+        yield dumps({'message': message})[:-1] + b',"data":['
+        first = True
+        try:
+            for chunk in _rows(query, chunk_size, fields, decorate):
+                yield (b'' if first else b',') + b','.join(chunk)
+                first = False
+        except Exception as e:
+            # 不输出结尾括号，客户端解析失败即可感知截断
+            logger.error(f"流式输出失败：{message}，错误：{str(e)}")
+            return
+        yield b']}\n'
+
+    if fmt == 'ndjson':
+        return Response(stream_with_context(generate_ndjson()), mimetype='application/x-ndjson')
+    return Response(stream_with_context(generate_json()), mimetype='application/json')
@@ -0,0 +1,285 @@
+"""XYZ 瓦片渲染与两级（进程内 LRU + 磁盘）瓦片缓存"""
+import io
+import math
+import os
+import threading
+from collections import OrderedDict
+import numpy as np
+import rasterio
+from PIL import Image
+from rasterio.enums import Resampling
+from rasterio.vrt import WarpedVRT
+from rasterio.warp import transform_bounds
+from rasterio.windows import from_bounds
+from shapely.geometry import box
+from .band_math import resolve_band_map
+from .geometry import cached_geometry
+from .overviews import optimized_path
+
+TILE_SIZE = 256
+MAX_RANGES = 1024  # 进程内缓存的影像拉伸范围条数（每个影像版本与波段组合一条）
+WEB_MERCATOR_HALF = 20037508.342789244
+
+# 分析结果默认色带（红-黄-绿），按 0~1 位置线性插值
+DEFAULT_COLOR_STOPS = [
+    (0.0, (165, 0, 38)),
+    (0.25, (244, 109, 67)),
+    (0.5, (255, 255, 191)),
+    (0.75, (102, 189, 99)),
+    (1.0, (0, 104, 55)),
+]
+
+
+def tile_bounds(z, x, y):
+    """XYZ 瓦片在 EPSG:3857 下的范围 (left, bottom, right, top)"""
+    span = 2 * WEB_MERCATOR_HALF / (1 << z)
+    left = -WEB_MERCATOR_HALF + x * span
+    top = WEB_MERCATOR_HALF - y * span
+    return left, top - span, left + span, top
+
+
+def valid_tile(z, x, y):
+    return 0 <= z <= 24 and 0 <= x < (1 << z) and 0 <= y < (1 << z)
+
+
+def _encode_png(rgba):
+    buffer = io.BytesIO()
+    Image.fromarray(rgba, mode='RGBA').save(buffer, format='PNG', optimize=False, compress_level=6)
+    return buffer.getvalue()
+
+
+EMPTY_TILE = _encode_png(np.zeros((TILE_SIZE, TILE_SIZE, 4), dtype=np.uint8))
+
+
+def read_tile(path, indexes, z, x, y, resampling=Resampling.bilinear):
+    """读取瓦片范围内的波段数据，返回 (数据, 有效掩膜) 或 None（瓦片与栅格不相交）
+
+    通过 WarpedVRT 重投影到 EPSG:3857 后按输出尺寸降采样读取，GDAL 会自动选用合适的概视图。
+    """
+    left, bottom, right, top = tile_bounds(z, x, y)
+    with rasterio.open(path) as src:
+        if src.crs is None:
+            raise ValueError(f'栅格缺少坐标参考：{path}')
+        with WarpedVRT(src, crs='EPSG:3857', resampling=resampling) as vrt:
+            v_left, v_bottom, v_right, v_top = vrt.bounds
+            i_left, i_bottom = max(left, v_left), max(bottom, v_bottom)
+            i_right, i_top = min(right, v_right), min(top, v_top)
+            if i_left >= i_right or i_bottom >= i_top:
+                return None
+            res = (right - left) / TILE_SIZE
+            col0, col1 = int(round((i_left - left) / res)), int(round((i_right - left) / res))
+            row0, row1 = int(round((top - i_top) / res)), int(round((top - i_bottom) / res))
+            if col1 <= col0 or row1 <= row0:
+                return None
+            window = from_bounds(i_left, i_bottom, i_right, i_top, vrt.transform)
+            part = vrt.read(indexes, window=window, out_shape=(len(indexes), row1 - row0, col1 - col0),
+                            masked=True, resampling=resampling)
+    data = np.zeros((len(indexes), TILE_SIZE, TILE_SIZE), dtype=np.float32)
+    valid = np.zeros((TILE_SIZE, TILE_SIZE), dtype=bool)
+    data[:, row0:row1, col0:col1] = part.data
+    valid[row0:row1, col0:col1] = ~np.ma.getmaskarray(part).any(axis=0)
+    valid &= np.isfinite(data).all(axis=0)
+    return data, valid
+
+
+def sample_range(path, indexes, max_size=512):
+    """对整幅影像降采样读取，估算 2%~98% 显示拉伸范围（COG 影像直接命中小尺寸概视图）"""
+    with rasterio.open(path) as src:
+        scale = max(src.width, src.height) / max_size
+        shape = (len(indexes), max(1, int(src.height / scale)), max(1, int(src.width / scale))) \
+            if scale > 1 else (len(indexes), src.height, src.width)
+        data = src.read(indexes, out_shape=shape, masked=True)
+    values = data.compressed().astype(np.float64)
+    values = values[np.isfinite(values)]
+    if not values.size:
+        return 0.0, 1.0
+    lo, hi = np.percentile(values, (2, 98))
+    return float(lo), float(hi) if hi > lo else float(lo) + 1.0
+
+
+def _color_lut(stops):
+    positions = [stop[0] for stop in stops]
+    lut = np.empty((256, 3), dtype=np.uint8)
+    samples = np.linspace(0.0, 1.0, 256)
+    for channel in range(3):
+        lut[:, channel] = np.interp(samples, positions, [stop[1][channel] for stop in stops]).round()
+    return lut
+
+
+DEFAULT_LUT = _color_lut(DEFAULT_COLOR_STOPS)
+
+
+def valid_range(value):
+    """显示范围须为两个有限数值且上限大于下限，返回 (lo, hi)，否则返回 None"""
+    if not isinstance(value, (list, tuple)) or len(value) != 2:
+        return None
+    if not all(isinstance(v, (int, float)) and not isinstance(v, bool) and math.isfinite(v) for v in value):
+        return None
+    lo, hi = float(value[0]), float(value[1])
+    return (lo, hi) if hi > lo else None
+
+
+def _scale(values, lo, hi):
+    scaled = (values - lo) * (255.0 / (hi - lo))
+    np.nan_to_num(scaled, copy=False, nan=0.0)
+    np.clip(scaled, 0, 255, out=scaled)
+    return scaled.astype(np.uint8)
+
+
+def render_imagery_tile(imagery, z, x, y, display_range):
+    """渲染影像瓦片：优先使用 RGB 波段，否则以第一个波段渲染灰度"""
+    metadata = imagery.metadata_info if isinstance(imagery.metadata_info, dict) else {}
+    band_map = resolve_band_map(imagery)
+    indexes = metadata.get('rgb_bands')
+    if not indexes:
+        indexes = [band_map[name] for name in ('red', 'green', 'blue')] \
+            if all(name in band_map for name in ('red', 'green', 'blue')) else [1]
+    path = optimized_path(imagery)
+    tile = read_tile(path, list(indexes), z, x, y)
+    if tile is None:
+        return EMPTY_TILE
+    data, valid = tile
+    lo, hi = valid_range(metadata.get('display_range')) or display_range(path, list(indexes))
+    rgba = np.zeros((TILE_SIZE, TILE_SIZE, 4), dtype=np.uint8)
+    channels = _scale(data, lo, hi)
+    rgba[..., :3] = np.moveaxis(channels, 0, -1) if len(indexes) >= 3 else channels[0][..., None]
+    rgba[..., 3] = np.where(valid, 255, 0)
+    return _encode_png(rgba)
+
+
+def render_analysis_tile(result, z, x, y):
+    """渲染分析结果瓦片：单波段按 style 或统计范围映射到色带"""
+    style = result.style if isinstance(result.style, dict) else {}
+    stats = result.stats if isinstance(result.stats, dict) else {}
+    tile = read_tile(result.result_path, [1], z, x, y)
+    if tile is None:
+        return EMPTY_TILE
+    data, valid = tile
+    percentiles = stats.get('percentiles') if isinstance(stats.get('percentiles'), dict) else {}
+    # 样式范围无效（如上下限相等、非数值）时依次回退到统计百分位与默认范围
+    lo, hi = valid_range(style.get('range')) \
+        or valid_range((percentiles.get('p2'), percentiles.get('p98'))) \
+        or (-1.0, 1.0)
+    lut = _color_lut(style['colors']) if style.get('colors') else DEFAULT_LUT
+    rgba = np.zeros((TILE_SIZE, TILE_SIZE, 4), dtype=np.uint8)
+    rgba[..., :3] = lut[_scale(data[0], lo, hi)]
+    rgba[..., 3] = np.where(valid, 255, 0)
+    return _encode_png(rgba)
+
+
+class TileCache:
+    """两级瓦片缓存：进程内 LRU（按字节数限额）+ 磁盘目录
+
+    键包含记录的版本（updated_at），记录更新后自动落到新键，旧瓦片不再命中。
+    """
+
+    def __init__(self, app=None):
+        self.max_bytes = 64 * 1024 * 1024
+        self.cache_dir = None
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self._ranges = OrderedDict()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.max_bytes = app.config['TILE_CACHE_MAX_BYTES']
+        self.cache_dir = app.config['TILE_CACHE_DIR']
+
+    def _disk_path(self, key):
+        kind, record_id, version, z, x, y = key
+        return os.path.join(self.cache_dir, kind, str(record_id), version, str(z), str(x), f'{y}.png')
+
+    def get(self, key):
+        with self._lock:
+            data = self._entries.get(key)
+            if data is not None:
+                self._entries.move_to_end(key)
+                return data
+        if self.cache_dir:
+            try:
+                with open(self._disk_path(key), 'rb') as f:
+                    data = f.read()
+            except OSError:
+                return None
+            self._remember(key, data)
+            return data
+        return None
+
+    def put(self, key, data):
+        self._remember(key, data)
+        if self.cache_dir:
+            path = self._disk_path(key)
+            tmp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+            try:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                with open(tmp_path, 'wb') as f:
+                    f.write(data)
+                os.replace(tmp_path, path)
+            except OSError:
+                # 磁盘缓存失败不影响瓦片返回
+                pass
+
+    def _remember(self, key, data):
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= len(previous)
+            self._entries[key] = data
+            self._size += len(data)
+            while self._size > self.max_bytes and self._entries:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+
+    def display_range(self, version_key):
+        """返回按记录版本缓存的影像拉伸范围计算函数"""
+        def compute(path, indexes):
+            key = (version_key, tuple(indexes))
+            with self._lock:
+                value = self._ranges.get(key)
+                if value is not None:
+                    self._ranges.move_to_end(key)
+                    return value
+            # 采样在锁外进行，并发请求可能重复计算，结果相同
+            value = sample_range(path, indexes)
+            with self._lock:
+                self._ranges[key] = value
+                self._ranges.move_to_end(key)
+                while len(self._ranges) > MAX_RANGES:
+                    self._ranges.popitem(last=False)
+            return value
+        return compute
+
+
+tile_cache = TileCache()
+
+
+def record_version(record):
+    return record.updated_at.strftime('%Y%m%d%H%M%S') if record.updated_at else '0'
+
+
+def outside_footprint(record, z, x, y, geometry_crs):
+    """瓦片与记录的 geom 足迹不相交时返回 True，无足迹时无法判断，返回 False"""
+    footprint = cached_geometry(record)
+    if footprint is None or footprint.is_empty:
+        return False
+    bounds = transform_bounds('EPSG:3857', geometry_crs, *tile_bounds(z, x, y), densify_pts=21)
+    return not footprint.intersects(box(*bounds))
+
+
+def get_tile(kind, record, z, x, y, geometry_crs='EPSG:4326'):
+    """按 (类型, ID, 版本, z, x, y) 查缓存，未命中时渲染并写入两级缓存"""
+    version = record_version(record)
+    key = (kind, record.id, version, z, x, y)
+    data = tile_cache.get(key)
+    if data is None:
+        if kind == 'imagery' and outside_footprint(record, z, x, y, geometry_crs):
+            # 足迹之外的瓦片无需打开栅格
+            data = EMPTY_TILE
+        elif kind == 'imagery':
+            data = render_imagery_tile(record, z, x, y, tile_cache.display_range((kind, record.id, version)))
+        else:
+            data = render_analysis_tile(record, z, x, y)
+        tile_cache.put(key, data)
+    return data, f'{kind}-{record.id}-{version}-{z}-{x}-{y}'
@@ -0,0 +1,132 @@
+"""地块指数时间序列：对覆盖地块的每期影像只读取地块窗口，批量并发提取"""
+import hashlib
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import rasterio
+from rasterio.errors import RasterioError, WindowError
+from rasterio.features import geometry_mask, bounds as geometry_bounds
+from rasterio.windows import Window, from_bounds, transform as window_transform
+from ..extensions import redis_client
+from .band_math import index_window_reader, resolve_band_map
+from .geometry import cached_geometry, project_geometry
+from .overviews import optimized_path
+
+logger = logging.getLogger(__name__)
+
+# 提取结果缓存有效期（秒）；键包含地块与影像的 updated_at，记录变化后自然失效
+MEMO_TTL = 30 * 24 * 3600
+
+
+def extract_plot_value(path, geometry, geometry_crs, expr, band_map):
+    """读取地块外包窗口计算指数并按多边形掩膜汇总，影像未覆盖地块时返回 None"""
+    with rasterio.open(path) as src:
+        if src.crs is None:
+            raise ValueError(f'栅格缺少坐标参考：{path}')
+        geojson = project_geometry(geometry, src.crs, geometry_crs)
+        try:
+            window = from_bounds(*geometry_bounds(geojson), src.transform) \
+                .round_offsets(op='floor').round_lengths(op='ceil') \
+                .intersection(Window(0, 0, src.width, src.height))
+        except WindowError:
+            return None
+        if window.width < 1 or window.height < 1:
+            return None
+        reader = index_window_reader(src, expr, band_map)
+        values = reader(window)
+        inside = geometry_mask([geojson], out_shape=values.shape, invert=True,
+                               transform=window_transform(window, src.transform))
+    values = values[inside]
+    values = values[np.isfinite(values)]
+    if not values.size:
+        return None
+    return {
+        'mean': float(values.mean()),
+        'median': float(np.median(values)),
+        'std': float(values.std()),
+        'min': float(values.min()),
+        'max': float(values.max()),
+        'count': int(values.size),
+    }
+
+
+def _memo_key(plot, imagery, index_name, expr):
+    digest = hashlib.sha1(expr.source.encode()).hexdigest()[:12]
+    return (f'timeseries:{plot.id}:{plot.updated_at}:{imagery.id}:{imagery.updated_at}:'
+            f'{index_name}:{digest}')
+
+
+def _memo_get(keys):
+    try:
+        return redis_client.mget(keys)
+    except Exception as e:
+        logger.warning(f"时间序列缓存读取失败：{str(e)}")
+        return [None] * len(keys)
+
+
+def _memo_set(key, value):
+    try:
+        redis_client.setex(key, MEMO_TTL, json.dumps(value))
+    except Exception as e:
+        logger.warning(f"时间序列缓存写入失败：{str(e)}")
+
+
+def plot_timeseries(plot, imageries, index_name, expr, geometry_crs='EPSG:4326', workers=4):
+    """返回地块在各期影像上的指数统计，按 capture_time 升序（无拍摄时间的排在最后）"""
+    geometry = cached_geometry(plot)
+    if geometry is None or geometry.is_empty:
+        raise ValueError(f'地块几何无效：ID={plot.id}')
+    candidates = []
+    for imagery in imageries:
+        if not imagery.file_path:
+            continue
+        footprint = cached_geometry(imagery)
+        if footprint is not None and not footprint.intersects(geometry):
+            continue
+        candidates.append(imagery)
+
+    keys = [_memo_key(plot, imagery, index_name, expr) for imagery in candidates]
+    cached = _memo_get(keys) if keys else []
+    values, pending = {}, []
+    for imagery, key, raw in zip(candidates, keys, cached):
+        if raw is not None:
+            values[imagery.id] = json.loads(raw)
+        else:
+            pending.append((imagery, key))
+
+    if pending:
+        jobs = [
+            (imagery, key, optimized_path(imagery), resolve_band_map(imagery))
+            for imagery, key in pending
+        ]
+
+        def run(job):
+            imagery, key, path, band_map = job
+            try:
+                return imagery, key, extract_plot_value(path, geometry, geometry_crs, expr, band_map), None
+            except (ValueError, RasterioError) as e:
+                return imagery, key, None, str(e)
+
+        with ThreadPoolExecutor(max_workers=min(workers, len(jobs))) as executor:
+            for imagery, key, value, error in executor.map(run, jobs):
+                if error:
+                    # 单期影像失败不影响整体序列，也不写缓存以便下次重试
+                    logger.warning(f"时间序列提取失败：plot={plot.id}, imagery={imagery.id}, 错误：{error}")
+                    continue
+                values[imagery.id] = value
+                _memo_set(key, value)
+
+    series = []
+    for imagery in candidates:
+        value = values.get(imagery.id)
+        if value is None:
+            continue
+        series.append({
+            'imagery_id': imagery.id,
+            'imagery_name': imagery.name,
+            'capture_time': imagery.capture_time.isoformat() if imagery.capture_time else None,
+            **value
+        })
+    series.sort(key=lambda item: (item['capture_time'] is None, item['capture_time'] or ''))
+    return series
@@ -0,0 +1,123 @@
+"""JWT 黑名单：Redis 中的 blacklist:{jti} 为权威数据，每个进程在其前面维护一个已吊销 jti 的布隆过滤器
+
+吊销令牌时写入 Redis（有效期取令牌剩余寿命）并通过 pub/sub 广播 jti，各进程的监听线程将其加入本地过滤器。
+检查令牌时过滤器判定不存在即直接放行，只有可能存在（已吊销或误判）时才查询 Redis。
+监听线程启动时先订阅再扫描已有黑名单，订阅断开期间不信任过滤器，全部回退为查询 Redis；
+过滤器定期按 Redis 中仍有效的黑名单重建，清除已过期的 jti。
+"""
+import hashlib
+import logging
+import os
+import threading
+import time
+from ..extensions import redis_client
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = 'blacklist:'
+CHANNEL = 'jwt_revoked'
+HASHES = 7
+FILTER_BITS = 1 << 20  # 约 10 万个有效的已吊销 jti 时误判率约 1%
+DEFAULT_TTL = 30 * 24 * 3600  # 令牌缺少 exp 时黑名单的有效期（秒）
+REBUILD_INTERVAL = 3600  # 过滤器重建间隔（秒）
+RETRY_INTERVAL = 5  # 订阅断开后的重连间隔（秒）
+
+
+class RevokedFilter:
+    """布隆过滤器：双重散列取 HASHES 个位"""
+
+    def __init__(self, bits=FILTER_BITS):
+        self.bits = bits
+        self.array = bytearray((bits + 7) // 8)
+
+    def _positions(self, jti):
+        digest = hashlib.blake2b(jti.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + i * h2) % self.bits for i in range(HASHES)]
+
+    def add(self, jti):
+        for position in self._positions(jti):
+            self.array[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, jti):
+        array = self.array
+        return all(array[position >> 3] >> (position & 7) & 1 for position in self._positions(jti))
+
+
+class TokenBlocklist:
+    def __init__(self):
+        self._filter = RevokedFilter()
+        self._ready = False
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def revoke(self, jwt_payload):
+        """吊销令牌：有效期为令牌剩余寿命（至少 1 秒），并通知其他进程"""
+        jti = jwt_payload['jti']
+        exp = jwt_payload.get('exp')
+        ttl = max(int(exp - time.time()) + 1, 1) if exp else DEFAULT_TTL
+        redis_client.setex(f'{KEY_PREFIX}{jti}', ttl, 'revoked')
+        self._filter.add(jti)
+        try:
+            redis_client.publish(CHANNEL, jti)
+        except Exception as e:
+            # 黑名单已写入 Redis，但其他进程的过滤器要到下次重建才包含该 jti
+            logger.warning(f"令牌吊销广播失败：jti={jti}，错误：{str(e)}")
+
+    def is_revoked(self, jwt_payload):
+        jti = jwt_payload['jti']
+        self._ensure_listener()
+        if self._ready and jti not in self._filter:
+            return False
+        return redis_client.get(f'{KEY_PREFIX}{jti}') is not None
+
+    def _ensure_listener(self):
+        # 按进程启动监听线程（多进程部署时 fork 后的子进程需要自己的线程与订阅连接）
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._ready = False
+            self._pid = os.getpid()
+            threading.Thread(target=self._listen, name='jwt-blocklist', daemon=True).start()
+
+    def _load(self):
+        revoked = RevokedFilter()
+        for key in redis_client.scan_iter(match=f'{KEY_PREFIX}*', count=1000):
+            key = key.decode() if isinstance(key, bytes) else key
+            revoked.add(key[len(KEY_PREFIX):])
+        return revoked
+
+    def _listen(self):
+        while True:
+            pubsub = None
+            try:
+                pubsub = redis_client.pubsub(ignore_subscribe_messages=True)
+                # 先订阅再扫描，扫描期间的吊销消息留在订阅缓冲中，随后加入过滤器
+                pubsub.subscribe(CHANNEL)
+                self._filter = self._load()
+                self._ready = True
+                rebuild_at = time.monotonic() + REBUILD_INTERVAL
+                while True:
+                    message = pubsub.get_message(timeout=1.0)
+                    if message and message.get('type') == 'message':
+                        jti = message['data']
+                        self._filter.add(jti.decode() if isinstance(jti, bytes) else jti)
+                    if time.monotonic() >= rebuild_at:
+                        self._filter = self._load()
+                        rebuild_at = time.monotonic() + REBUILD_INTERVAL
+            except Exception as e:
+                self._ready = False
+                logger.warning(f"令牌黑名单订阅中断，暂时逐次查询 Redis：{str(e)}")
+                time.sleep(RETRY_INTERVAL)
+            finally:
+                if pubsub is not None:
+                    try:
+                        pubsub.close()
+                    except Exception:
+                        pass
+
+
+token_blocklist = TokenBlocklist()
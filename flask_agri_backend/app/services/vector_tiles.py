@@ -0,0 +1,246 @@
+"""Mapbox Vector Tile（MVT 2.1）编码：地块与 3D 对象按瓦片裁剪、化简、量化后输出
+
+几何在瓦片坐标系（0~EXTENT）内化简，容差固定为 1 个瓦片单位，缩放级别越低化简越强；
+属性只保留地图渲染需要的字段。
+"""
+import numpy as np
+import shapely
+from rasterio.warp import transform as transform_coords, transform_bounds
+from shapely.geometry import box
+from shapely.geometry.polygon import orient
+from ..extensions import db
+from ..models import Plot, MapObject3D
+from .geometry import geometry_cache
+from .spatial_index import spatial_index
+from .tiles import tile_bounds
+
+EXTENT = 4096
+# 裁剪缓冲（瓦片单位），避免相邻瓦片接缝处出现描边断口
+BUFFER = 64
+SIMPLIFY_TOLERANCE = 1.0
+
+# 图层名 -> (模型, 输出属性)
+LAYERS = {
+    'plots': (Plot, ('name', 'crop_type', 'soil_type')),
+    'map_objects_3d': (MapObject3D, ('name', 'type')),
+}
+
+GEOM_POINT, GEOM_LINESTRING, GEOM_POLYGON = 1, 2, 3
+CMD_MOVE_TO, CMD_LINE_TO, CMD_CLOSE_PATH = 1, 2, 7
+
+
+def _varint(value, out):
+    while value > 0x7F:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _zigzag(value):
+    return (value << 1) ^ (value >> 63)
+
+
+def _field_varint(field, value, out):
+    _varint(field << 3, out)
+    _varint(value, out)
+
+
+def _field_bytes(field, data, out):
+    _varint((field << 3) | 2, out)
+    _varint(len(data), out)
+    out.extend(data)
+
+
+def _packed(field, values, out):
+    payload = bytearray()
+    for value in values:
+        _varint(value, payload)
+    _field_bytes(field, payload, out)
+
+
+def _encode_value(value):
+    out = bytearray()
+    if isinstance(value, bool):
+        _field_varint(7, int(value), out)
+    elif isinstance(value, int):
+        _field_varint(6, _zigzag(value), out)
+    elif isinstance(value, float):
+        _varint((3 << 3) | 1, out)
+        out.extend(np.float64(value).tobytes())
+    else:
+        _field_bytes(1, str(value).encode('utf-8'), out)
+    return bytes(out)
+
+
+class _GeometryEncoder:
+    """按 MVT 命令序列编码几何，游标在同一要素的各部分之间延续"""
+
+    def __init__(self):
+        self.commands = []
+        self.x = self.y = 0
+
+    def _points(self, coords):
+        for x, y in coords:
+            self.commands.append(_zigzag(x - self.x))
+            self.commands.append(_zigzag(y - self.y))
+            self.x, self.y = x, y
+
+    def points(self, coords):
+        self.commands.append(CMD_MOVE_TO | (len(coords) << 3))
+        self._points(coords)
+
+    def line(self, coords):
+        self.commands.append(CMD_MOVE_TO | (1 << 3))
+        self._points(coords[:1])
+        self.commands.append(CMD_LINE_TO | ((len(coords) - 1) << 3))
+        self._points(coords[1:])
+
+    def ring(self, coords):
+        self.line(coords)
+        self.commands.append(CMD_CLOSE_PATH | (1 << 3))
+
+
+def _dedupe(coords):
+    """量化后的整数坐标去除相邻重复点"""
+    coords = np.asarray(coords, dtype=np.int64)
+    if len(coords) > 1:
+        keep = np.ones(len(coords), dtype=bool)
+        keep[1:] = (coords[1:] != coords[:-1]).any(axis=1)
+        coords = coords[keep]
+    return coords.tolist()
+
+
+def _parts(geometry, dimension):
+    if geometry.is_empty:
+        return []
+    if hasattr(geometry, 'geoms'):
+        return [part for g in geometry.geoms for part in _parts(g, dimension)]
+    return [geometry] if shapely.get_dimensions(geometry) == dimension else []
+
+
+def encode_geometry(geometry):
+    """返回 (几何类型, 命令序列)，几何在量化后退化为空时返回 None"""
+    dimension = int(shapely.get_dimensions(geometry))
+    parts = _parts(geometry, dimension)
+    encoder = _GeometryEncoder()
+    if dimension == 0:
+        coords = [list(map(int, part.coords[0])) for part in parts]
+        if not coords:
+            return None
+        encoder.points(coords)
+        return GEOM_POINT, encoder.commands
+    if dimension == 1:
+        for part in parts:
+            coords = _dedupe(part.coords)
+            if len(coords) >= 2:
+                encoder.line(coords)
+        return (GEOM_LINESTRING, encoder.commands) if encoder.commands else None
+    for part in parts:
+        # 瓦片坐标系 y 轴向下，外环按测量员公式面积为正，内环为负
+        polygon = orient(part, sign=1.0)
+        rings = [polygon.exterior, *polygon.interiors]
+        for i, ring in enumerate(rings):
+            coords = _dedupe(ring.coords[:-1])
+            if len(coords) > 1 and coords[-1] == coords[0]:
+                coords.pop()
+            if len(coords) < 3:
+                if i == 0:
+                    break
+                continue
+            encoder.ring(coords)
+    return (GEOM_POLYGON, encoder.commands) if encoder.commands else None
+
+
+def _tile_transform(z, x, y, geometry_crs):
+    """返回将 geometry_crs 坐标（N×2 数组）变换到瓦片坐标的函数"""
+    left, bottom, right, top = tile_bounds(z, x, y)
+    scale = EXTENT / (right - left)
+    geographic = str(geometry_crs).upper() in ('EPSG:4326', 'OGC:CRS84')
+
+    def transform(coords):
+        if geographic:
+            lon = coords[:, 0]
+            lat = np.clip(coords[:, 1], -85.0511287798, 85.0511287798)
+            mx = np.radians(lon) * 6378137.0
+            my = np.log(np.tan(np.pi / 4 + np.radians(lat) / 2)) * 6378137.0
+        else:
+            mx, my = transform_coords(geometry_crs, 'EPSG:3857', coords[:, 0], coords[:, 1])
+            mx, my = np.asarray(mx), np.asarray(my)
+        return np.column_stack(((mx - left) * scale, (top - my) * scale))
+    return transform
+
+
+def _query_bounds(z, x, y, geometry_crs):
+    """瓦片（含缓冲）在 geometry_crs 下的外包范围"""
+    left, bottom, right, top = tile_bounds(z, x, y)
+    pad = (right - left) * BUFFER / EXTENT
+    return transform_bounds('EPSG:3857', geometry_crs, left - pad, bottom - pad, right + pad, top + pad,
+                            densify_pts=21)
+
+
+def render_vector_tile(layer, z, x, y, geometry_crs='EPSG:4326'):
+    """渲染单个图层的 MVT 瓦片，返回 protobuf 字节串（无要素时为空串）"""
+    model, attributes = LAYERS[layer]
+    bounds = _query_bounds(z, x, y, geometry_crs)
+    ids = spatial_index(model).query(bounds)
+    if not ids:
+        return b''
+    columns = [getattr(model, name) for name in attributes]
+    rows = db.session.query(model.id, model.updated_at, model.geom, *columns) \
+        .filter(model.id.in_(ids)).order_by(model.id).all()
+
+    to_tile = _tile_transform(z, x, y, geometry_crs)
+    clip_box = box(*bounds)
+    keys = {name: i for i, name in enumerate(attributes)}
+    values = {}
+    features = bytearray()
+    for record_id, updated_at, text, *attrs in rows:
+        geometry = geometry_cache.get(model.__tablename__, record_id, 'geom', updated_at, text)
+        if geometry is None or geometry.is_empty:
+            continue
+        if not geometry.within(clip_box):
+            geometry = shapely.clip_by_rect(geometry, *bounds)
+            if geometry.is_empty:
+                continue
+        geometry = shapely.transform(geometry, to_tile)
+        if shapely.get_dimensions(geometry) > 0:
+            geometry = shapely.simplify(geometry, SIMPLIFY_TOLERANCE, preserve_topology=True)
+        geometry = shapely.clip_by_rect(geometry, -BUFFER, -BUFFER, EXTENT + BUFFER, EXTENT + BUFFER)
+        if geometry.is_empty:
+            continue
+        geometry = shapely.set_precision(geometry, 1.0)
+        if geometry.is_empty:
+            continue
+        encoded = encode_geometry(geometry)
+        if encoded is None:
+            continue
+        geom_type, commands = encoded
+
+        tags = []
+        for name, value in zip(attributes, attrs):
+            if value is None:
+                continue
+            index = values.setdefault(value, len(values))
+            tags.extend((keys[name], index))
+        feature = bytearray()
+        _field_varint(1, int(record_id), feature)
+        if tags:
+            _packed(2, tags, feature)
+        _field_varint(3, geom_type, feature)
+        _packed(4, commands, feature)
+        _field_bytes(2, feature, features)
+
+    if not features:
+        return b''
+    payload = bytearray()
+    _field_varint(15, 2, payload)
+    _field_bytes(1, layer.encode('utf-8'), payload)
+    payload.extend(features)
+    for name in attributes:
+        _field_bytes(3, name.encode('utf-8'), payload)
+    for value in values:
+        _field_bytes(4, _encode_value(value), payload)
+    _field_varint(5, EXTENT, payload)
+    tile = bytearray()
+    _field_bytes(3, payload, tile)
+    return bytes(tile)
@@ -0,0 +1,198 @@
+"""地块分区统计：一次扫描栅格，向量化汇总所有相交地块的统计量
+
+地块多边形按栅格网格栅格化为标签图（像元值 = 地块序号），标签图以压缩 GeoTIFF 缓存到磁盘，
+同一网格（同一影像及其全部分析结果）与同一批地块版本再次统计时直接复用。
+地块之间如有重叠，重叠像元只归属于序号较大的地块。
+"""
+import hashlib
+import math
+import os
+import numpy as np
+import rasterio
+from rasterio.errors import WindowError
+from rasterio.features import rasterize, bounds as geometry_bounds
+from rasterio.warp import transform_bounds
+from rasterio.windows import Window, from_bounds, bounds as window_bounds, transform as window_transform
+from shapely.geometry import box
+from ..models import Plot
+from .geometry import cached_geometry, project_geometry
+from .raster import iter_windows
+from .spatial_index import spatial_index
+
+# 直方图细分倍数：百分位由 bins * FINE_FACTOR 个细分桶估算
+FINE_FACTOR = 50
+PERCENTILES = (5, 25, 50, 75, 95)
+
+
+def plots_in_extent(src, geometry_crs='EPSG:4326'):
+    """经空间索引查询与栅格范围相交的地块，耗时随影像覆盖的地块数而非地块总数增长"""
+    if src.crs is None:
+        raise ValueError('栅格缺少坐标参考，无法与地块叠加')
+    bbox = transform_bounds(src.crs, geometry_crs, *src.bounds, densify_pts=21)
+    ids = spatial_index(Plot).query(bbox)
+    return Plot.query.filter(Plot.id.in_(ids)).order_by(Plot.id).all() if ids else []
+
+
+def _project_plots(plots, src, geometry_crs):
+    """解析地块几何并投影到栅格坐标系，返回与栅格范围相交的 [(plot, geojson, bounds)]"""
+    extent = box(*src.bounds)
+    projected = []
+    for plot in plots:
+        geometry = cached_geometry(plot)
+        if geometry is None or geometry.is_empty:
+            continue
+        geojson = project_geometry(geometry, src.crs, geometry_crs)
+        bounds = geometry_bounds(geojson)
+        if box(*bounds).intersects(extent):
+            projected.append((plot, geojson, bounds))
+    return projected
+
+
+def _mask_path(mask_dir, src, union_window, projected):
+    """标签图缓存路径：由栅格网格、统计窗口和地块 (id, updated_at) 共同决定"""
+    digest = hashlib.sha1()
+    digest.update(str(src.crs).encode())
+    digest.update(repr(tuple(src.transform)).encode())
+    digest.update(repr((src.width, src.height, union_window.flatten())).encode())
+    for plot, _, _ in projected:
+        digest.update(f'{plot.id}:{plot.updated_at}'.encode())
+    return os.path.join(mask_dir, f'{digest.hexdigest()}.tif')
+
+
+def zonal_statistics(src, reader, plots, value_range=(-1.0, 1.0), bins=20,
+                     geometry_crs='EPSG:4326', mask_dir=None, block_size=1024):
+    """计算每个地块的像元统计
+
+    reader(window) 返回该窗口的 float32 数组，无效像元为 NaN。
+    返回列表，每项包含 plot 及 pixel_count/count/mean/std/min/max/percentiles/histogram。
+    """
+    if src.crs is None:
+        raise ValueError('栅格缺少坐标参考，无法与地块叠加')
+    projected = _project_plots(plots, src, geometry_crs)
+    if not projected:
+        return []
+    n = len(projected)
+    lo, hi = value_range
+    fine_bins = bins * FINE_FACTOR
+    scale = fine_bins / (hi - lo)
+
+    left = min(b[0] for _, _, b in projected)
+    bottom = min(b[1] for _, _, b in projected)
+    right = max(b[2] for _, _, b in projected)
+    top = max(b[3] for _, _, b in projected)
+    try:
+        union_window = from_bounds(left, bottom, right, top, src.transform) \
+            .round_offsets(op='floor').round_lengths(op='ceil') \
+            .intersection(Window(0, 0, src.width, src.height))
+    except WindowError:
+        return []
+    union_window = Window(int(union_window.col_off), int(union_window.row_off),
+                          int(math.ceil(union_window.width)), int(math.ceil(union_window.height)))
+
+    pixel_count = np.zeros(n + 1, dtype=np.int64)
+    count = np.zeros(n + 1, dtype=np.int64)
+    total = np.zeros(n + 1, dtype=np.float64)
+    total_sq = np.zeros(n + 1, dtype=np.float64)
+    minimum = np.full(n + 1, np.inf)
+    maximum = np.full(n + 1, -np.inf)
+    hist = np.zeros((n + 1) * fine_bins, dtype=np.int64)
+
+    mask_path = _mask_path(mask_dir, src, union_window, projected) if mask_dir else None
+    cached = mask_path is not None and os.path.exists(mask_path)
+    plot_bounds = np.array([b for _, _, b in projected])
+    mask_src = mask_dst = None
+    tmp_path = f'{mask_path}.{os.getpid()}.tmp' if mask_path and not cached else None
+    try:
+        if cached:
+            mask_src = rasterio.open(mask_path)
+        elif tmp_path:
+            os.makedirs(mask_dir, exist_ok=True)
+            mask_dst = rasterio.open(
+                tmp_path, 'w', driver='GTiff', width=union_window.width, height=union_window.height,
+                count=1, dtype='int32', crs=src.crs, transform=window_transform(union_window, src.transform),
+                tiled=True, blockxsize=256, blockysize=256, compress='deflate'
+            )
+        for local in iter_windows(union_window.width, union_window.height, block_size):
+            window = Window(union_window.col_off + local.col_off, union_window.row_off + local.row_off,
+                            local.width, local.height)
+            shape = (int(local.height), int(local.width))
+            if mask_src is not None:
+                labels = mask_src.read(1, window=local)
+            else:
+                w_left, w_bottom, w_right, w_top = window_bounds(window, src.transform)
+                hits = np.nonzero((plot_bounds[:, 0] <= w_right) & (plot_bounds[:, 2] >= w_left) &
+                                  (plot_bounds[:, 1] <= w_top) & (plot_bounds[:, 3] >= w_bottom))[0]
+                if hits.size:
+                    labels = rasterize(((projected[i][1], int(i) + 1) for i in hits), out_shape=shape,
+                                       transform=window_transform(window, src.transform),
+                                       fill=0, dtype='int32')
+                else:
+                    labels = np.zeros(shape, dtype=np.int32)
+                if mask_dst is not None:
+                    mask_dst.write(labels, 1, window=local)
+            inside = labels > 0
+            if not inside.any():
+                continue
+            values = reader(window)[inside]
+            label = labels[inside]
+            pixel_count += np.bincount(label, minlength=n + 1)
+            valid = np.isfinite(values)
+            values = values[valid].astype(np.float64)
+            label = label[valid]
+            if not values.size:
+                continue
+            count += np.bincount(label, minlength=n + 1)
+            total += np.bincount(label, weights=values, minlength=n + 1)
+            total_sq += np.bincount(label, weights=values * values, minlength=n + 1)
+            np.minimum.at(minimum, label, values)
+            np.maximum.at(maximum, label, values)
+            idx = ((values - lo) * scale).astype(np.int64)
+            np.clip(idx, 0, fine_bins - 1, out=idx)
+            hist += np.bincount(label * fine_bins + idx, minlength=(n + 1) * fine_bins)
+        if mask_dst is not None:
+            mask_dst.close()
+            mask_dst = None
+            os.replace(tmp_path, mask_path)
+    finally:
+        if mask_src is not None:
+            mask_src.close()
+        if mask_dst is not None:
+            mask_dst.close()
+        if tmp_path and os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+    hist = hist.reshape(n + 1, fine_bins)
+    cumulative = np.cumsum(hist, axis=1)
+    coarse = hist.reshape(n + 1, bins, FINE_FACTOR).sum(axis=2)
+    edges = np.linspace(lo, hi, bins + 1).round(6).tolist()
+    fine_width = (hi - lo) / fine_bins
+    results = []
+    for i, (plot, _, _) in enumerate(projected, start=1):
+        item = {'plot': plot, 'pixel_count': int(pixel_count[i]), 'count': int(count[i])}
+        if count[i]:
+            mean = total[i] / count[i]
+            ranks = [q / 100.0 * (count[i] - 1) for q in PERCENTILES]
+            positions = np.searchsorted(cumulative[i], ranks, side='right')
+            item.update(
+                mean=float(mean),
+                std=float(math.sqrt(max(total_sq[i] / count[i] - mean * mean, 0.0))),
+                min=float(minimum[i]),
+                max=float(maximum[i]),
+                percentiles={
+                    f'p{q}': float(min(max(lo + (pos + 0.5) * fine_width, minimum[i]), maximum[i]))
+                    for q, pos in zip(PERCENTILES, positions)
+                }
+            )
+        else:
+            item.update(mean=None, std=None, min=None, max=None, percentiles={})
+        item['histogram'] = {'edges': edges, 'counts': coarse[i].tolist()}
+        results.append(item)
+    return results
+
+
+def zone_row(item):
+    """将统计结果转为接口输出的行"""
+    plot = item['plot']
+    row = {'plot_id': plot.id, 'plot_name': plot.name, 'crop_type': plot.crop_type}
+    row.update({key: value for key, value in item.items() if key != 'plot'})
+    return row
@@ -0,0 +1,152 @@
+"""测试夹具：SQLite 临时数据库 + 行为与 redis_client（decode_responses=True）一致的内存 Redis"""
+import fnmatch
+import sys
+import time
+import pytest
+from flask import Flask
+from flask_restful import Api
+from sqlalchemy import BigInteger
+from sqlalchemy.dialects.mysql import ENUM
+from sqlalchemy.ext.compiler import compiles
+from app.config import Config
+from app.extensions import db, jwt
+from app.resources import register_resources
+from app.services import reference_cache, spatial_index
+from app.services.menu_tree import menu_tree
+from app.services.permissions import permission_engine
+
+
+# 模型使用 MySQL 类型，SQLite 下按等价类型建表（BIGINT 主键需为 INTEGER 才能自增）
+@compiles(ENUM, 'sqlite')
+def _compile_enum(element, compiler, **kw):
+    return 'VARCHAR(32)'
+
+
+@compiles(BigInteger, 'sqlite')
+def _compile_big_integer(element, compiler, **kw):
+    return 'INTEGER'
+
+
+class PubSub:
+    """redis-py PubSub 的最小子集：subscribe / get_message / close"""
+
+    def __init__(self, redis):
+        self.redis = redis
+        self.channels = set()
+        self.messages = []
+
+    def subscribe(self, *channels):
+        self.channels.update(channels)
+        self.redis.subscribers.append(self)
+
+    def get_message(self, timeout=0.0):
+        if self.messages:
+            return self.messages.pop(0)
+        time.sleep(min(timeout, 0.01))
+        return None
+
+    def close(self):
+        if self in self.redis.subscribers:
+            self.redis.subscribers.remove(self)
+
+
+class DecodingRedis:
+    """写入字节串，读取返回 str，与 decode_responses=True 的客户端一致"""
+
+    def __init__(self):
+        self.data = {}
+        self.expires = {}
+        self.subscribers = []
+
+    def _value(self, key):
+        if key in self.expires and self.expires[key] < time.time():
+            self.data.pop(key, None)
+            self.expires.pop(key, None)
+        return self.data.get(key)
+
+    def get(self, key):
+        return self._value(key)
+
+    def mget(self, keys):
+        return [self._value(key) for key in keys]
+
+    def set(self, key, value, nx=False, px=None, ex=None):
+        if nx and self._value(key) is not None:
+            return None
+        self.data[key] = value.decode() if isinstance(value, bytes) else str(value)
+        if px or ex:
+            self.expires[key] = time.time() + (px / 1000 if px else ex)
+        return True
+
+    def setex(self, key, ttl, value):
+        return self.set(key, value, ex=ttl)
+
+    def incr(self, key):
+        self.data[key] = str(int(self._value(key) or 0) + 1)
+        return int(self.data[key])
+
+    def exists(self, key):
+        return int(self._value(key) is not None)
+
+    def delete(self, *keys):
+        return sum(self.data.pop(key, None) is not None for key in keys)
+
+    def eval(self, script, numkeys, *args):
+        # 仅支持记录缓存的回填与释放脚本
+        keys, argv = args[:numkeys], args[numkeys:]
+        if numkeys == 2:
+            if self.get(keys[1]) == argv[0]:
+                self.set(keys[0], argv[1], px=int(argv[2]))
+                self.delete(keys[1])
+                return 1
+            return 0
+        return self.delete(keys[0]) if self.get(keys[0]) == argv[0] else 0
+
+    def keys(self, pattern='*'):
+        return [key for key in list(self.data) if fnmatch.fnmatch(key, pattern)]
+
+    def scan_iter(self, match='*', count=None):
+        return iter([key for key in self.keys(match) if self._value(key) is not None])
+
+    def publish(self, channel, message):
+        receivers = [pubsub for pubsub in list(self.subscribers) if channel in pubsub.channels]
+        for pubsub in receivers:
+            pubsub.messages.append({'type': 'message', 'channel': channel, 'data': str(message)})
+        return len(receivers)
+
+    def pubsub(self, ignore_subscribe_messages=False):
+        return PubSub(self)
+
+
+@pytest.fixture
+def redis(monkeypatch):
+    fake = DecodingRedis()
+    for name, module in list(sys.modules.items()):
+        if name.startswith('app.') and hasattr(module, 'redis_client'):
+            monkeypatch.setattr(module, 'redis_client', fake)
+    # 进程内快照与索引按表单例，每个测试从空的数据库与版本号开始
+    monkeypatch.setattr(reference_cache, '_snapshots', {})
+    monkeypatch.setattr(spatial_index, '_indexes', {})
+    monkeypatch.setattr(permission_engine, '_versions', None)
+    monkeypatch.setattr(menu_tree, '_state', (None, [], {}, {}))
+    return fake
+
+
+@pytest.fixture
+def app(redis, tmp_path):
+    app = Flask(__name__)
+    app.config.from_object(Config)
+    # 文件数据库：接口的并发查询在其他线程中执行，需要看到同一份数据
+    app.config.update(SQLALCHEMY_DATABASE_URI=f'sqlite:///{tmp_path / "test.db"}', TESTING=True)
+    db.init_app(app)
+    jwt.init_app(app)
+    register_resources(Api(app))
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
@@ -0,0 +1,25 @@
+"""指数计算接口：indices 参数类型错误返回 400"""
+import json
+import pytest
+
+
+@pytest.mark.parametrize('indices', [
+    5,
+    None,
+    [3],
+    {'name': 'x', 'expression': 'nir - red', 'range': ['a', 'b']},
+    {'name': 'x', 'expression': 'nir - red', 'range': [None, 1]},
+    {'name': 'x', 'expression': 'nir - red', 'range': [[0], 1]},
+    {'name': 7, 'expression': 'nir - red'},
+    {'name': 'x', 'expression': ['nir']},
+    {'name': 'ndvi', 'expression': 'nir * 2'},
+])
+def test_invalid_indices(client, indices):
+    response = client.post('/api/analysis_results/index/1', data={'indices': json.dumps(indices)})
+    assert response.status_code == 400
+    assert response.get_json()['error_code'] == '4002'
+
+
+def test_unknown_imagery(client):
+    response = client.post('/api/analysis_results/index/1', data={'indices': json.dumps(['ndvi'])})
+    assert response.status_code == 404
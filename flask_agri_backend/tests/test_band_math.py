@@ -0,0 +1,116 @@
+"""波段运算引擎：表达式编译、求值与多指数接口"""
+import json
+import numpy as np
+import pytest
+import rasterio
+from rasterio.transform import from_origin
+from app.extensions import db
+from app.models import AnalysisResult, Imagery
+from app.services.band_math import PRESETS, CompiledExpression, compile_indices
+
+
+def _evaluate(expr, bands):
+    shape = next(iter(bands.values())).shape
+    buffers = [np.empty(shape, dtype=np.float32) for _ in range(expr.registers)]
+    out = np.empty(shape, dtype=np.float32)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return expr.evaluate(bands, buffers, out)
+
+
+def test_presets_compile():
+    compiled = compile_indices(list(PRESETS))
+    assert list(compiled) == list(PRESETS)
+    assert compiled['evi'].bands == {'nir', 'red', 'blue'}
+    assert compiled['savi'].value_range == (-1.5, 1.5)
+
+
+def test_expression_matches_numpy():
+    rng = np.random.default_rng(0)
+    nir, red = (rng.uniform(1, 100, (5, 7)).astype(np.float32) for _ in range(2))
+    expr = CompiledExpression('sqrt(abs(nir - red)) / (nir + red) * -2 + max(nir, red) ** 2')
+    expected = np.sqrt(np.abs(nir - red)) / (nir + red) * -2 + np.maximum(nir, red) ** 2
+    assert np.allclose(_evaluate(expr, {'nir': nir, 'red': red}), expected, rtol=1e-5)
+
+
+def test_registers_are_reused():
+    expr = CompiledExpression('(a + b) * (c + d) + (e + f)')
+    assert expr.registers <= 2
+
+
+def test_non_finite_becomes_nan():
+    zeros = np.zeros((2, 2), dtype=np.float32)
+    result = _evaluate(CompiledExpression('(nir - red) / (nir + red)'), {'nir': zeros, 'red': zeros})
+    assert np.isnan(result).all()
+
+
+@pytest.mark.parametrize('specs', [
+    [],
+    ['unknown'],
+    [{'name': '1bad', 'expression': 'nir'}],
+    [{'name': 'c', 'expression': '1 + 2'}],
+    [{'name': 'c', 'expression': 'nir +'}],
+    [{'name': 'c', 'expression': '__import__("os")'}],
+    [{'name': 'c', 'expression': 'nir.real'}],
+    [{'name': 'c', 'expression': 'sqrt(nir, red)'}],
+    [{'name': 'c', 'expression': 'nir', 'range': [1, 0]}],
+])
+def test_invalid_specs(specs):
+    with pytest.raises(ValueError):
+        compile_indices(specs)
+
+
+@pytest.mark.parametrize('specs', [
+    [{'name': 'ndvi', 'expression': 'nir * 2'}],
+    [{'name': 'NDRE', 'expression': 'nir - red'}],
+    ['ndvi', {'name': 'Ndvi', 'expression': 'nir'}],
+    [{'name': 'mine', 'expression': 'nir'}, {'name': 'mine', 'expression': 'red'}],
+])
+def test_rejects_name_collisions(specs):
+    with pytest.raises(ValueError):
+        compile_indices(specs)
+
+
+def test_presets_and_custom_together():
+    compiled = compile_indices(['ndvi', {'name': 'ratio', 'expression': 'nir / red', 'range': [0, 10]}])
+    assert list(compiled) == ['ndvi', 'ratio']
+    assert compiled['ratio'].value_range == (0.0, 10.0)
+
+
+@pytest.fixture
+def imagery(app, tmp_path):
+    path = str(tmp_path / 'capture.tif')
+    with rasterio.open(path, 'w', driver='GTiff', width=40, height=30, count=3, dtype='uint16',
+                       crs='EPSG:4326', transform=from_origin(0, 1, 0.01, 0.01)) as dst:
+        dst.write(np.stack([np.full((30, 40), 100), np.full((30, 40), 300),
+                            np.full((30, 40), 200)]).astype(np.uint16))
+    app.config['ANALYSIS_OUTPUT_DIR'] = str(tmp_path / 'out')
+    app.config['RASTER_BLOCK_SIZE'] = 16
+    record = Imagery(id=1, name='影像', file_path=path, red_band_index=1, nir_band_index=2)
+    db.session.add(record)
+    db.session.commit()
+    return record
+
+
+def test_index_endpoint_computes_all(client, imagery):
+    indices = ['ndvi', 'ndre', {'name': 'ratio', 'expression': 'nir / red', 'range': [0, 10]}]
+    response = client.post('/api/analysis_results/index/1', data={
+        'indices': json.dumps(indices), 'bands': json.dumps({'red_edge': 3})})
+    assert response.status_code == 201
+    data = {item['type']: item for item in response.get_json()['data']}
+    assert set(data) == {'ndvi', 'ndre', 'ratio'}
+    assert data['ndvi']['stats']['mean'] == pytest.approx(0.5)
+    assert data['ndre']['stats']['mean'] == pytest.approx(0.2)
+    assert data['ratio']['stats']['mean'] == pytest.approx(3)
+    with rasterio.open(AnalysisResult.query.get(data['ratio']['id']).result_path) as src:
+        assert src.read(1)[29, 39] == pytest.approx(3)
+
+
+def test_index_endpoint_missing_band(client, imagery):
+    response = client.post('/api/analysis_results/index/1', data={'indices': '"ndre"'})
+    assert response.status_code == 400
+    assert 'red_edge' in response.get_json()['message']
+
+
+def test_index_endpoint_unknown_imagery(client, app):
+    response = client.post('/api/analysis_results/index/9', data={'indices': '"ndvi"'})
+    assert response.status_code == 404
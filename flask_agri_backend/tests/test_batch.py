@@ -0,0 +1,61 @@
+"""批量读取：一次 IN 查询按 id 返回记录，缺失的 id 单独列出"""
+import pytest
+from sqlalchemy import event
+from app.extensions import db
+from app.models import Plot, SystemUser
+
+
+@pytest.fixture
+def plots(app):
+    db.session.add_all([Plot(id=i, name=f'地块{i}', geom=f'POINT({i} 0)') for i in range(1, 5)])
+    db.session.commit()
+
+
+def test_batch_returns_records_by_id(client, plots):
+    statements = []
+
+    def capture(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(db.engine, 'before_cursor_execute', capture)
+    try:
+        response = client.get('/api/plots/batch?ids=3,9,1,3')
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', capture)
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body['message'] == '批量获取地块成功'
+    assert list(body['data']) == ['3', '1']
+    assert body['data']['1'] == Plot.query.get(1).to_dict()
+    assert body['missing'] == [9]
+    assert len(statements) == 1 and ' IN ' in statements[0]
+
+
+def test_batch_fields(client, plots):
+    body = client.get('/api/plots/batch?ids=2,4&fields=name').get_json()
+    assert body['data'] == {'2': {'name': '地块2'}, '4': {'name': '地块4'}}
+
+
+def test_batch_hides_columns(client):
+    db.session.add(SystemUser(id=1, username='admin', password_hash='hash'))
+    db.session.commit()
+    data = client.get('/api/system_users/batch?ids=1').get_json()['data']
+    assert data['1']['username'] == 'admin' and 'password_hash' not in data['1']
+
+
+@pytest.mark.parametrize('query, status, error_code', [
+    ('', 400, '4001'),
+    ('?ids=,', 400, '4001'),
+    ('?ids=1,a,-2', 400, '4002'),
+    ('?ids=1&fields=secret', 400, '4002'),
+])
+def test_batch_errors(client, plots, query, status, error_code):
+    response = client.get(f'/api/plots/batch{query}')
+    assert response.status_code == status and response.get_json()['error_code'] == error_code
+
+
+def test_batch_limit(app, client, plots):
+    app.config['BULK_MAX_ITEMS'] = 3
+    response = client.get('/api/tasks/batch?ids=1,2,3,4')
+    assert response.status_code == 400 and '单次最多 3 项' in response.get_json()['message']
+    assert client.get('/api/tasks/batch?ids=1,2,3').get_json()['missing'] == [1, 2, 3]
@@ -0,0 +1,102 @@
+"""启动数据接口：用户、角色、权限、菜单与概况一次返回，概况查询在线程池中执行"""
+import threading
+from datetime import datetime
+import pytest
+from flask_jwt_extended import create_access_token
+from app.extensions import db
+from app.models import Plot, RolePermission, SystemMenu, SystemPermission, SystemRole, SystemUser, Task, UserRole
+from app.services import bootstrap
+
+
+def _headers(app, user_id='1', **extra):
+    with app.test_request_context():
+        token = create_access_token(identity=user_id)
+    return {'Authorization': f'Bearer {token}', **extra}
+
+
+@pytest.fixture
+def executor(monkeypatch):
+    monkeypatch.setattr(bootstrap, '_executor', None)
+    yield
+    if bootstrap._executor is not None:
+        bootstrap._executor.shutdown(wait=True)
+
+
+@pytest.fixture
+def seed(app):
+    db.session.add_all([
+        SystemUser(id=1, username='u1', password_hash='x', status='active'),
+        SystemRole(id=1, name='飞手'), SystemRole(id=2, name='访客'),
+        SystemPermission(id=1, name='查看任务', code='task:view'),
+        RolePermission(role_id=1, permission_id=1), UserRole(user_id=1, role_id=1),
+        SystemMenu(id=1, name='首页', path='/home'),
+        Task(id=1, name='t1', type='mapping', status='done', field_id=1),
+        Task(id=2, name='t2', type='mapping', status='pending', field_id=1),
+        Task(id=3, name='t3', type='spraying', status='running', field_id=2, schedule_at=datetime(2024, 5, 2)),
+        Task(id=4, name='t4', type='spraying', status='pending', field_id=2, schedule_at=datetime(2024, 5, 1)),
+        Plot(id=1, name='东区', area=2.5, crop_type='玉米', geom='POINT(0 0)'),
+        Plot(id=2, name='西区', area=1.0, crop_type='玉米', geom='POINT(1 0)'),
+        Plot(id=3, name='北区', geom='POINT(2 0)'),
+    ])
+    db.session.commit()
+
+
+def test_bootstrap_body(app, client, seed, executor):
+    response = client.get('/api/bootstrap', headers=_headers(app))
+    assert response.status_code == 200
+    assert response.headers['ETag'] and response.headers['Cache-Control'] == 'private, no-cache'
+    body = response.get_json()
+    assert body['message'] == '启动数据获取成功'
+    data = body['data']
+    assert data['user']['username'] == 'u1' and 'password_hash' not in data['user']
+    assert [role['name'] for role in data['roles']] == ['飞手']
+    assert data['permissions'] == ['task:view']
+    assert [menu['name'] for menu in data['menus']] == ['首页']
+    tasks = data['tasks']
+    assert tasks['total'] == 4 and tasks['by_status'] == {'done': 1, 'pending': 2, 'running': 1}
+    # 有计划时间的按时间排在前，其余按 id
+    assert [task['id'] for task in tasks['active']] == [4, 3, 2]
+    assert tasks['active'][0] == {'id': 4, 'name': 't4', 'type': 'spraying', 'status': 'pending',
+                                  'field_id': 2, 'path_id': None, 'schedule_at': '2024-05-01T00:00:00'}
+    assert data['plots'] == {'total': 3, 'total_area': 3.5, 'by_crop': {'玉米': 2, 'unknown': 1}}
+
+
+def test_bootstrap_errors(app, client, seed):
+    assert client.get('/api/bootstrap').status_code == 401
+    response = client.get('/api/bootstrap', headers=_headers(app, '9'))
+    assert response.status_code == 404 and response.get_json()['message'] == '记录不存在：ID=9'
+
+
+def test_empty_summaries(app):
+    assert bootstrap.task_summary() == {'total': 0, 'by_status': {}, 'active': []}
+    assert bootstrap.plot_summary() == {'total': 0, 'total_area': None, 'by_crop': {}}
+
+
+def test_queries_run_in_pool_with_own_session(app, seed, executor):
+    def probe():
+        return threading.current_thread().name, Plot.query.count()
+
+    futures = bootstrap.submit_all(app, 2, probe=probe, tasks=bootstrap.task_summary)
+    name, count = futures['probe'].result()
+    assert name.startswith('bootstrap') and count == 3
+    assert futures['tasks'].result()['total'] == 4
+
+
+def test_repeated_bootstrap(app, client, redis, executor):
+    db.session.add(SystemUser(id=1, username='u1', password_hash='x', status='active'))
+    db.session.commit()
+    headers = _headers(app)
+
+    first = client.get('/api/bootstrap', headers=headers)
+    assert first.status_code == 200
+    assert redis.keys('record:system_users:1')
+
+    second = client.get('/api/bootstrap', headers=headers)
+    assert second.status_code == 200
+    assert second.get_json() == first.get_json()
+    assert second.get_json()['data']['user']['username'] == 'u1'
+    assert second.headers['ETag'] == first.headers['ETag']
+
+    cached = client.get('/api/bootstrap', headers=_headers(app, **{'If-None-Match': first.headers['ETag']}))
+    assert cached.status_code == 304
+    assert cached.data == b''
@@ -0,0 +1,25 @@
+"""批量创建与逐条创建写入相同的记录（含列默认值）"""
+from app.extensions import db
+from app.models import SystemMenu, SystemUser
+from app.resources.system_users import system_user_spec
+
+IGNORED = ('id', 'name', 'path', 'username', 'password_hash', 'created_at', 'updated_at')
+
+
+def _row(record):
+    return {key: value for key, value in record.to_dict().items() if key not in IGNORED}
+
+
+def test_bulk_row_matches_single_row(client):
+    assert client.post('/api/system_menus/create', data={'name': 'single', 'path': '/s'}).status_code == 201
+    assert client.post('/api/system_menus/bulk', json={'items': [{'name': 'bulk', 'path': '/b'}]}).get_json()['succeeded'] == 1
+    single, bulk = SystemMenu.query.order_by(SystemMenu.id).all()
+    assert _row(bulk) == _row(single)
+    assert bulk.order_num == 0
+    assert bulk.created_at is not None
+
+
+def test_bulk_user_gets_model_defaults(app):
+    ids = system_user_spec._insert_rows([{'username': 'bulk', 'password_hash': 'x'}])
+    db.session.commit()
+    assert SystemUser.query.get(ids[0]).status == 'active'
@@ -0,0 +1,26 @@
+"""批量删除：无效 id 逐项报错，不影响其余项"""
+from app.extensions import db
+from app.models import SystemRole
+
+
+def _roles(*names):
+    db.session.add_all([SystemRole(name=name) for name in names])
+    db.session.commit()
+
+
+def test_invalid_ids_reported_per_item(client):
+    _roles('a', 'b')
+    response = client.delete('/api/system_roles/bulk', json={'ids': [1, [1], {'id': 2}, True, '2', 99]})
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body['succeeded'] == 2
+    errors = {result['index']: result['error_code'] for result in body['data'] if 'error' in result}
+    assert errors == {1: '4002', 2: '4002', 3: '4002', 5: '4041'}
+    assert client.get('/api/system_roles/list').get_json()['data'] == []
+
+
+def test_atomic_skips_on_invalid_id(client):
+    _roles('a')
+    response = client.delete('/api/system_roles/bulk?atomic=true', json={'ids': [1, [1]]})
+    assert [result.get('status') for result in response.get_json()['data']] == ['skipped', None]
+    assert len(client.get('/api/system_roles/list').get_json()['data']) == 1
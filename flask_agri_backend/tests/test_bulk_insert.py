@@ -0,0 +1,41 @@
+"""批量创建：自增 id 不能由 lastrowid 推算时仍以多行 INSERT 写入，并按唯一键回查 id"""
+import logging
+import pytest
+from sqlalchemy import event
+from app.extensions import db
+from app.models import SystemRole
+from app.resources import crud
+
+
+@pytest.fixture
+def inserts(app, monkeypatch):
+    monkeypatch.setattr(crud, '_insert_id_mode', lambda: None)
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith('INSERT'):
+            statements.append(statement)
+
+    event.listen(db.engine, 'before_cursor_execute', record)
+    yield statements
+    event.remove(db.engine, 'before_cursor_execute', record)
+
+
+def test_ids_recovered_by_unique_key(client, inserts):
+    db.session.add(SystemRole(name='existing'))
+    db.session.commit()
+    inserts.clear()
+
+    names = ['viewer', 'editor', 'admin']
+    response = client.post('/api/system_roles/bulk', json={'items': [{'name': name} for name in names]})
+    assert response.get_json()['succeeded'] == 3
+    assert len(inserts) == 1
+    for result, name in zip(response.get_json()['data'], names):
+        assert client.get(f'/api/system_roles/{result["id"]}').get_json()['data']['name'] == name
+
+
+def test_falls_back_to_row_inserts_without_unique_key(client, inserts, caplog):
+    with caplog.at_level(logging.WARNING, logger=crud.__name__):
+        response = client.post('/api/plots/bulk', json={'items': [{'name': f'p{i}', 'geom': 'POINT(116 39.9)'} for i in range(2)]})
+    assert [result['id'] for result in response.get_json()['data']] == [1, 2]
+    assert '逐行插入 2 行' in caplog.text
@@ -0,0 +1,22 @@
+"""批量写入的唯一约束检查：批次内重复与已有记录冲突逐项报错"""
+from app.extensions import db
+from app.models import SystemRole
+
+
+def test_duplicates_within_batch_and_existing(client):
+    db.session.add(SystemRole(name='taken'))
+    db.session.commit()
+    items = [{'name': f'r{i}'} for i in range(500)] + [{'name': 'r7'}, {'name': 'taken'}]
+    body = client.post('/api/system_roles/bulk', json={'items': items}).get_json()
+    assert body['succeeded'] == 500
+    assert {result['index']: result['error'] for result in body['data'] if 'error' in result} == {
+        500: '角色名称已存在：name=r7', 501: '角色名称已存在：name=taken'
+    }
+
+
+def test_update_swapping_into_taken_name(client):
+    db.session.add_all([SystemRole(name='a'), SystemRole(name='b')])
+    db.session.commit()
+    body = client.put('/api/system_roles/bulk', json={'items': [{'id': 1, 'name': 'b'}, {'id': 2, 'description': 'x'}]}).get_json()
+    assert body['data'][0]['error'] == '角色名称已存在：name=b'
+    assert body['data'][1]['status'] == 'updated'
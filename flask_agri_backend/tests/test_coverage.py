@@ -0,0 +1,147 @@
+"""覆盖航线规划：航带间距、单元分解、障碍物绕行、批量规划的进程池与规划接口"""
+import json
+import pytest
+from concurrent.futures.process import BrokenProcessPool
+from shapely.geometry import LineString, Polygon, box
+from app.extensions import db
+from app.models import FlightPath, Plot
+from app.services import coverage
+
+FIELD = 'POLYGON((116 39.9, 116.005 39.9, 116.005 39.905, 116 39.905, 116 39.9))'
+UTM = 'EPSG:32650'
+X0, Y0 = 500000.0, 4400000.0
+
+
+def _job(key, **kwargs):
+    return key, {'geometry': box(116.0, 39.9, 116.005, 39.905), 'geometry_crs': 'EPSG:4326', 'spacing': 20, **kwargs}
+
+
+def _plan(client, **form):
+    data = {'plot_ids': '[1]', 'altitude': 30, 'speed': 5, 'swath_width': 20, **form}
+    return client.post('/api/flight_paths/plan', data=data)
+
+
+@pytest.fixture
+def plot(app):
+    db.session.add(Plot(id=1, name='地块一', geom=FIELD))
+    db.session.commit()
+
+
+@pytest.mark.parametrize('kwargs, expected', [
+    ({'swath_width': 12}, 12),
+    ({'footprint_width': 50, 'side_overlap': 0.2}, 40),
+    ({'camera_fov': 90, 'side_overlap': 0.5}, 50),
+])
+def test_swath_spacing(kwargs, expected):
+    assert coverage.swath_spacing(50, **kwargs) == pytest.approx(expected)
+
+
+@pytest.mark.parametrize('kwargs', [{}, {'swath_width': -1}, {'camera_fov': 180}, {'swath_width': 5, 'side_overlap': 1}])
+def test_swath_spacing_invalid(kwargs):
+    with pytest.raises(ValueError):
+        coverage.swath_spacing(50, **kwargs)
+
+
+def test_rectangle_sweeps_along_long_side():
+    plan = coverage.plan_coverage(box(X0, Y0, X0 + 200, Y0 + 100), UTM, spacing=20)
+    assert plan['angle'] == pytest.approx(0) and plan['lanes'] == 5 and plan['cells'] == 1
+    route = LineString(plan['coordinates'])
+    assert route.within(box(X0, Y0, X0 + 200, Y0 + 100).buffer(0.01))
+    # 5 条航带各约 200 米，加 4 段 20 米的换行
+    assert plan['length_m'] == pytest.approx(5 * 200 + 4 * 20, rel=0.05)
+
+
+def test_concave_and_obstacle_split_cells():
+    u_shape = Polygon([(X0, Y0), (X0 + 300, Y0), (X0 + 300, Y0 + 300), (X0 + 200, Y0 + 300),
+                       (X0 + 200, Y0 + 100), (X0 + 100, Y0 + 100), (X0 + 100, Y0 + 300), (X0, Y0 + 300)])
+    plan = coverage.plan_coverage(u_shape, UTM, spacing=20, angle=0)
+    assert plan['cells'] >= 3
+    assert LineString(plan['coordinates']).within(u_shape.buffer(0.01))
+
+    field = box(X0, Y0, X0 + 300, Y0 + 200)
+    obstacle = box(X0 + 120, Y0 + 60, X0 + 180, Y0 + 140)
+    plan = coverage.plan_coverage(field, UTM, spacing=20, angle=0, obstacles=[obstacle], obstacle_buffer=5)
+    assert plan['cells'] >= 3
+    route = LineString(plan['coordinates'])
+    assert route.intersection(obstacle.buffer(4)).length == pytest.approx(0, abs=1e-6)
+
+
+def test_geographic_plot_is_planned_in_utm():
+    plan = coverage.plan_coverage(box(116.0, 39.9, 116.005, 39.905), 'EPSG:4326', spacing=20)
+    assert plan['crs'] == 'EPSG:32650'
+    assert all(116.0 - 1e-6 <= x <= 116.005 + 1e-6 and 39.9 - 1e-6 <= y <= 39.905 + 1e-6
+               for x, y in plan['coordinates'])
+
+
+def test_batch_in_process_pool(monkeypatch):
+    monkeypatch.setattr(coverage, '_executor', None)
+    jobs = [(key, {'geometry': box(X0, Y0, X0 + 200, Y0 + 100), 'geometry_crs': UTM, 'spacing': 20 + key})
+            for key in range(4)]
+    jobs.append((9, {'geometry': box(X0, Y0, X0 + 1, Y0 + 1), 'geometry_crs': UTM, 'spacing': 20, 'margin': 5}))
+    try:
+        results = coverage.plan_batch(jobs, workers=2)
+    finally:
+        coverage._shutdown()
+    assert [key for key, _, _ in results] == [0, 1, 2, 3, 9]
+    assert all(plan and error is None for _, plan, error in results[:4])
+    assert results[4][1] is None and results[4][2]
+
+
+def test_job_errors_do_not_fail_batch():
+    results = coverage.plan_batch([_job(1), _job(2, geometry_crs='EPSG:999999')], workers=1)
+    assert results[0][2] is None and results[0][1]['lanes'] > 0
+    assert results[1][1] is None and results[1][2]
+
+
+def test_broken_pool_falls_back_and_rebuilds(monkeypatch):
+    class BrokenExecutor:
+        def map(self, *args, **kwargs):
+            raise BrokenProcessPool('worker died')
+
+        def shutdown(self, wait=True):
+            pass
+
+    monkeypatch.setattr(coverage, '_executor', BrokenExecutor())
+    monkeypatch.setattr(coverage, '_executor_workers', 2)
+    results = coverage.plan_batch([_job(1), _job(2)], workers=2)
+    assert [key for key, plan, error in results] == [1, 2]
+    assert all(error is None for key, plan, error in results)
+    assert coverage._executor is None
+
+
+def test_plan_creates_flight_path(client, plot):
+    db.session.add(Plot(id=2, name='道路', geom='LINESTRING(116 39.9, 116.001 39.9)'))
+    db.session.commit()
+    response = _plan(client, plot_ids='[1, 2]', obstacles=json.dumps(['POINT(116.0025 39.9025)']),
+                     obstacle_buffer=10)
+    assert response.status_code == 201
+    body = response.get_json()
+    created, = body['data']
+    assert created['plot_id'] == 1 and created['lanes'] > 0
+    assert [error['plot_id'] for error in body['errors']] == [2]
+    flight_path = FlightPath.query.get(created['id'])
+    assert flight_path.name == '地块一 覆盖航线' and flight_path.task_type == 'coverage'
+    assert flight_path.geojson['geometry']['type'] == 'LineString'
+    assert flight_path.bbox.startswith('POLYGON')
+    planner = flight_path.metadata_info['planner']
+    assert planner['obstacle_count'] == 1
+    assert planner['estimated_duration_s'] == pytest.approx(created['length_m'] / 5, abs=0.1)
+
+
+@pytest.mark.parametrize('form, status', [
+    ({'plot_ids': '[9]'}, 404),
+    ({'plot_ids': '[]'}, 400),
+    ({'plot_ids': '["1"]'}, 400),
+    ({'swath_width': ''}, 400),
+    ({'altitude': 0}, 400),
+    ({'obstacles': '["POLYGON(("]'}, 400),
+])
+def test_plan_errors(client, plot, form, status):
+    assert _plan(client, **form).status_code == status
+
+
+@pytest.mark.parametrize('obstacles', ['[1]', '[[0, 0]]', '{"type": "Point"}', '[null]'])
+def test_invalid_obstacles(client, plot, obstacles):
+    response = _plan(client, obstacles=obstacles)
+    assert response.status_code == 400
+    assert response.get_json()['error_code'] == '4002'
@@ -0,0 +1,121 @@
+"""声明式 CRUD：生成的接口保持原有 URL、提示文案、参数位置与错误码"""
+import json
+import pytest
+from sqlalchemy.exc import IntegrityError
+from app.extensions import db
+from app.models import Plot, SystemUser, Task
+from app.resources import tasks
+from app.resources.tasks import TaskCreateResource, TaskPageResource
+
+
+def _error(response, status, error_code):
+    assert response.status_code == status
+    body = response.get_json()
+    assert body['error_code'] == error_code
+    return body['message']
+
+
+def test_class_names_are_kept():
+    assert TaskCreateResource.__name__ == 'TaskCreateResource' and TaskPageResource.__name__ == 'TaskPageResource'
+
+
+def test_spatial_spec_round_trip(client):
+    response = client.post('/api/plots/create', data={
+        'name': '东区', 'geom': 'POLYGON((0 0, 1 0, 1 1, 0 1, 0 0))', 'area': '1.5',
+        'metadata': json.dumps({'soil': '壤土'})})
+    assert response.status_code == 201
+    assert response.get_json() == {'message': '地块创建成功', 'id': 1}
+
+    data = client.get('/api/plots/1').get_json()['data']
+    assert data['area'] == 1.5 and data['metadata_info'] == {'soil': '壤土'}
+    assert [row['id'] for row in client.get('/api/plots/list?bbox=-1,-1,2,2').get_json()['data']] == [1]
+
+    # 只更新传入的字段，geom 变更后空间索引随之更新
+    response = client.put('/api/plots/update/1', data={'geom': 'POINT(10 10)'})
+    assert response.get_json() == {'message': '地块更新成功', 'id': 1}
+    assert Plot.query.get(1).name == '东区'
+    assert client.get('/api/plots/list?bbox=-1,-1,2,2').get_json()['data'] == []
+    assert client.get('/api/plots/page?bbox=9,9,11,11').get_json()['message'] == '分页地块获取成功'
+
+    assert client.delete('/api/plots/delete/1').get_json() == {'message': '地块删除成功', 'id': 1}
+    assert _error(client.get('/api/plots/1'), 404, '4041') == '记录不存在：ID=1'
+    assert _error(client.put('/api/plots/update/1', data={'name': 'x'}), 404, '4041') == '记录不存在：ID=1'
+    assert _error(client.delete('/api/plots/delete/1'), 404, '4041') == '记录不存在：ID=1'
+
+
+def test_form_location(client):
+    # 写接口只读取表单，JSON 请求体不会被当作参数
+    response = client.post('/api/plots/create', json={'name': '东区', 'geom': 'POINT(0 0)'})
+    assert _error(response, 400, '4001') == '参数不能为空：name'
+    assert _error(client.post('/api/plots/create', data={'name': '东区'}), 400, '4001') == '参数不能为空：geom'
+
+
+@pytest.mark.parametrize('path, form, message', [
+    ('/api/tasks/create', {'type': 'flying'}, '无效的任务类型'),
+    ('/api/tasks/create', {'status': 'paused'}, '无效的状态'),
+    ('/api/tasks/create', {'volume': 'abc'}, '参数错误：volume必须为数字'),
+    ('/api/tasks/create', {'field_id': '1.5'}, '参数错误：field_id必须为整数'),
+    ('/api/tasks/create', {'schedule_at': 'tomorrow'}, '无效的时间格式：schedule_at，应为ISO格式'),
+    ('/api/tasks/create', {'metadata': '{bad'}, 'JSON格式错误：metadata'),
+    ('/api/imagery/create', {'status': 'archived'}, "无效的状态值：必须为 'active' 或 'deleted'"),
+])
+def test_invalid_values(client, path, form, message):
+    base = {'name': '任务', 'type': 'mapping', 'field_id': '1', 'status': 'pending', 'file_path': '/tmp/a.tif'}
+    assert message in _error(client.post(path, data={**base, **form}), 400, '4002')
+
+
+def test_converted_values(client):
+    response = client.post('/api/tasks/create', data={
+        'name': '喷洒', 'type': 'spraying', 'field_id': '3', 'status': 'pending', 'volume': '2.5',
+        'schedule_at': '2024-05-01T08:00:00Z', 'metadata': '{"nozzle": 4}'})
+    assert response.get_json() == {'message': '任务创建成功', 'id': 1}
+    task = Task.query.get(1)
+    assert (task.field_id, task.volume, task.metadata_info) == (3, 2.5, {'nozzle': 4})
+    assert task.schedule_at.isoformat().startswith('2024-05-01T08:00:00')
+    assert client.get('/api/tasks/list').get_json()['message'] == '任务列表获取成功'
+
+
+def test_unique_spec(client):
+    assert client.post('/api/system_permissions/create', data={'name': '读', 'code': 'read'}).status_code == 201
+    assert client.post('/api/system_permissions/create', data={'name': '写', 'code': 'write'}).status_code == 201
+    response = client.post('/api/system_permissions/create', data={'name': '读2', 'code': 'read'})
+    assert _error(response, 400, '4003') == '权限代码已存在：code=read'
+    response = client.put('/api/system_permissions/update/2', data={'code': 'read'})
+    assert _error(response, 400, '4003') == '权限代码已存在：code=read'
+    # 未修改唯一列或保持自身取值时不冲突
+    assert client.put('/api/system_permissions/update/1', data={'code': 'read', 'name': '只读'}).status_code == 200
+    assert client.put('/api/system_permissions/update/2', data={'description': '写入'}).status_code == 200
+
+
+def test_composite_unique_on_references(client):
+    form = {'user_id': '1', 'role_id': '2'}
+    assert client.post('/api/user_roles/create', data=form).get_json() == {'message': '用户角色关联创建成功', 'id': 1}
+    response = client.post('/api/user_roles/create', data=form)
+    assert _error(response, 400, '4003') == '用户角色关联已存在：user_id=1, role_id=2'
+    assert client.post('/api/user_roles/create', data={'user_id': '1', 'role_id': '3'}).status_code == 201
+    response = client.put('/api/user_roles/update/2', data={'role_id': '2'})
+    assert _error(response, 400, '4003') == '用户角色关联已存在：user_id=1, role_id=2'
+
+
+def test_database_errors(client, monkeypatch):
+    def conflict():
+        raise IntegrityError('INSERT', {}, Exception('duplicate'))
+
+    form = {'name': '任务', 'type': 'mapping', 'field_id': '1', 'status': 'pending'}
+    monkeypatch.setattr(db.session, 'commit', conflict)
+    assert _error(client.post('/api/tasks/create', data=form), 400, '4003') == '记录已存在：任务数据重复'
+
+    def broken(*args, **kwargs):
+        raise RuntimeError('连接丢失')
+
+    monkeypatch.setattr(tasks.task_spec, 'query', broken)
+    assert _error(client.get('/api/tasks/list'), 500, '5001') == '数据库错误：连接丢失'
+
+
+def test_hidden_and_protected(client):
+    db.session.add(SystemUser(id=1, username='admin', password_hash='hash'))
+    db.session.commit()
+    data = client.get('/api/system_users/1').get_json()['data']
+    assert data['username'] == 'admin' and 'password_hash' not in data
+    assert client.get('/api/system_users/list').status_code == 401
+    assert client.post('/api/system_users/create', data={'username': 'a', 'password_hash': 'b'}).status_code == 401
@@ -0,0 +1,85 @@
+"""embed 内联关联记录：每个关联一次 IN 查询，引用缺失时为 null"""
+import json
+import pytest
+from sqlalchemy import event
+from app.extensions import db
+from app.models import FlightPath, Plot, Task
+
+
+@pytest.fixture
+def tasks(app):
+    db.session.add_all([Plot(id=1, name='东区', geom='POINT(0 0)'), Plot(id=2, name='西区', geom='POINT(1 0)'),
+                        FlightPath(id=7, name='航线7')])
+    db.session.add_all([
+        Task(id=1, name='t1', type='mapping', status='pending', field_id=1, path_id=7),
+        Task(id=2, name='t2', type='spraying', status='done', field_id=2),
+        Task(id=3, name='t3', type='mapping', status='pending', field_id=1, path_id=99),
+    ])
+    db.session.commit()
+
+
+def _selects(client, path):
+    statements = []
+
+    def capture(conn, cursor, statement, *args):
+        if statement.lstrip().upper().startswith('SELECT'):
+            statements.append(statement)
+
+    event.listen(db.engine, 'before_cursor_execute', capture)
+    try:
+        response = client.get(path)
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', capture)
+    assert response.status_code == 200
+    return response, statements
+
+
+def test_list_embeds_with_one_query_per_relation(client, tasks):
+    response, statements = _selects(client, '/api/tasks/list?embed=plot,path,plot')
+    rows = response.get_json()['data']
+    assert [row['plot']['name'] for row in rows] == ['东区', '西区', '东区']
+    assert rows[0]['path']['name'] == '航线7' and rows[1]['path'] is None and rows[2]['path'] is None
+    assert rows[0]['plot'] == Plot.query.get(1).to_dict()
+    # 任务列表 + 地块 + 航线
+    assert len(statements) == 3
+
+
+def test_fields_subset_still_loads_foreign_keys(client, tasks):
+    rows = client.get('/api/tasks/list?fields=name&embed=plot').get_json()['data']
+    assert rows == [{'name': 't1', 'plot': Plot.query.get(1).to_dict()},
+                    {'name': 't2', 'plot': Plot.query.get(2).to_dict()},
+                    {'name': 't3', 'plot': Plot.query.get(1).to_dict()}]
+
+
+def test_get_page_batch_and_stream(client, tasks):
+    data = client.get('/api/tasks/3?embed=path,plot').get_json()['data']
+    assert data['path'] is None and data['plot']['id'] == 1
+    page = client.get('/api/tasks/page?page_size=2&embed=plot').get_json()
+    assert [row['plot']['id'] for row in page['data']] == [1, 2]
+    batch = client.get('/api/tasks/batch?ids=2,5&embed=plot&fields=id').get_json()
+    assert batch['data'] == {'2': {'id': 2, 'plot': Plot.query.get(2).to_dict()}} and batch['missing'] == [5]
+    lines = client.get('/api/tasks/list?stream=ndjson&embed=path').get_data(as_text=True).splitlines()
+    assert [json.loads(line)['path'] and json.loads(line)['path']['id'] for line in lines] == [7, None, None]
+
+
+def test_analysis_results_embed(client, tasks):
+    client.post('/api/analysis_results/create', data={'name': 'NDVI', 'result_path': '/r.tif', 'field_id': '2'})
+    row, = client.get('/api/analysis_results/list?embed=plot,imagery').get_json()['data']
+    assert row['plot']['name'] == '西区' and row['imagery'] is None
+
+
+def test_without_embed_response_is_unchanged(client, tasks):
+    assert client.get('/api/tasks/1').get_json()['data'] == Task.query.get(1).to_dict()
+
+
+@pytest.mark.parametrize('path', ['/api/tasks/list?embed=owner', '/api/tasks/1?embed=plot,owner',
+                                  '/api/analysis_results/page?embed=path'])
+def test_unknown_relation(client, tasks, path):
+    response = client.get(path)
+    assert response.status_code == 400
+    assert '未知的关联' in response.get_json()['message'] and response.get_json()['error_code'] == '4002'
+
+
+def test_resources_without_embeds_ignore_the_argument(client, tasks):
+    # 未声明关联的资源没有 embed 参数，按 reqparse 的默认行为忽略
+    assert client.get('/api/plots/list?embed=owner').status_code == 200
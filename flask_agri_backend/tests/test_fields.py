@@ -0,0 +1,66 @@
+"""fields 稀疏字段集：输出字段子集，SELECT 只读取对应列"""
+import json
+from contextlib import contextmanager
+from datetime import datetime
+import pytest
+from sqlalchemy import event
+from app.extensions import db
+from app.models import Plot
+
+
+@pytest.fixture
+def plots(app):
+    db.session.add_all([Plot(id=i, name=f'地块{i}', crop_type='玉米', geom=f'POINT({i} 0)',
+                             created_at=datetime(2024, 5, i)) for i in range(1, 6)])
+    db.session.commit()
+
+
+@contextmanager
+def _statements():
+    captured = []
+
+    def capture(conn, cursor, statement, *args):
+        if statement.lstrip().upper().startswith('SELECT') and 'plots' in statement:
+            captured.append(statement)
+
+    event.listen(db.engine, 'before_cursor_execute', capture)
+    try:
+        yield captured
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', capture)
+
+
+def test_get_selects_from_cached_record(client, plots):
+    # 单条读取缓存完整记录，fields 在缓存内容上选取
+    assert client.get('/api/plots/2?fields=name,crop_type').get_json()['data'] == {'name': '地块2', 'crop_type': '玉米'}
+    with _statements() as statements:
+        response = client.get('/api/plots/2?fields=crop_type,id')
+    assert response.get_json()['data'] == {'crop_type': '玉米', 'id': 2}
+    assert statements == []
+
+
+def test_list_page_and_stream(client, plots):
+    listed = client.get('/api/plots/list?fields=id,name,name').get_json()['data']
+    assert listed == [{'id': i, 'name': f'地块{i}'} for i in range(1, 6)]
+    lines = client.get('/api/plots/list?fields=name&stream=ndjson').get_data(as_text=True).splitlines()
+    assert [json.loads(line) for line in lines] == [{'name': f'地块{i}'} for i in range(1, 6)]
+    with _statements() as statements:
+        page = client.get('/api/plots/page?fields=name&cursor=&order=created_at&page_size=2').get_json()
+    assert page['data'] == [{'name': '地块1'}, {'name': '地块2'}]
+    assert all('plots.geom' not in statement for statement in statements)
+    # 排序列不在 fields 中也能生成游标
+    rest = client.get('/api/plots/page', query_string={
+        'fields': 'name', 'cursor': page['next_cursor'], 'order': 'created_at', 'page_size': 5}).get_json()
+    assert rest['data'] == [{'name': f'地块{i}'} for i in range(3, 6)]
+
+
+@pytest.mark.parametrize('path', ['/api/plots/1?fields=name,owner', '/api/plots/list?fields=password',
+                                  '/api/tasks/page?fields=id,nope'])
+def test_unknown_field(client, plots, path):
+    response = client.get(path)
+    assert response.status_code == 400
+    assert response.get_json()['error_code'] == '4002' and '未知字段' in response.get_json()['message']
+
+
+def test_blank_fields_returns_everything(client, plots):
+    assert client.get('/api/plots/1?fields=,').get_json()['data'] == Plot.query.get(1).to_dict()
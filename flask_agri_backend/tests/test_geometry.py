@@ -0,0 +1,61 @@
+"""几何解析与按记录版本校验的解析缓存"""
+import json
+from datetime import datetime
+import pytest
+from shapely.geometry import Point
+from app.extensions import db
+from app.models import Imagery
+from app.services import tiles
+from app.services.geometry import GeometryCache, parse_geometry
+
+SQUARE = 'POLYGON((0 0, 1 0, 1 1, 0 1, 0 0))'
+
+
+@pytest.mark.parametrize('text', [
+    SQUARE,
+    f'SRID=4326;{SQUARE}',
+    json.dumps({'type': 'Polygon', 'coordinates': [[[0, 0], [1, 0], [1, 1], [0, 1], [0, 0]]]}),
+    {'type': 'Feature', 'geometry': {'type': 'Polygon', 'coordinates': [[[0, 0], [1, 0], [1, 1], [0, 1], [0, 0]]]}},
+])
+def test_parse_formats(text):
+    assert parse_geometry(text).area == pytest.approx(1)
+
+
+@pytest.mark.parametrize('text', [None, '', '   ', 'POLYGON((', '{bad json', '{"type": "FeatureCollection"}'])
+def test_parse_invalid(text):
+    assert parse_geometry(text) is None
+
+
+def test_cache_validates_version_and_text():
+    cache = GeometryCache()
+    stamp = datetime(2024, 1, 1)
+    first = cache.get('plots', 1, 'geom', stamp, SQUARE)
+    assert cache.get('plots', 1, 'geom', stamp, SQUARE) is first
+    assert (cache.hits, cache.misses) == (1, 1)
+    # 同一秒内的修改：updated_at 不变但原文不同
+    moved = cache.get('plots', 1, 'geom', stamp, 'POINT(5 5)')
+    assert moved.geom_type == 'Point'
+    assert cache.get('plots', 1, 'geom', datetime(2024, 1, 2), 'POINT(5 5)') is not moved
+    assert len(cache._entries) == 1 and cache.misses == 3
+
+
+def test_cache_is_byte_bounded():
+    cache = GeometryCache()
+    cache.max_bytes = 3 * (GeometryCache.OVERHEAD_BYTES + GeometryCache.COORD_BYTES)
+    for record_id in range(5):
+        cache.get('plots', record_id, 'geom', None, f'POINT({record_id} 0)')
+    assert [key[1] for key in cache._entries] == [2, 3, 4]
+    assert cache._size <= cache.max_bytes
+    # 超过上限的单个几何不入缓存，但仍返回解析结果
+    circle = Point(0, 0).buffer(1).wkt
+    assert cache.get('plots', 9, 'geom', None, circle).area == pytest.approx(3.14, abs=0.01)
+    assert ('plots', 9, 'geom') not in cache._entries
+
+
+def test_tile_outside_footprint_skips_raster(client, app, tmp_path, monkeypatch):
+    db.session.add(Imagery(id=1, name='影像', file_path=str(tmp_path / 'missing.tif'), geom=SQUARE))
+    db.session.commit()
+    monkeypatch.setattr(tiles, 'tile_cache', tiles.TileCache())
+    monkeypatch.setattr(tiles, 'render_imagery_tile', lambda *args: pytest.fail('raster opened'))
+    response = client.get('/api/tiles/imagery/1/8/0/0.png')
+    assert response.status_code == 200 and response.data == tiles.EMPTY_TILE
@@ -0,0 +1,95 @@
+"""菜单树：组装与排序、按权限裁剪、写入后重建，重建与并发填充互不污染"""
+import pytest
+from flask_jwt_extended import create_access_token
+from app.extensions import db
+from app.models import RolePermission, SystemMenu, SystemPermission, UserRole
+from app.services import permissions
+from app.services.menu_tree import build_tree, menu_tree
+
+
+def _row(id, parent_id=None, order_num=0):
+    return {'id': id, 'parent_id': parent_id, 'name': f'm{id}', 'order_num': order_num}
+
+
+def _shape(nodes):
+    return [(node['id'], _shape(node['children'])) for node in nodes]
+
+
+def test_build_tree_orders_and_drops_cycles():
+    rows = [_row(1, order_num=2), _row(2, order_num=1), _row(3, 1, order_num=1), _row(4, 1, order_num=1),
+            _row(5, 99), _row(6, 6), _row(7, 8), _row(8, 7)]
+    # 父节点不存在或指向自身的视为根节点，互为父节点的 7、8 不可达
+    assert _shape(build_tree(rows)) == [(5, []), (6, []), (2, []), (1, [(3, []), (4, [])])]
+
+
+@pytest.fixture
+def menus(app):
+    db.session.add_all([
+        SystemMenu(id=1, name='首页', path='/home', order_num=1),
+        SystemMenu(id=2, name='系统管理', path='/admin', order_num=9),
+        SystemMenu(id=3, name='用户', parent_id=2, path='/admin/users', order_num=1),
+        SystemMenu(id=4, name='地块', path='/plots', order_num=2),
+        SystemMenu(id=5, name='审计', parent_id=1, path='/home/audit', order_num=1),
+        SystemPermission(id=1, name='系统管理菜单', code='menu:/admin'),
+        SystemPermission(id=2, name='审计菜单', code='menu:/home/audit'),
+        RolePermission(role_id=1, permission_id=1),
+        UserRole(user_id=10, role_id=1),
+    ])
+    db.session.commit()
+
+
+def _tree(client, user_id):
+    headers = {'Authorization': f'Bearer {create_access_token(identity=str(user_id))}'}
+    response = client.get('/api/system_menus/tree', headers=headers)
+    assert response.status_code == 200 and response.get_json()['message'] == '菜单树获取成功'
+    return _shape(response.get_json()['data'])
+
+
+def test_tree_is_pruned_by_permissions(client, menus):
+    assert client.get('/api/system_menus/tree').status_code == 401
+    assert _tree(client, 10) == [(1, []), (4, []), (2, [(3, [])])]
+    # 无 menu:/admin 权限时整棵子树不可见
+    assert _tree(client, 20) == [(1, []), (4, [])]
+
+
+def test_users_with_same_permissions_share_encoding(app, menus):
+    assert menu_tree.encoded('20') is menu_tree.encoded('30')
+    assert menu_tree.encoded('10') is not menu_tree.encoded('20')
+
+
+def test_writes_rebuild_tree(client, menus):
+    assert _tree(client, 20) == [(1, []), (4, [])]
+    client.put('/api/system_menus/update/4', data={'order_num': '0'})
+    client.post('/api/system_menus/create', data={'name': '任务', 'path': '/tasks', 'parent_id': '4'})
+    assert _tree(client, 20) == [(4, [(6, [])]), (1, [])]
+    client.post('/api/user_roles/create', data={'user_id': '20', 'role_id': '2'})
+    client.post('/api/role_permissions/create', data={'role_id': '2', 'permission_id': '2'})
+    assert _tree(client, 20) == [(4, [(6, [])]), (1, [(5, [])])]
+    client.delete('/api/system_menus/delete/1')
+    # 父菜单删除后子菜单提升为根节点
+    assert _tree(client, 20) == [(4, [(6, [])]), (5, [])]
+
+
+def test_rebuild_during_fill_keeps_new_version_clean(client, monkeypatch):
+    client.post('/api/system_menus/create', data={'name': 'old', 'path': '/old'})
+    assert b'"old"' in menu_tree.encoded('1')
+    version = menu_tree._state[0]
+
+    original = permissions.PermissionEngine.user_bits
+    calls = []
+
+    def user_bits(self, user_id):
+        # 第一次调用时模拟另一个请求：写入菜单并完成重建
+        if not calls:
+            calls.append(user_id)
+            client.post('/api/system_menus/create', data={'name': 'new', 'path': '/new'})
+            menu_tree._sync()
+        return original(self, user_id)
+
+    monkeypatch.setattr(permissions.PermissionEngine, 'user_bits', user_bits)
+    menu_tree._state[3].clear()
+    stale = menu_tree.encoded('1')
+    assert b'"new"' not in stale
+    assert menu_tree._state[0] != version
+    assert menu_tree._state[3] == {}
+    assert b'"new"' in menu_tree.encoded('1')
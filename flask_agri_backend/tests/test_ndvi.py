@@ -0,0 +1,42 @@
+"""NDVI 接口：由指数引擎计算并写入分析结果"""
+import numpy as np
+import pytest
+import rasterio
+from rasterio.transform import from_origin
+from app.extensions import db
+from app.models import AnalysisResult, Imagery
+
+
+@pytest.fixture
+def imagery(app, tmp_path):
+    path = str(tmp_path / 'capture.tif')
+    with rasterio.open(path, 'w', driver='GTiff', width=40, height=30, count=2, dtype='uint16',
+                       crs='EPSG:4326', transform=from_origin(0, 1, 0.01, 0.01)) as dst:
+        dst.write(np.stack([np.full((30, 40), 100), np.full((30, 40), 300)]).astype(np.uint16))
+    app.config['ANALYSIS_OUTPUT_DIR'] = str(tmp_path / 'out')
+    app.config['RASTER_BLOCK_SIZE'] = 16
+    record = Imagery(id=1, name='影像', file_path=path, red_band_index=1, nir_band_index=2)
+    db.session.add(record)
+    db.session.commit()
+    return record
+
+
+def test_ndvi_result(client, imagery):
+    response = client.post('/api/analysis_results/ndvi/1')
+    assert response.status_code == 201
+    data = response.get_json()['data']
+    assert data['type'] == 'ndvi' and data['name'] == '影像 NDVI'
+    assert data['stats']['mean'] == pytest.approx(0.5)
+    with rasterio.open(AnalysisResult.query.get(data['id']).result_path) as src:
+        assert src.read(1)[0, 0] == pytest.approx(0.5)
+
+
+def test_ndvi_requires_band_indexes(client, imagery):
+    imagery.nir_band_index = None
+    db.session.commit()
+    response = client.post('/api/analysis_results/ndvi/1')
+    assert response.status_code == 400
+
+
+def test_ndvi_unknown_imagery(client, app):
+    assert client.post('/api/analysis_results/ndvi/9').status_code == 404
@@ -0,0 +1,72 @@
+"""影像入库后的 COG 转换与概视图"""
+import json
+import numpy as np
+import pytest
+import rasterio
+from rasterio.transform import from_origin
+from app.extensions import db
+from app.models import Imagery
+from app.services import overviews
+
+
+@pytest.fixture
+def source(tmp_path):
+    path = str(tmp_path / 'capture.tif')
+    with rasterio.open(path, 'w', driver='GTiff', width=1200, height=1000, count=2, dtype='uint16',
+                       crs='EPSG:4326', transform=from_origin(0, 1, 0.001, 0.001)) as dst:
+        dst.write(np.arange(2 * 1000 * 1200, dtype=np.uint32).reshape(2, 1000, 1200).astype(np.uint16))
+    return path
+
+
+@pytest.fixture
+def executor(app, tmp_path, monkeypatch):
+    app.config['IMAGERY_OPTIMIZED_DIR'] = str(tmp_path / 'optimized')
+    monkeypatch.setattr(overviews, '_executor', None)
+    yield
+    if overviews._executor is not None:
+        overviews._executor.shutdown(wait=True)
+
+
+def test_build_cog(source, tmp_path):
+    info = overviews.build_cog(source, str(tmp_path / 'out' / 'cog.tif'))
+    assert info['overview_levels'] == [2, 4]
+    assert info['overview_sizes'] == [[600, 500], [300, 250]]
+    with rasterio.open(info['path']) as dst:
+        assert dst.block_shapes[0] == (512, 512)
+        assert dst.compression.value == 'DEFLATE'
+        with rasterio.open(source) as src:
+            assert np.array_equal(dst.read(), src.read())
+
+
+def test_create_schedules_optimization(client, source, executor):
+    response = client.post('/api/imagery/create', data={
+        'name': '影像', 'file_path': source, 'metadata': json.dumps({'sensor': 'rgb'})})
+    assert response.status_code == 201
+    imagery_id = response.get_json()['id']
+    overviews._executor.shutdown(wait=True)
+    db.session.expire_all()
+    imagery = Imagery.query.get(imagery_id)
+    assert imagery.metadata_info['sensor'] == 'rgb'
+    optimized = imagery.metadata_info['optimized']
+    assert optimized['status'] == 'done' and optimized['source'] == source
+    assert overviews.optimized_path(imagery) == optimized['path'] != source
+
+
+def test_failed_conversion_is_recorded(app, tmp_path, executor):
+    imagery = Imagery(id=1, name='影像', file_path=str(tmp_path / 'missing.tif'))
+    db.session.add(imagery)
+    db.session.commit()
+    overviews.schedule_optimize(app, imagery).result()
+    db.session.expire_all()
+    imagery = Imagery.query.get(1)
+    assert imagery.metadata_info['optimized']['status'] == 'failed'
+    assert overviews.optimized_path(imagery) == imagery.file_path
+
+
+def test_disabled_on_ingest(app, source, executor):
+    app.config['IMAGERY_OPTIMIZE_ON_INGEST'] = False
+    imagery = Imagery(id=1, name='影像', file_path=source)
+    db.session.add(imagery)
+    db.session.commit()
+    assert overviews.schedule_optimize(app, imagery) is None
+    assert imagery.metadata_info is None
@@ -0,0 +1,105 @@
+"""分页：游标分页的往返、游标校验与总数模式"""
+import base64
+import json
+from datetime import datetime, timedelta
+import pytest
+from app.extensions import db
+from app.models import Plot
+
+T0 = datetime(2024, 5, 1, 8, 0, 0)
+# 多条记录共享同一 created_at，游标需按 (created_at, id) 才能不重不漏
+STAMPS = [T0, T0 + timedelta(hours=1), T0 + timedelta(hours=1), T0 + timedelta(hours=1),
+          T0 + timedelta(hours=2), T0 + timedelta(hours=2), T0 + timedelta(hours=3)]
+
+
+@pytest.fixture
+def plots(app):
+    # 插入顺序与 created_at 顺序不一致，避免按 id 排序碰巧通过
+    for record_id, stamp in zip([4, 2, 7, 1, 5, 3, 6], STAMPS):
+        db.session.add(Plot(id=record_id, name=f'p{record_id}', geom=f'POINT({record_id} 0)', created_at=stamp))
+    db.session.commit()
+    return {plot.id: plot.created_at for plot in Plot.query.all()}
+
+
+def _expected(plots, order):
+    descending = order.startswith('-')
+    key = (lambda i: i) if order.lstrip('-') == 'id' else (lambda i: (plots[i], i))
+    return sorted(plots, key=key, reverse=descending)
+
+
+def _walk(client, order, page_size=2):
+    ids, cursor, pages = [], '', 0
+    while cursor is not None:
+        response = client.get('/api/plots/page', query_string={'cursor': cursor, 'order': order, 'page_size': page_size})
+        assert response.status_code == 200
+        body = response.get_json()
+        assert 'total' not in body and 'page' not in body
+        ids.extend(row['id'] for row in body['data'])
+        cursor = body['next_cursor']
+        pages += 1
+        assert pages < 10
+    return ids
+
+
+@pytest.mark.parametrize('order', ['id', '-id', 'created_at', '-created_at'])
+def test_cursor_round_trip(client, plots, order):
+    assert _walk(client, order) == _expected(plots, order)
+    assert _walk(client, order, page_size=3) == _expected(plots, order)
+
+
+def test_page_mode_hands_over_to_cursor(client, plots):
+    expected = _expected(plots, '-created_at')
+    body = client.get('/api/plots/page?page=2&page_size=2&order=-created_at').get_json()
+    assert [row['id'] for row in body['data']] == expected[2:4]
+    assert body['page'] == 2 and body['total'] == 7
+    rest = client.get('/api/plots/page', query_string={
+        'cursor': body['next_cursor'], 'order': '-created_at', 'page_size': 10}).get_json()
+    assert [row['id'] for row in rest['data']] == expected[4:]
+    assert rest['next_cursor'] is None
+
+
+def _cursor(payload):
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip('=')
+
+
+@pytest.mark.parametrize('cursor, order', [
+    ('%%%', 'id'),
+    ('bm90IGpzb24', 'id'),
+    (_cursor({'o': 'id', 'k': [3]}), '-id'),
+    (_cursor({'o': 'created_at', 'k': [5]}), 'created_at'),
+    (_cursor({'o': 'created_at', 'k': ['yesterday', 3]}), 'created_at'),
+    (_cursor({'o': 'id', 'k': ['x']}), 'id'),
+    (_cursor({'k': [3]}), 'id'),
+    (_cursor([1, 2]), 'id'),
+])
+def test_invalid_cursor(client, plots, cursor, order):
+    response = client.get('/api/plots/page', query_string={'cursor': cursor, 'order': order})
+    assert response.status_code == 400
+    body = response.get_json()
+    assert body['error_code'] == '4002' and '无效的游标' in body['message']
+
+
+def test_cursor_from_another_order_is_rejected(client, plots):
+    cursor = client.get('/api/plots/page?cursor=&order=created_at&page_size=2').get_json()['next_cursor']
+    assert client.get('/api/plots/page', query_string={'cursor': cursor, 'order': 'id'}).status_code == 400
+
+
+def test_total_modes(client, plots):
+    estimate = client.get('/api/plots/page?cursor=&total=estimate').get_json()
+    # SQLite 没有表统计信息，估算退化为精确计数
+    assert estimate['total'] == 7 and estimate['total_estimated'] is True
+    filtered = client.get('/api/plots/page?cursor=&total=estimate&bbox=0,-1,3.5,1').get_json()
+    assert filtered['total'] == 3 and [row['id'] for row in filtered['data']] == [1, 2, 3]
+    assert client.get('/api/plots/page?cursor=&total=exact').get_json()['total'] == 7
+    assert 'total' not in client.get('/api/plots/page?total=none').get_json()
+    response = client.get('/api/plots/page?total=approx')
+    assert response.status_code == 400 and 'exact, estimate, none' in response.get_json()['message']
+
+
+@pytest.mark.parametrize('resource', ['tasks', 'system_roles', 'analysis_results', 'flight_paths'])
+def test_other_page_endpoints(client, resource):
+    response = client.get(f'/api/{resource}/page?cursor=&order=-created_at&total=estimate')
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body['data'] == [] and body['next_cursor'] is None and body['total'] == 0
+    assert client.get(f'/api/{resource}/page?cursor=abc').status_code == 400
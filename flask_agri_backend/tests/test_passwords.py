@@ -0,0 +1,110 @@
+"""密码哈希：算法参数、旧哈希兼容、登录后重新哈希与线程池满时的 503"""
+import time
+import pytest
+from flask_jwt_extended import create_access_token
+from werkzeug.security import DEFAULT_PBKDF2_ITERATIONS, generate_password_hash
+from app.extensions import db
+from app.models import SystemUser
+from app.services import passwords
+from app.services.passwords import PasswordHasherBusy, hash_password, needs_rehash, normalize_method, verify_password
+
+FAST_PBKDF2 = 'pbkdf2:sha256:1000'
+FAST_SCRYPT = 'scrypt:1024:8:1'
+
+
+@pytest.fixture
+def hasher(app, monkeypatch):
+    monkeypatch.setattr(passwords, '_executor', None)
+    monkeypatch.setattr(passwords, '_slots', None)
+    app.config.update(PASSWORD_HASH_METHOD=FAST_SCRYPT, PASSWORD_HASH_WORKERS=1, PASSWORD_HASH_QUEUE_LIMIT=1)
+    yield app
+    if passwords._executor is not None:
+        passwords._executor.shutdown(wait=True)
+
+
+@pytest.fixture
+def saturated(hasher):
+    hash_password('warm-up')
+    for _ in range(2):
+        assert passwords._slots.acquire(blocking=False)
+    yield
+    for _ in range(2):
+        passwords._slots.release()
+
+
+@pytest.mark.parametrize('method, expected', [
+    ('pbkdf2', f'pbkdf2:sha256:{DEFAULT_PBKDF2_ITERATIONS}'),
+    ('pbkdf2:sha512', f'pbkdf2:sha512:{DEFAULT_PBKDF2_ITERATIONS}'),
+    ('scrypt', 'scrypt:32768:8:1'),
+    ('scrypt:16384', 'scrypt:16384:8:1'),
+    (FAST_SCRYPT, FAST_SCRYPT),
+])
+def test_normalize_method(method, expected):
+    assert normalize_method(method) == expected
+
+
+@pytest.mark.parametrize('method', [FAST_SCRYPT, FAST_PBKDF2])
+def test_hash_and_verify(hasher, method):
+    hasher.config['PASSWORD_HASH_METHOD'] = method
+    stored = hash_password('秘密123')
+    assert stored.startswith(f'{method}$') and stored != hash_password('秘密123')
+    assert verify_password(stored, '秘密123') and not verify_password(stored, '秘密124')
+    assert not needs_rehash(stored)
+
+
+def test_legacy_and_invalid_hashes(hasher):
+    legacy = generate_password_hash('secret')
+    assert verify_password(legacy, 'secret') and needs_rehash(legacy)
+    assert not verify_password(None, 'secret') and not verify_password('', 'secret')
+    assert not verify_password('scrypt:1024:8:1$no-digest', 'secret')
+
+
+def test_hashing_runs_in_pool(hasher):
+    hash_password('secret')
+    assert all(thread.name.startswith('password-hash') for thread in passwords._executor._threads)
+
+
+def test_queue_full(hasher, saturated):
+    with pytest.raises(PasswordHasherBusy, match='队列已满'):
+        hash_password('secret')
+
+
+def test_wait_timeout(hasher):
+    hasher.config['PASSWORD_HASH_TIMEOUT'] = 0.01
+    with pytest.raises(PasswordHasherBusy, match='等待超时'):
+        passwords._submit(time.sleep, 0.2)
+
+
+def test_login_rehashes_outdated_hash(hasher, client):
+    db.session.add(SystemUser(id=1, username='u1', password_hash=generate_password_hash('secret'), status='active'))
+    db.session.commit()
+    assert client.post('/api/auth/login', data={'username': 'u1', 'password': 'wrong'}).status_code == 401
+    assert SystemUser.query.get(1).password_hash.startswith('pbkdf2:')
+    response = client.post('/api/auth/login', data={'username': 'u1', 'password': 'secret'})
+    assert response.status_code == 200 and response.get_json()['message'] == '登录成功'
+    stored = SystemUser.query.get(1).password_hash
+    assert stored.startswith(f'{FAST_SCRYPT}$') and verify_password(stored, 'secret')
+
+
+def test_register_and_create_use_configured_method(hasher, client):
+    response = client.post('/api/auth/register', data={'username': 'u1', 'password': 'secret'})
+    assert response.status_code == 201
+    assert SystemUser.query.get(response.get_json()['id']).password_hash.startswith(f'{FAST_SCRYPT}$')
+    headers = {'Authorization': f'Bearer {create_access_token(identity="1")}'}
+    response = client.post('/api/system_users/create', data={'username': 'u2', 'password_hash': 'secret'}, headers=headers)
+    assert response.status_code == 201
+    assert verify_password(SystemUser.query.get(response.get_json()['id']).password_hash, 'secret')
+
+
+def test_busy_returns_503(hasher, client, saturated):
+    db.session.add(SystemUser(id=1, username='u1', password_hash=generate_password_hash('secret'), status='active'))
+    db.session.commit()
+    login = client.post('/api/auth/login', data={'username': 'u1', 'password': 'secret'})
+    register = client.post('/api/auth/register', data={'username': 'u2', 'password': 'secret'})
+    create = client.post('/api/system_users/create', data={'username': 'u3', 'password_hash': 'secret'},
+                         headers={'Authorization': f'Bearer {create_access_token(identity="1")}'})
+    for response in (login, register, create):
+        assert response.status_code == 503
+        assert response.get_json() == {'message': '服务繁忙，请稍后重试', 'error_code': '5031'}
+    assert login.headers['Retry-After'] == register.headers['Retry-After'] == '1'
+    assert SystemUser.query.count() == 1
@@ -0,0 +1,83 @@
+"""权限位图：用户 → 角色 → 权限的解析、写入后的同步与接口权限检查"""
+import pytest
+from flask_jwt_extended import create_access_token
+from app.extensions import db
+from app.models import RolePermission, SystemPermission, SystemRole, Task, UserRole
+from app.resources.crud import CrudSpec, build_resources
+from app.services.permissions import permission_engine, require_permission
+
+
+@pytest.fixture
+def rbac(app):
+    db.session.add_all([
+        SystemPermission(id=1, name='查看任务', code='task:view'),
+        SystemPermission(id=2, name='删除任务', code='task:delete'),
+        SystemPermission(id=3, name='无编码'),
+        SystemPermission(id=4, name='管理用户', code='user:manage'),
+        SystemRole(id=1, name='飞手'), SystemRole(id=2, name='管理员'),
+        RolePermission(role_id=1, permission_id=1),
+        RolePermission(role_id=2, permission_id=2), RolePermission(role_id=2, permission_id=4),
+        UserRole(user_id=10, role_id=1), UserRole(user_id=20, role_id=1), UserRole(user_id=20, role_id=2),
+    ])
+    db.session.add(Task(id=1, name='巡检', type='mapping', status='pending', field_id=1))
+    db.session.commit()
+
+
+def _headers(app, user_id):
+    return {'Authorization': f'Bearer {create_access_token(identity=str(user_id))}'}
+
+
+def test_compiled_bits(app, rbac):
+    assert permission_engine.codes(10) == ['task:view']
+    assert permission_engine.codes('20') == ['task:view', 'task:delete', 'user:manage']
+    assert permission_engine.has(20, 'user:manage') and not permission_engine.has(10, 'user:manage')
+    assert not permission_engine.has(10, 'unknown') and permission_engine.codes(99) == []
+    assert permission_engine.user_bits(10) == 0b001 and permission_engine.user_bits(20) == 0b111
+
+
+def test_local_writes_apply_immediately(app, client, rbac):
+    app.config['RBAC_SYNC_INTERVAL'] = 3600
+    assert not permission_engine.has(10, 'task:delete')
+    client.post('/api/role_permissions/create', data={'role_id': '1', 'permission_id': '2'})
+    assert permission_engine.has(10, 'task:delete')
+    client.delete('/api/user_roles/delete/1')
+    assert permission_engine.codes(10) == []
+
+
+def test_other_worker_writes_apply_after_interval(app, rbac, redis):
+    app.config['RBAC_SYNC_INTERVAL'] = 3600
+    assert permission_engine.codes(10) == ['task:view']
+    # 其他进程写库并递增版本号
+    db.session.add(UserRole(user_id=10, role_id=2))
+    db.session.commit()
+    redis.incr('reference_version:user_roles')
+    assert permission_engine.codes(10) == ['task:view']
+    app.config['RBAC_SYNC_INTERVAL'] = 0
+    assert permission_engine.codes(10) == ['task:view', 'task:delete', 'user:manage']
+
+
+def test_require_permission(app, rbac):
+    @app.route('/secured')
+    @require_permission('user:manage')
+    def secured():
+        return {'message': 'ok'}
+
+    client = app.test_client()
+    assert client.get('/secured').status_code == 401
+    response = client.get('/secured', headers=_headers(app, 10))
+    assert response.status_code == 403
+    assert response.get_json() == {'message': '无权访问：缺少权限 user:manage', 'error_code': '4031'}
+    assert client.get('/secured', headers=_headers(app, 20)).get_json() == {'message': 'ok'}
+
+
+def test_spec_permissions(app, rbac):
+    spec = CrudSpec(Task, label='任务', id_arg='task_id', docs=('tasks', 'task', 'tasks'), fields=('name',),
+                    permissions={'get': 'task:view', 'delete': 'task:delete'})
+    get, _, _, delete, _, _ = build_resources(spec, 'GuardedTask')
+    app.add_url_rule('/guarded/<int:task_id>', view_func=get.as_view('guarded_get'))
+    app.add_url_rule('/guarded/delete/<int:task_id>', view_func=delete.as_view('guarded_delete'))
+    client = app.test_client()
+    assert client.get('/guarded/1').status_code == 401
+    assert client.get('/guarded/1', headers=_headers(app, 10)).get_json()['data']['name'] == '巡检'
+    assert client.delete('/guarded/delete/1', headers=_headers(app, 10)).status_code == 403
+    assert client.delete('/guarded/delete/1', headers=_headers(app, 20)).status_code == 200
@@ -0,0 +1,110 @@
+"""单条记录读穿缓存：回填、写入失效、加载锁与降级"""
+import json
+import time
+import pytest
+from app.extensions import db
+from app.models import Plot
+from app.services import record_cache
+
+
+@pytest.fixture
+def plot(app):
+    db.session.add(Plot(id=1, name='地块一', area=2.5, geom='POINT(0 0)', metadata_info={'crop': '玉米'}))
+    db.session.commit()
+
+
+def _loader(value):
+    calls = []
+
+    def load():
+        calls.append(1)
+        return value
+
+    return load, calls
+
+
+def test_get_fills_cache(client, plot, redis):
+    response = client.get('/api/plots/1')
+    assert response.status_code == 200
+    assert response.get_json() == {'message': '地块获取成功', 'data': Plot.query.get(1).to_dict()}
+    assert json.loads(redis.get('record:plots:1')) == Plot.query.get(1).to_dict()
+    assert not redis.exists('record:plots:1:lock')
+    # 过期时间带抖动，不超过配置值的 110%
+    remaining = redis.expires['record:plots:1'] - time.time()
+    assert 60 * 0.99 < remaining <= 60 * 1.1
+
+
+@pytest.mark.parametrize('write', [
+    lambda client: client.put('/api/plots/update/1', data={'name': '改名'}),
+    lambda client: client.delete('/api/plots/delete/1'),
+    lambda client: client.put('/api/plots/bulk', json={'items': [{'id': 1, 'area': 3}]}),
+    lambda client: client.delete('/api/plots/bulk', json={'ids': [1]}),
+])
+def test_writes_invalidate(client, plot, redis, write):
+    client.get('/api/plots/1')
+    assert write(client).status_code == 200
+    assert redis.keys('record:plots:*') == []
+
+
+def test_unchanged_update_keeps_cache(client, plot, redis):
+    client.get('/api/plots/1')
+    client.put('/api/plots/update/1', data={'name': '地块一'})
+    assert redis.exists('record:plots:1')
+
+
+def test_missing_record_is_not_cached(client, plot, redis):
+    response = client.get('/api/plots/9')
+    assert response.status_code == 404 and response.get_json()['message'] == '记录不存在：ID=9'
+    assert redis.keys('record:plots:9*') == []
+
+
+def test_repeated_get_is_served_from_cache(client, plot, redis):
+    first = client.get('/api/plots/1')
+    assert first.status_code == 200 and redis.keys('record:plots:1')
+    second = client.get('/api/plots/1')
+    assert second.status_code == 200
+    assert second.get_json() == first.get_json()
+    assert second.get_json()['data']['metadata_info'] == {'crop': '玉米'}
+
+
+def test_read_through_returns_bytes_on_hit(app):
+    load, calls = _loader(b'{"id":7}')
+    assert record_cache.read_through(Plot, 7, load) == b'{"id":7}'
+    assert record_cache.read_through(Plot, 7, load) == b'{"id":7}'
+    assert len(calls) == 1
+
+
+def test_waits_for_lock_holder_without_filling(app, redis, monkeypatch):
+    monkeypatch.setattr(record_cache, 'WAIT_TIMEOUT', 0.05)
+    redis.set('record:plots:7:lock', 'other', px=5000)
+    load, calls = _loader(b'{"id":7}')
+    assert record_cache.read_through(Plot, 7, load) == b'{"id":7}'
+    assert len(calls) == 1 and not redis.exists('record:plots:7')
+
+
+def test_stale_loader_does_not_fill(app, redis):
+    def load():
+        # 加载期间另一个请求提交了写入
+        record_cache.invalidate(Plot, [7])
+        return b'{"id":7,"name":"old"}'
+
+    assert record_cache.read_through(Plot, 7, load) == b'{"id":7,"name":"old"}'
+    assert redis.keys('record:plots:7*') == []
+
+
+def test_disabled_and_unavailable(app, redis, monkeypatch):
+    app.config['RECORD_CACHE_TTL'] = 0
+    load, calls = _loader(b'{}')
+    record_cache.read_through(Plot, 7, load)
+    assert redis.keys() == []
+
+    app.config['RECORD_CACHE_TTL'] = 60
+
+    def unavailable(*args, **kwargs):
+        raise ConnectionError('redis down')
+
+    monkeypatch.setattr(redis, 'get', unavailable)
+    monkeypatch.setattr(redis, 'delete', unavailable)
+    assert record_cache.read_through(Plot, 7, load) == b'{}'
+    record_cache.invalidate(Plot, [7])
+    assert len(calls) == 2
@@ -0,0 +1,92 @@
+"""参照表快照：版本不变时读取不访问数据库，写入或其他进程的版本变化后重新加载"""
+from contextlib import contextmanager
+import pytest
+from sqlalchemy import event
+from app.extensions import db
+from app.models import SystemRole
+from app.services.reference_cache import reference_snapshot
+
+
+@pytest.fixture
+def roles(app):
+    db.session.add_all([SystemRole(id=1, name='管理员'), SystemRole(id=2, name='飞手'), SystemRole(id=3, name='访客')])
+    db.session.commit()
+
+
+@contextmanager
+def _selects():
+    statements = []
+
+    def capture(conn, cursor, statement, *args):
+        if statement.lstrip().upper().startswith('SELECT'):
+            statements.append(statement)
+
+    event.listen(db.engine, 'before_cursor_execute', capture)
+    try:
+        yield statements
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', capture)
+
+
+def test_reads_are_served_from_snapshot(client, roles, redis):
+    listed = client.get('/api/system_roles/list').get_json()
+    assert listed['message'] == '系统角色列表获取成功'
+    assert listed['data'] == [role.to_dict() for role in SystemRole.query.order_by(SystemRole.id)]
+    with _selects() as statements:
+        assert client.get('/api/system_roles/2').get_json()['data']['name'] == '飞手'
+        assert client.get('/api/system_roles/list?fields=id,name').get_json()['data'][2] == {'id': 3, 'name': '访客'}
+        batch = client.get('/api/system_roles/batch?ids=3,8&fields=name').get_json()
+    assert statements == []
+    assert batch['data'] == {'3': {'name': '访客'}} and batch['missing'] == [8]
+    assert redis.keys('record:*') == []
+
+
+def test_write_bumps_version(client, roles, redis):
+    client.get('/api/system_roles/list')
+    assert client.put('/api/system_roles/update/2', data={'name': '植保员'}).status_code == 200
+    assert redis.get('reference_version:system_roles') == '1'
+    assert client.get('/api/system_roles/2').get_json()['data']['name'] == '植保员'
+    client.post('/api/system_roles/create', data={'name': '审计'})
+    client.delete('/api/system_roles/delete/1')
+    assert [row['name'] for row in client.get('/api/system_roles/list').get_json()['data']] == ['植保员', '访客', '审计']
+    assert redis.get('reference_version:system_roles') == '3'
+    response = client.get('/api/system_roles/1')
+    assert response.status_code == 404 and response.get_json()['message'] == '记录不存在：ID=1'
+
+
+def test_bulk_write_bumps_version_once(client, roles, redis):
+    client.get('/api/system_roles/list')
+    client.post('/api/system_roles/bulk', json={'items': [{'name': '甲'}, {'name': '乙'}]})
+    assert redis.get('reference_version:system_roles') == '1'
+    assert len(client.get('/api/system_roles/list').get_json()['data']) == 5
+
+
+def test_other_worker_write_triggers_reload(client, roles, redis):
+    client.get('/api/system_roles/list')
+    # 其他进程直接写库并递增版本号
+    db.session.add(SystemRole(id=4, name='外部'))
+    db.session.commit()
+    assert len(client.get('/api/system_roles/list').get_json()['data']) == 3
+    redis.incr('reference_version:system_roles')
+    assert len(client.get('/api/system_roles/list').get_json()['data']) == 4
+
+
+def test_redis_unavailable_keeps_snapshot(app, roles, redis, monkeypatch):
+    def unavailable(*args, **kwargs):
+        raise ConnectionError('redis down')
+
+    snapshot = reference_snapshot(SystemRole)
+    monkeypatch.setattr(redis, 'get', unavailable)
+    monkeypatch.setattr(redis, 'incr', unavailable)
+    # 首次读取仍会加载，之后沿用已加载的快照
+    assert [row['id'] for row in snapshot.rows()] == [1, 2, 3]
+    with _selects() as statements:
+        assert snapshot.get(2)['name'] == '飞手'
+    assert statements == []
+    snapshot.bump()
+    assert len(snapshot.rows()) == 3
+
+
+def test_stream_reads_from_database(client, roles):
+    lines = client.get('/api/system_roles/list?stream=ndjson').get_data(as_text=True).splitlines()
+    assert len(lines) == 3
@@ -0,0 +1,63 @@
+"""预编译序列化函数：输出与逐列 to_dict 一致，字节串编码与标准库 json 等价"""
+import json
+from datetime import datetime
+import pytest
+from app.extensions import db
+from app.models import AnalysisResult, Plot
+from app.services import serializer
+from app.services.serializer import dumps, model_fields, serializer_for
+
+STAMP = datetime(2024, 5, 1, 8, 30, 15, 123456)
+
+
+@pytest.fixture
+def result(app):
+    record = AnalysisResult(id=1, name='NDVI', type='ndvi', stats={'mean': 0.5, 'bins': [1, 2]},
+                            created_at=STAMP, updated_at=STAMP)
+    db.session.add(record)
+    db.session.commit()
+    return record
+
+
+def test_to_dict_covers_all_columns(result):
+    data = result.to_dict()
+    assert list(data) == model_fields(AnalysisResult)
+    assert data['created_at'] == STAMP.isoformat() and data['stats'] == {'mean': 0.5, 'bins': [1, 2]}
+    assert data['result_path'] is None
+
+
+def test_field_subset_keeps_order(result):
+    assert result.to_dict(fields=['type', 'id']) == {'type': 'ndvi', 'id': 1}
+    with pytest.raises(ValueError, match='未知字段：password'):
+        serializer_for(AnalysisResult, ['id', 'password'])
+
+
+def test_serializers_are_cached():
+    assert serializer_for(Plot, ['id', 'name']) is serializer_for(Plot, ('id', 'name'))
+    assert serializer_for(Plot) is not serializer_for(Plot, ['id', 'name'])
+
+
+def test_native_datetime_encodes_like_isoformat(result):
+    native = serializer_for(AnalysisResult, native_datetime=True)(result)
+    assert json.loads(dumps(native)) == result.to_dict()
+
+
+@pytest.mark.parametrize('use_orjson', [True, False])
+def test_dumps(monkeypatch, use_orjson):
+    if not use_orjson:
+        monkeypatch.setattr(serializer, 'orjson', None)
+    elif serializer.orjson is None:
+        pytest.skip('orjson 未安装')
+    payload = {'名称': '地块', 'at': STAMP, 'big': 1 << 70, 'ratio': 0.25, 'none': None}
+    encoded = dumps(payload)
+    assert isinstance(encoded, bytes)
+    assert json.loads(encoded) == {'名称': '地块', 'at': STAMP.isoformat(), 'big': 1 << 70,
+                                   'ratio': 0.25, 'none': None}
+
+
+def test_list_and_page_use_serializer(client, result):
+    listed = client.get('/api/analysis_results/list')
+    assert listed.mimetype == 'application/json'
+    assert listed.get_json() == {'message': '分析结果列表获取成功', 'data': [result.to_dict()]}
+    page = client.get('/api/analysis_results/page').get_json()
+    assert page['data'] == [result.to_dict()] and page['total'] == 1
@@ -0,0 +1,86 @@
+"""空间索引：bbox 过滤、本进程增量更新、跨进程版本同步与批量写入只递增一次版本号"""
+import pytest
+from app.extensions import db
+from app.models import Plot
+from app.services.spatial_index import parse_bbox, spatial_index
+
+
+def _point(x, y):
+    return f'POINT({x} {y})'
+
+
+def _names(client, bbox, resource='plots'):
+    response = client.get(f'/api/{resource}/list?bbox={bbox}')
+    assert response.status_code == 200
+    return sorted(row['name'] for row in response.get_json()['data'])
+
+
+def test_bbox_filter_follows_writes(client, redis):
+    for i in range(3):
+        assert client.post('/api/plots/create', data={'name': f'p{i}', 'geom': _point(116 + i, 39.9)}).status_code == 201
+    assert redis.get('spatial_version:plots') == '3'
+    assert _names(client, '115.5,39,117.5,41') == ['p0', 'p1']
+    page = client.get('/api/plots/page?bbox=115,39,120,41&page_size=2').get_json()
+    assert page['total'] == 3 and len(page['data']) == 2
+
+    assert client.put('/api/plots/update/1', data={'geom': _point(130, 30)}).status_code == 200
+    assert client.delete('/api/plots/delete/2').status_code == 200
+    assert _names(client, '115,39,120,41') == ['p2']
+    assert _names(client, '129,29,131,31') == ['p0']
+    assert _names(client, '0,0,1,1') == []
+
+
+def test_other_worker_write_triggers_reload(app, redis):
+    db.session.add(Plot(id=1, name='a', geom=_point(1, 1)))
+    db.session.commit()
+    index = spatial_index(Plot)
+    assert index.query((0, 0, 2, 2)) == [1]
+    # 其他进程直接写库并递增版本号
+    db.session.add(Plot(id=2, name='b', geom='POLYGON((1.5 1.5, 3 1.5, 3 3, 1.5 3, 1.5 1.5))'))
+    db.session.commit()
+    assert index.query((0, 0, 2, 2)) == [1]
+    redis.incr(index.version_key)
+    assert index.query((0, 0, 2, 2)) == [1, 2]
+
+
+def test_local_write_does_not_reload(app, redis, monkeypatch):
+    index = spatial_index(Plot)
+    assert index.query((0, 0, 2, 2)) == []
+    monkeypatch.setattr(index, '_reload', lambda: pytest.fail('unexpected reload'))
+    index.upsert(5, _point(1, 1))
+    assert index.query((0, 0, 2, 2)) == [5]
+    index.remove(5)
+    assert index.query((0, 0, 2, 2)) == []
+
+
+@pytest.mark.parametrize('value', ['1,2,3', 'a,b,c,d', '3,0,1,1', '0,3,1,1'])
+def test_invalid_bbox(client, value):
+    with pytest.raises(ValueError):
+        parse_bbox(value)
+    for resource in ('plots', 'imagery', 'map_objects_3d'):
+        assert client.get(f'/api/{resource}/list?bbox={value}').status_code == 400
+
+
+def test_bulk_writes_bump_version_once(client, redis):
+    items = [{'name': f'p{i}', 'geom': _point(116 + i, 39.9)} for i in range(3)]
+    # 先查询一次，使本进程索引在写入前已加载
+    assert client.get('/api/plots/list?bbox=115,39,120,41').get_json()['data'] == []
+
+    created = client.post('/api/plots/bulk', json={'items': items})
+    assert created.get_json()['succeeded'] == 3
+    assert redis.get('spatial_version:plots') == '1'
+    names = [row['name'] for row in client.get('/api/plots/list?bbox=115.5,39,117.5,41').get_json()['data']]
+    assert sorted(names) == ['p0', 'p1']
+
+    updated = client.put('/api/plots/bulk', json={'items': [
+        {'id': 1, 'geom': _point(130, 30)}, {'id': 2, 'geom': _point(131, 30)}, {'id': 3, 'name': 'renamed'}
+    ]})
+    assert updated.get_json()['succeeded'] == 3
+    assert redis.get('spatial_version:plots') == '2'
+    names = [row['name'] for row in client.get('/api/plots/list?bbox=115,39,120,41').get_json()['data']]
+    assert names == ['renamed']
+
+    deleted = client.delete('/api/plots/bulk', json={'ids': [1, 2, 3]})
+    assert deleted.get_json()['succeeded'] == 3
+    assert redis.get('spatial_version:plots') == '3'
+    assert client.get('/api/plots/list?bbox=100,20,140,50').get_json()['data'] == []
@@ -0,0 +1,59 @@
+"""列表接口的流式输出：ndjson 与分块 json 与普通响应内容一致"""
+import json
+import pytest
+from app.extensions import db
+from app.models import Plot
+from app.services import streaming
+
+
+@pytest.fixture
+def plots(app):
+    app.config['STREAM_CHUNK_SIZE'] = 3
+    db.session.add_all([Plot(id=i, name=f'地块{i}', geom=f'POINT({i} 0)') for i in range(1, 9)])
+    db.session.commit()
+
+
+def test_ndjson(client, plots):
+    response = client.get('/api/plots/list?stream=ndjson')
+    assert response.status_code == 200 and response.mimetype == 'application/x-ndjson'
+    assert response.is_streamed
+    lines = response.get_data(as_text=True).splitlines()
+    buffered = client.get('/api/plots/list').get_json()['data']
+    assert [json.loads(line) for line in lines] == buffered
+    assert [row['name'] for row in buffered] == [f'地块{i}' for i in range(1, 9)]
+
+
+def test_json_matches_buffered(client, plots):
+    response = client.get('/api/plots/list?stream=json')
+    assert response.mimetype == 'application/json' and response.is_streamed
+    assert json.loads(response.get_data(as_text=True)) == client.get('/api/plots/list').get_json()
+
+
+def test_stream_respects_filters(client, plots):
+    lines = client.get('/api/plots/list?stream=ndjson&bbox=0,-1,2.5,1').get_data(as_text=True).splitlines()
+    assert [json.loads(line)['id'] for line in lines] == [1, 2]
+    body = json.loads(client.get('/api/tasks/list?stream=json').get_data(as_text=True))
+    assert body['data'] == []
+
+
+def test_error_after_headers(app, plots, monkeypatch):
+    rows = streaming._rows
+
+    def broken(*args):
+        yield next(rows(*args))
+        raise RuntimeError('连接中断')
+
+    monkeypatch.setattr(streaming, '_rows', broken)
+    with app.test_request_context():
+        ndjson = streaming.stream_query(Plot.query, '地块列表获取成功', 'ndjson')
+        lines = ndjson.get_data(as_text=True).splitlines()
+        json_body = streaming.stream_query(Plot.query, '地块列表获取成功', 'json').get_data(as_text=True)
+    assert [json.loads(line)['id'] for line in lines[:-1]] == [1, 2, 3]
+    assert json.loads(lines[-1])['error_code'] == '5001' and '连接中断' in json.loads(lines[-1])['message']
+    with pytest.raises(ValueError):
+        json.loads(json_body)
+
+
+def test_invalid_stream_format(client):
+    response = client.get('/api/plots/list?stream=csv')
+    assert response.status_code == 400 and 'ndjson, json' in response.get_json()['message']
@@ -0,0 +1,136 @@
+"""XYZ 瓦片接口、两级瓦片缓存、无效显示范围的回退与拉伸范围缓存上限"""
+import io
+from types import SimpleNamespace
+import numpy as np
+import pytest
+import rasterio
+from PIL import Image
+from rasterio.transform import from_origin
+from app.extensions import db
+from app.models import AnalysisResult, Imagery
+from app.services import tiles
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    cache = tiles.TileCache()
+    cache.cache_dir = str(tmp_path / 'tiles')
+    monkeypatch.setattr(tiles, 'tile_cache', cache)
+    return cache
+
+
+@pytest.fixture
+def records(app, tmp_path, cache):
+    imagery_path = str(tmp_path / 'capture.tif')
+    with rasterio.open(imagery_path, 'w', driver='GTiff', width=64, height=64, count=1, dtype='uint16',
+                       crs='EPSG:4326', transform=from_origin(0, 1, 1 / 64, 1 / 64)) as dst:
+        dst.write(np.arange(64 * 64, dtype=np.uint16).reshape(1, 64, 64))
+    result_path = str(tmp_path / 'ndvi.tif')
+    with rasterio.open(result_path, 'w', driver='GTiff', width=64, height=64, count=1, dtype='float32',
+                       crs='EPSG:4326', transform=from_origin(0, 1, 1 / 64, 1 / 64)) as dst:
+        dst.write(np.linspace(-1, 1, 64 * 64, dtype=np.float32).reshape(1, 64, 64))
+    db.session.add(Imagery(id=1, name='影像', file_path=imagery_path))
+    db.session.add(AnalysisResult(id=1, name='NDVI', type='ndvi', result_path=result_path))
+    db.session.commit()
+
+
+def _image(response):
+    return np.asarray(Image.open(io.BytesIO(response.data)))
+
+
+@pytest.mark.parametrize('kind', ['imagery', 'analysis'])
+def test_tile_renders_and_caches(client, records, cache, kind):
+    # z=8 下 (128, 127) 瓦片覆盖经度 0~1.4、纬度 0~1.4，与栅格相交
+    response = client.get(f'/api/tiles/{kind}/1/8/128/127.png')
+    assert response.status_code == 200 and response.content_type == 'image/png'
+    rgba = _image(response)
+    assert rgba.shape == (256, 256, 4)
+    assert rgba[..., 3].any() and not rgba[..., 3].all()
+    etag = response.headers['ETag'].strip('"')
+    assert len(cache._entries) == 1
+
+    cached = client.get(f'/api/tiles/{kind}/1/8/128/127.png')
+    assert cached.data == response.data
+    assert client.get(f'/api/tiles/{kind}/1/8/128/127.png',
+                      headers={'If-None-Match': f'"{etag}"'}).status_code == 304
+
+
+def test_tile_outside_raster_is_empty(client, records):
+    response = client.get('/api/tiles/imagery/1/8/0/0.png')
+    assert response.status_code == 200
+    assert response.data == tiles.EMPTY_TILE
+
+
+def test_disk_cache_survives_memory_eviction(client, records, cache):
+    first = client.get('/api/tiles/analysis/1/8/128/127.png').data
+    key, = cache._entries
+    cache._entries.clear()
+    cache._size = 0
+    assert cache.get(key) == first
+    assert list(cache._entries) == [key]
+
+
+def test_memory_lru_is_byte_bounded():
+    cache = tiles.TileCache()
+    cache.max_bytes = 10
+    for name in 'abc':
+        cache.put(name, b'1234')
+    assert list(cache._entries) == ['b', 'c'] and cache._size == 8
+    cache.get('b')
+    cache.put('d', b'1234')
+    assert list(cache._entries) == ['b', 'd']
+
+
+@pytest.mark.parametrize('path, status', [
+    ('/api/tiles/plots/1/8/128/127.png', 400),
+    ('/api/tiles/imagery/1/8/256/0.png', 400),
+    ('/api/tiles/imagery/1/25/0/0.png', 400),
+    ('/api/tiles/imagery/9/8/128/127.png', 404),
+])
+def test_tile_errors(client, records, path, status):
+    assert client.get(path).status_code == status
+
+
+@pytest.fixture
+def raster(tmp_path):
+    path = str(tmp_path / 'index.tif')
+    data = np.linspace(-1, 1, 64 * 64, dtype=np.float32).reshape(1, 64, 64)
+    with rasterio.open(path, 'w', driver='GTiff', width=64, height=64, count=1, dtype='float32',
+                       crs='EPSG:4326', transform=from_origin(0, 1, 1 / 64, 1 / 64)) as dst:
+        dst.write(data)
+    return path
+
+
+@pytest.mark.parametrize('value, expected', [
+    ([0, 1], (0.0, 1.0)),
+    ((-1, 1.5), (-1.0, 1.5)),
+    ([0.5, 0.5], None),
+    ([1, 0], None),
+    (['a', 'b'], None),
+    ([None, 1], None),
+    ([0, float('nan')], None),
+    ([True, 2], None),
+    ([0, 1, 2], None),
+    (5, None),
+])
+def test_valid_range(value, expected):
+    assert tiles.valid_range(value) == expected
+
+
+@pytest.mark.parametrize('style, stats', [
+    ({'range': [0.5, 0.5]}, {}),
+    ({'range': 'abc'}, {'percentiles': {'p2': 0.2, 'p98': 0.2}}),
+    ({'range': [1]}, {'percentiles': 'bad'}),
+])
+def test_invalid_style_range_renders(raster, style, stats):
+    result = SimpleNamespace(result_path=raster, style=style, stats=stats)
+    png = tiles.render_analysis_tile(result, 8, 128, 127)
+    assert png.startswith(b'\x89PNG') and png != tiles.EMPTY_TILE
+
+
+def test_display_ranges_bounded(raster, monkeypatch):
+    monkeypatch.setattr(tiles, 'MAX_RANGES', 3)
+    cache = tiles.TileCache()
+    for version in range(5):
+        assert cache.display_range(f'v{version}')(raster, [1]) is not None
+    assert list(cache._ranges) == [(f'v{version}', (1,)) for version in (2, 3, 4)]
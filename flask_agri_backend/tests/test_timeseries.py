@@ -0,0 +1,77 @@
+"""地块指数时间序列：逐期读取地块窗口，结果按记录版本缓存"""
+import json
+from datetime import datetime
+import numpy as np
+import pytest
+import rasterio
+from rasterio.transform import from_origin
+from app.extensions import db
+from app.models import Imagery, Plot
+from app.services import timeseries
+
+PLOT = 'POLYGON((0.2 0.2, 0.4 0.2, 0.4 0.4, 0.2 0.4, 0.2 0.2))'
+ELSEWHERE = 'POLYGON((10 10, 11 10, 11 11, 10 11, 10 10))'
+
+
+def _capture(path, red, nir):
+    with rasterio.open(path, 'w', driver='GTiff', width=100, height=100, count=2, dtype='uint16',
+                       crs='EPSG:4326', transform=from_origin(0, 1, 0.01, 0.01)) as dst:
+        dst.write(np.stack([np.full((100, 100), red), np.full((100, 100), nir)]).astype(np.uint16))
+    return path
+
+
+@pytest.fixture
+def series(app, tmp_path):
+    bands = {'red_band_index': 1, 'nir_band_index': 2}
+    db.session.add_all([
+        Plot(id=1, name='地块', geom=PLOT),
+        Imagery(id=1, name='七月', file_path=_capture(str(tmp_path / 'b.tif'), 100, 300),
+                capture_time=datetime(2024, 7, 1), **bands),
+        Imagery(id=2, name='五月', file_path=_capture(str(tmp_path / 'a.tif'), 100, 100),
+                capture_time=datetime(2024, 5, 1), **bands),
+        Imagery(id=3, name='别处', file_path=_capture(str(tmp_path / 'c.tif'), 1, 2),
+                capture_time=datetime(2024, 6, 1), geom=ELSEWHERE, **bands),
+        Imagery(id=4, name='缺失', file_path=str(tmp_path / 'missing.tif'),
+                capture_time=datetime(2024, 6, 2), **bands),
+        Imagery(id=5, name='已删除', file_path=_capture(str(tmp_path / 'd.tif'), 1, 2),
+                capture_time=datetime(2024, 6, 3), status='deleted', **bands),
+    ])
+    db.session.commit()
+
+
+def test_series_ordered_by_capture_time(client, series, redis):
+    response = client.get('/api/plots/1/timeseries?index=ndvi')
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body['plot_id'] == 1 and body['index'] == 'ndvi'
+    assert [item['imagery_id'] for item in body['data']] == [2, 1]
+    may, july = body['data']
+    assert may['mean'] == pytest.approx(0) and july['mean'] == pytest.approx(0.5)
+    assert july['median'] == pytest.approx(0.5) and july['count'] == 400
+    assert july['capture_time'] == '2024-07-01T00:00:00'
+    # 只缓存成功的结果，缺失文件的影像下次重试
+    assert len(redis.keys('timeseries:1:*')) == 2
+
+
+def test_series_reads_memo(client, series, redis, monkeypatch):
+    client.get('/api/plots/1/timeseries')
+    for key in redis.keys('timeseries:1:*'):
+        redis.set(key, json.dumps({'mean': 0.9, 'median': 0.9, 'std': 0, 'min': 0.9, 'max': 0.9, 'count': 1}))
+    extracted = []
+    monkeypatch.setattr(timeseries, 'extract_plot_value', lambda path, *args: extracted.append(path))
+    data = client.get('/api/plots/1/timeseries').get_json()['data']
+    assert [item['mean'] for item in data] == pytest.approx([0.9, 0.9])
+    assert [path.rsplit('/', 1)[-1] for path in extracted] == ['missing.tif']
+
+
+def test_custom_expression(client, series):
+    response = client.get('/api/plots/1/timeseries?index=ratio&expression=nir/red')
+    assert [item['mean'] for item in response.get_json()['data']] == pytest.approx([1, 3])
+
+
+def test_errors(client, series):
+    assert client.get('/api/plots/9/timeseries').status_code == 404
+    assert client.get('/api/plots/1/timeseries?index=unknown').status_code == 400
+    db.session.add(Plot(id=2, name='无几何', geom='POLYGON EMPTY'))
+    db.session.commit()
+    assert client.get('/api/plots/2/timeseries').status_code == 400
@@ -0,0 +1,160 @@
+"""JWT 黑名单：布隆过滤器放行未吊销的令牌，可能存在时以 Redis 为准，订阅断开后重建"""
+import threading
+import time
+import pytest
+from flask_jwt_extended import create_access_token, create_refresh_token
+from app.extensions import jwt
+from app.resources import auth
+from app.services import token_blocklist as blocklist_module
+from app.services.token_blocklist import DEFAULT_TTL, RevokedFilter, TokenBlocklist
+
+
+class Link:
+    """包装 redis.pubsub：down 时订阅连接断开，stopped 时结束监听线程"""
+
+    def __init__(self, redis):
+        self.pubsub_factory = redis.pubsub
+        self.down = False
+        self.stopped = False
+        self.connections = 0
+
+    def pubsub(self, **kwargs):
+        if self.down:
+            raise ConnectionError('redis down')
+        pubsub = self.pubsub_factory(**kwargs)
+        get_message = pubsub.get_message
+        self.connections += 1
+
+        def guarded(timeout=0.0):
+            if self.stopped:
+                raise SystemExit
+            if self.down:
+                raise ConnectionError('connection lost')
+            return get_message(timeout)
+
+        pubsub.get_message = guarded
+        return pubsub
+
+
+def _wait(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+@pytest.fixture
+def link(redis, monkeypatch):
+    link = Link(redis)
+    monkeypatch.setattr(redis, 'pubsub', link.pubsub)
+    monkeypatch.setattr(blocklist_module, 'RETRY_INTERVAL', 0.01)
+    yield link
+    link.stopped = True
+    for thread in threading.enumerate():
+        if thread.name == 'jwt-blocklist':
+            thread.join(timeout=1)
+
+
+@pytest.fixture
+def worker(link):
+    def start():
+        blocklist = TokenBlocklist()
+        blocklist.is_revoked({'jti': 'warm-up'})
+        _wait(lambda: blocklist._ready)
+        return blocklist
+
+    return start
+
+
+@pytest.fixture
+def gets(redis, monkeypatch):
+    calls = []
+    get = redis.get
+
+    def counting(key):
+        calls.append(key)
+        return get(key)
+
+    monkeypatch.setattr(redis, 'get', counting)
+    return calls
+
+
+def test_revoke_then_check(app, worker, gets):
+    blocklist = worker()
+    gets.clear()
+    assert not blocklist.is_revoked({'jti': 'a'})
+    # 过滤器判定不存在时不查询 Redis
+    assert gets == []
+    blocklist.revoke({'jti': 'a', 'exp': time.time() + 600})
+    assert blocklist.is_revoked({'jti': 'a'}) and gets == ['blacklist:a']
+
+
+def test_false_positive_is_confirmed_against_redis(app, worker, gets):
+    blocklist = worker()
+    blocklist._filter.array[:] = b'\xff' * len(blocklist._filter.array)
+    gets.clear()
+    assert 'b' in blocklist._filter
+    assert not blocklist.is_revoked({'jti': 'b'})
+    assert gets == ['blacklist:b']
+
+
+@pytest.mark.parametrize('offset, expected', [(120, 121), (-30, 1), (None, DEFAULT_TTL)])
+def test_ttl_from_exp(app, redis, worker, offset, expected):
+    payload = {'jti': 'c'} if offset is None else {'jti': 'c', 'exp': int(time.time()) + offset}
+    worker().revoke(payload)
+    assert redis.expires['blacklist:c'] - time.time() == pytest.approx(expected, abs=1.5)
+
+
+def test_revocation_reaches_other_workers(app, worker, gets):
+    first, second = worker(), worker()
+    second.revoke({'jti': 'd', 'exp': time.time() + 600})
+    _wait(lambda: 'd' in first._filter)
+    assert first.is_revoked({'jti': 'd'})
+
+
+def test_rebuild_after_reconnect(app, redis, link, worker, gets):
+    blocklist = worker()
+    link.down = True
+    _wait(lambda: not blocklist._ready)
+    # 断开期间的吊销收不到广播，也不能信任过滤器
+    redis.setex('blacklist:e', 600, 'revoked')
+    gets.clear()
+    assert blocklist.is_revoked({'jti': 'e'}) and not blocklist.is_revoked({'jti': 'f'})
+    assert gets == ['blacklist:e', 'blacklist:f']
+    link.down = False
+    _wait(lambda: blocklist._ready)
+    assert 'e' in blocklist._filter and link.connections == 2
+    gets.clear()
+    assert not blocklist.is_revoked({'jti': 'f'}) and gets == []
+
+
+def test_rebuild_drops_expired(app, redis, worker):
+    redis.setex('blacklist:old', 600, 'revoked')
+    redis.expires['blacklist:old'] = time.time() - 1
+    redis.setex('blacklist:live', 600, 'revoked')
+    blocklist = worker()
+    assert 'live' in blocklist._filter and 'old' not in blocklist._filter
+
+
+def test_filter_has_no_false_negatives():
+    revoked = RevokedFilter(bits=1 << 12)
+    jtis = [f'jti-{i}' for i in range(200)]
+    for jti in jtis:
+        revoked.add(jti)
+    assert all(jti in revoked for jti in jtis)
+
+
+def test_logout_and_refresh_revoke_tokens(app, client, redis, worker, monkeypatch):
+    blocklist = worker()
+    monkeypatch.setattr(auth, 'token_blocklist', blocklist)
+    monkeypatch.setattr(jwt, '_token_in_blocklist_callback', lambda header, payload: blocklist.is_revoked(payload))
+    access = {'Authorization': f'Bearer {create_access_token(identity="1")}'}
+    assert client.post('/api/auth/logout', headers=access).get_json()['message'] == '注销成功'
+    key, = redis.keys('blacklist:*')
+    # 剩余寿命约为访问令牌有效期（15 分钟）
+    assert redis.expires[key] - time.time() == pytest.approx(15 * 60, abs=2)
+    assert client.post('/api/auth/logout', headers=access).status_code == 401
+
+    refresh = {'Authorization': f'Bearer {create_refresh_token(identity="1")}'}
+    assert client.post('/api/auth/refresh', headers=refresh).status_code == 200
+    assert client.post('/api/auth/refresh', headers=refresh).status_code == 401
@@ -0,0 +1,83 @@
+"""矢量瓦片：裁剪、量化与 MVT 编码"""
+import math
+import pytest
+from shapely.geometry import LineString, MultiPoint, Polygon
+from app.extensions import db
+from app.models import MapObject3D, Plot
+from app.services.vector_tiles import (
+    CMD_CLOSE_PATH, CMD_LINE_TO, CMD_MOVE_TO, GEOM_LINESTRING, GEOM_POINT, GEOM_POLYGON, encode_geometry
+)
+
+Z = 12
+
+
+def _tile(lon, lat, z=Z):
+    n = 1 << z
+    x = int((lon + 180) / 360 * n)
+    y = int((1 - math.asinh(math.tan(math.radians(lat))) / math.pi) / 2 * n)
+    return x, y
+
+
+def _square(lon, lat, size):
+    return (f'POLYGON(({lon} {lat}, {lon + size} {lat}, {lon + size} {lat + size}, '
+            f'{lon} {lat + size}, {lon} {lat}))')
+
+
+def test_encode_commands():
+    assert encode_geometry(MultiPoint([(1, 2), (3, 1)])) == (GEOM_POINT, [CMD_MOVE_TO | 2 << 3, 2, 4, 4, 1])
+    assert encode_geometry(LineString([(0, 0), (0, 0), (5, 5)])) == \
+        (GEOM_LINESTRING, [CMD_MOVE_TO | 1 << 3, 0, 0, CMD_LINE_TO | 1 << 3, 10, 10])
+    # 外环统一为正面积方向（y 轴向下的瓦片坐标系中即顺时针），闭合点由 ClosePath 表示
+    geom_type, commands = encode_geometry(Polygon([(0, 0), (0, 10), (10, 10), (10, 0)]))
+    assert geom_type == GEOM_POLYGON
+    assert commands == [CMD_MOVE_TO | 1 << 3, 0, 0, CMD_LINE_TO | 3 << 3, 20, 0, 0, 20, 19, 0,
+                        CMD_CLOSE_PATH | 1 << 3]
+    assert encode_geometry(Polygon([(0, 0), (1, 0), (1, 0)])) is None
+
+
+@pytest.fixture
+def features(app):
+    db.session.add_all([
+        Plot(id=1, name='东地块', crop_type='玉米', geom=_square(116.390, 39.900, 0.005)),
+        # 跨越瓦片边界的大地块，裁剪后仍在缓冲范围内
+        Plot(id=2, name='大地块', geom=_square(116.0, 39.5, 1.0)),
+        Plot(id=3, name='远处', geom=_square(100.0, 20.0, 0.01)),
+        MapObject3D(id=1, name='塔', type='tower', geom='POINT(116.392 39.902)'),
+    ])
+    db.session.commit()
+
+
+def test_vector_tile_endpoint(client, features):
+    decode = pytest.importorskip('mapbox_vector_tile').decode
+    x, y = _tile(116.392, 39.902)
+    response = client.get(f'/api/vt/plots/{Z}/{x}/{y}.mvt')
+    assert response.status_code == 200
+    assert response.content_type == 'application/vnd.mapbox-vector-tile'
+    layer = decode(response.data, default_options={'y_coord_down': True})['plots']
+    assert layer['extent'] == 4096
+    by_id = {feature['id']: feature for feature in layer['features']}
+    assert set(by_id) == {1, 2}
+    assert by_id[1]['properties'] == {'name': '东地块', 'crop_type': '玉米'}
+    assert by_id[1]['geometry']['type'] == 'Polygon'
+    ring = by_id[1]['geometry']['coordinates'][0]
+    assert all(-64 <= px <= 4096 + 64 and -64 <= py <= 4096 + 64 for px, py in ring)
+    big = by_id[2]['geometry']['coordinates'][0]
+    assert {min(px for px, _ in big), max(px for px, _ in big)} == {-64, 4096 + 64}
+
+    etag = response.headers['ETag'].strip('"')
+    assert client.get(f'/api/vt/plots/{Z}/{x}/{y}.mvt', headers={'If-None-Match': f'"{etag}"'}).status_code == 304
+
+    objects = decode(client.get(f'/api/vt/map_objects_3d/{Z}/{x}/{y}.mvt').data)['map_objects_3d']
+    feature, = objects['features']
+    assert feature['properties'] == {'name': '塔', 'type': 'tower'}
+    assert feature['geometry']['type'] == 'Point'
+
+
+def test_empty_tile(client, features):
+    response = client.get('/api/vt/plots/3/0/0.mvt')
+    assert response.status_code == 200 and response.data == b''
+
+
+@pytest.mark.parametrize('path', ['/api/vt/imagery/1/0/0.mvt', '/api/vt/plots/1/2/0.mvt'])
+def test_invalid_request(client, path):
+    assert client.get(path).status_code == 400
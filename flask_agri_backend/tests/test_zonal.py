@@ -0,0 +1,127 @@
+"""分区统计：标签图一次扫描汇总每个地块，标签图按网格与地块版本缓存，接口只加载栅格范围内的地块"""
+import os
+import numpy as np
+import pytest
+import rasterio
+from rasterio.transform import from_origin
+from app.extensions import db
+from app.models import AnalysisResult, Imagery, Plot
+from app.resources import analysis_results, imagery
+from app.services.zonal import zonal_statistics
+
+
+def _square(x0, y0, x1, y1):
+    return f'POLYGON(({x0} {y0}, {x1} {y0}, {x1} {y1}, {x0} {y1}, {x0} {y0}))'
+
+
+@pytest.fixture
+def plots(app):
+    db.session.add_all([
+        Plot(id=1, name='左', crop_type='玉米', geom=_square(0.1, 0.1, 0.3, 0.3)),
+        Plot(id=2, name='跨界', geom=_square(0.4, 0.1, 0.6, 0.3)),
+        Plot(id=3, name='无效区', geom=_square(0.1, 0.9, 0.3, 1.0)),
+        Plot(id=4, name='范围外', geom=_square(5, 5, 6, 6)),
+        Plot(id=5, name='空', geom='POLYGON EMPTY'),
+    ])
+    db.session.commit()
+    return Plot.query.order_by(Plot.id).all()
+
+
+@pytest.fixture
+def grid(tmp_path):
+    # 左半幅 0.2、右半幅 0.6，最上 10 行为无效值
+    data = np.full((100, 100), 0.2, dtype=np.float32)
+    data[:, 50:] = 0.6
+    data[:10] = np.nan
+    path = str(tmp_path / 'index.tif')
+    with rasterio.open(path, 'w', driver='GTiff', width=100, height=100, count=1, dtype='float32',
+                       crs='EPSG:4326', transform=from_origin(0, 1, 0.01, 0.01)) as dst:
+        dst.write(data, 1)
+    return path
+
+
+def _spy(monkeypatch, module):
+    loaded = []
+    original = module.zonal_statistics
+
+    def zonal_statistics(src, reader, plots, **kwargs):
+        loaded.extend(plot.id for plot in plots)
+        return original(src, reader, plots, **kwargs)
+
+    monkeypatch.setattr(module, 'zonal_statistics', zonal_statistics)
+    return loaded
+
+
+def _run(path, plots, mask_dir=None, block_size=32):
+    with rasterio.open(path) as src:
+        reader = lambda window: src.read(1, window=window).astype('float32')  # noqa: E731
+        return {item['plot'].id: item for item in zonal_statistics(
+            src, reader, plots, value_range=(-1.0, 1.0), bins=10, mask_dir=mask_dir, block_size=block_size)}
+
+
+def test_statistics_per_plot(grid, plots):
+    zones = _run(grid, plots)
+    assert set(zones) == {1, 2, 3}
+    left, straddle, invalid = zones[1], zones[2], zones[3]
+    assert left['pixel_count'] == left['count'] == 400
+    assert left['mean'] == pytest.approx(0.2) and left['std'] == pytest.approx(0, abs=1e-6)
+    assert left['percentiles']['p50'] == pytest.approx(0.2, abs=0.01)
+    assert sum(left['histogram']['counts']) == 400 and len(left['histogram']['edges']) == 11
+    assert straddle['count'] == 400
+    assert straddle['mean'] == pytest.approx(0.4) and straddle['std'] == pytest.approx(0.2)
+    assert (straddle['min'], straddle['max']) == pytest.approx((0.2, 0.6))
+    assert straddle['percentiles']['p5'] == pytest.approx(0.2, abs=0.01)
+    assert straddle['percentiles']['p95'] == pytest.approx(0.6, abs=0.01)
+    assert invalid['pixel_count'] == 200 and invalid['count'] == 0 and invalid['mean'] is None
+
+
+def test_label_grid_is_cached(grid, plots, tmp_path):
+    mask_dir = str(tmp_path / 'masks')
+    first = _run(grid, plots, mask_dir)
+    assert len(os.listdir(mask_dir)) == 1
+    second = _run(grid, plots, mask_dir, block_size=64)
+    assert len(os.listdir(mask_dir)) == 1
+    for plot_id, zone in first.items():
+        assert second[plot_id]['count'] == zone['count']
+        assert second[plot_id]['mean'] == pytest.approx(zone['mean'])
+
+
+def test_analysis_zonal_endpoint(client, app, grid, plots, tmp_path, monkeypatch):
+    app.config['ZONAL_MASK_DIR'] = str(tmp_path / 'masks')
+    db.session.add(AnalysisResult(id=1, type='ndvi', result_path=grid))
+    db.session.commit()
+    loaded = _spy(monkeypatch, analysis_results)
+    response = client.get('/api/analysis_results/zonal/1?bins=4')
+    assert response.status_code == 200
+    rows = response.get_json()['data']
+    assert [row['plot_id'] for row in rows] == [1, 2, 3]
+    # 范围外与空几何的地块不会被读取
+    assert sorted(loaded) == [1, 2, 3]
+    row = rows[0]
+    assert row['plot_id'] == 1 and row['plot_name'] == '左' and row['crop_type'] == '玉米'
+    assert row['mean'] == pytest.approx(0.2)
+    assert row['histogram']['edges'] == [-1.0, -0.5, 0.0, 0.5, 1.0]
+    assert client.get('/api/analysis_results/zonal/1?bins=0').status_code == 400
+    assert client.get('/api/analysis_results/zonal/9').status_code == 404
+
+
+def test_imagery_zonal_endpoint(client, app, tmp_path, monkeypatch):
+    path = str(tmp_path / 'capture.tif')
+    with rasterio.open(path, 'w', driver='GTiff', width=100, height=100, count=2, dtype='uint16',
+                       crs='EPSG:4326', transform=from_origin(0, 1, 0.01, 0.01)) as dst:
+        dst.write(np.stack([np.full((100, 100), 100), np.full((100, 100), 300)]).astype(np.uint16))
+    app.config['ZONAL_MASK_DIR'] = str(tmp_path / 'masks')
+    db.session.add_all([Plot(id=1, name='左', geom=_square(0.1, 0.1, 0.3, 0.3)),
+                        Plot(id=2, name='范围外', geom=_square(5, 5, 6, 6)),
+                        Imagery(id=1, name='影像', file_path=path, red_band_index=1, nir_band_index=2)])
+    db.session.commit()
+    loaded = _spy(monkeypatch, imagery)
+    response = client.get('/api/imagery/zonal/1?index=ndvi')
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body['index'] == 'ndvi' and body['data'][0]['mean'] == pytest.approx(0.5)
+    assert [row['plot_id'] for row in body['data']] == [1] and loaded == [1]
+    response = client.get('/api/imagery/zonal/1?index=ratio&expression=nir/red')
+    assert response.get_json()['data'][0]['count'] == 400
+    assert client.get('/api/imagery/zonal/1?index=ndre').status_code == 400
+    assert client.get('/api/imagery/zonal/9').status_code == 404